@@ -1,9 +1,18 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, session
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory, session, Response, jsonify, abort
+from werkzeug.utils import safe_join, secure_filename
+import json
+import mimetypes
 import os
+import re
+import threading
+import uuid
 from config import Config
-from services.presentation_agent import PresentationAgent
-from services.file_cleanup import FileCleanup
+from services.batch_runner import BatchRunner, normalise_entries, batch_status
+from services.artifact_cache import COMPRESSIBLE_EXTENSIONS, ArtifactCache
+from services.file_cleanup import CleanupSweeper, FileCleanup, new_job_id
+from services.metrics import metrics
+from services.upload_store import UploadStore
+from services.worker_pool import WarmWorkerPool
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -11,12 +20,46 @@ app.config.from_object(Config)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 
-# Clean old files on startup
-FileCleanup.cleanup_old_files(
-    app.config['UPLOAD_FOLDER'], 
-    app.config['OUTPUT_FOLDER'], 
-    max_age_hours=24
-)
+# Not in Python's built-in table, only in some systems' mime.types
+mimetypes.add_type('text/markdown', '.md')
+
+# Uploaded files are stored once per content hash and hard-linked into each job's directory
+upload_store = UploadStore(app.config['UPLOAD_STORE_FOLDER'])
+
+# Expire old files and enforce the storage quota in the background, so startup never waits on disk.
+# When app.py is run directly, worker processes re-import it as __mp_main__; only the web process sweeps.
+cleanup_sweeper = CleanupSweeper([app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER']],
+                                 upload_store=upload_store)
+if __name__ != '__mp_main__':
+    cleanup_sweeper.start()
+
+# Pipeline jobs run in pre-forked worker processes with the libraries and clients already warm
+worker_pool = WarmWorkerPool() if Config.WORKER_PROCESSES > 0 else None
+
+# The agent pulls in boto3, pptx, pdfplumber, msal and numpy, so it is imported on first use
+# instead of at startup; the first request starts the worker pool (or imports it) in the background
+_preload_lock = threading.Lock()
+_preload_thread = None
+
+def _preload_pipeline():
+    try:
+        with metrics.span('startup.preload_pipeline'):
+            if worker_pool is not None:
+                worker_pool.start()
+            else:
+                import services.presentation_agent  # noqa: F401
+    except Exception as e:
+        print(f"⚠️ Pipeline preload failed: {e}")
+
+@app.before_request
+def start_pipeline_preload():
+    global _preload_thread
+    if _preload_thread is not None or not Config.PRELOAD_PIPELINE:
+        return
+    with _preload_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=_preload_pipeline, name='pipeline-preload', daemon=True)
+            _preload_thread.start()
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
@@ -54,30 +97,31 @@ def upload_files():
             flash('Customer AWS Account ID must be exactly 12 digits')
             return redirect(url_for('index'))
     
-    # Save uploaded files
-    pptx_filename = secure_filename(presentation.filename)
-    pptx_path = os.path.join(app.config['UPLOAD_FOLDER'], pptx_filename)
-    presentation.save(pptx_path)
+    # Each upload gets its own job directory, so users never overwrite each other's files
+    job_id = new_job_id()
+    job_upload_dir = FileCleanup.job_dir(app.config['UPLOAD_FOLDER'], job_id)
+    os.makedirs(job_upload_dir)
+    
+    # Save uploaded files (streamed and hashed into the upload store, identical files kept once)
+    pptx_path = upload_store.ingest(presentation.stream, job_upload_dir,
+                                    secure_filename(presentation.filename)).path
     
     uploaded_files = {}
     
     if 'previous_mbr' in request.files and request.files['previous_mbr'].filename:
         prev_mbr = request.files['previous_mbr']
         if allowed_file(prev_mbr.filename):
-            prev_filename = secure_filename(prev_mbr.filename)
-            prev_path = os.path.join(app.config['UPLOAD_FOLDER'], prev_filename)
-            prev_mbr.save(prev_path)
-            uploaded_files['previous_mbr'] = prev_path
+            uploaded_files['previous_mbr'] = upload_store.ingest(
+                prev_mbr.stream, job_upload_dir, secure_filename(prev_mbr.filename)).path
     
     if 'sa_notes' in request.files and request.files['sa_notes'].filename:
         sa_notes = request.files['sa_notes']
         if allowed_file(sa_notes.filename):
-            sa_filename = secure_filename(sa_notes.filename)
-            sa_path = os.path.join(app.config['UPLOAD_FOLDER'], sa_filename)
-            sa_notes.save(sa_path)
-            uploaded_files['sa_notes'] = sa_path
+            uploaded_files['sa_notes'] = upload_store.ingest(
+                sa_notes.stream, job_upload_dir, secure_filename(sa_notes.filename)).path
     
     # Store in session for processing
+    session['session_id'] = job_id
     session['pptx_path'] = pptx_path
     session['customer_account_id'] = customer_account_id
     session['customer_name'] = customer_name
@@ -98,21 +142,35 @@ def review():
 
 @app.route('/process', methods=['POST'])
 def process():
-    if 'pptx_path' not in session:
+    if 'pptx_path' not in session or 'session_id' not in session:
         flash('No presentation to process')
         return redirect(url_for('index'))
     
     try:
+        job_id = session['session_id']
+        job_output_dir = FileCleanup.job_dir(app.config['OUTPUT_FOLDER'], job_id)
+        os.makedirs(job_output_dir, exist_ok=True)
+        
+        job = {
+            'pptx_path': session['pptx_path'],
+            'customer_name': session['customer_name'],
+            'audience_type': session['audience_type'],
+            'uploaded_files': session.get('uploaded_files', {}),
+            'output_dir': job_output_dir
+        }
         customer_account_id = session.get('customer_account_id')
-        agent = PresentationAgent(customer_account_id=customer_account_id)
-        results = agent.process_presentation(
-            pptx_path=session['pptx_path'],
-            customer_name=session['customer_name'],
-            audience_type=session['audience_type'],
-            uploaded_files=session.get('uploaded_files', {}),
-            output_dir=app.config['OUTPUT_FOLDER']
-        )
+        outlook_account_id = session.get('outlook_account_id')
+        if worker_pool is not None:
+            results = worker_pool.run_job(customer_account_id=customer_account_id,
+                                          outlook_account_id=outlook_account_id, **job)
+        else:
+            from services.presentation_agent import PresentationAgent
+            agent = PresentationAgent(customer_account_id=customer_account_id,
+                                      outlook_account_id=outlook_account_id)
+            results = agent.process_presentation(**job)
         
+        metrics.inc('mbr_job_disk_bytes_total', FileCleanup.job_disk_usage(
+            job_id, app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER']))
         session['results'] = results
         return redirect(url_for('results'))
     
@@ -120,6 +178,25 @@ def process():
         flash(f'Error processing presentation: {str(e)}')
         return redirect(url_for('index'))
 
+@app.route('/outlook/login')
+def outlook_login():
+    """Send the user to Microsoft sign-in so their own mailbox can be searched."""
+    from services.outlook_service import OutlookService
+    return redirect(OutlookService().get_auth_url(url_for('outlook_callback', _external=True)))
+
+@app.route('/outlook/callback')
+def outlook_callback():
+    """Finish Microsoft sign-in and remember which cached account belongs to this user."""
+    from services.outlook_service import OutlookService
+    outlook = OutlookService()
+    code = request.args.get('code')
+    if code and outlook.get_token_from_code(code, url_for('outlook_callback', _external=True)) and outlook.account_id:
+        session['outlook_account_id'] = outlook.account_id
+        flash('Signed in to Outlook')
+    else:
+        flash('Outlook sign-in failed - email context will use sample data')
+    return redirect(url_for('index'))
+
 @app.route('/results')
 def results():
     if 'results' not in session:
@@ -127,24 +204,150 @@ def results():
     
     results = session['results']
     
-    # Read change summary
-    with open(results['summary'], 'r') as f:
-        summary_content = f.read()
+    # Change summary and questions are read and rendered once per job; repeat views
+    # are served from the cache and revalidated with the page's ETag
+    summary = ArtifactCache.file_body(results['summary'])
+    questions = ArtifactCache.file_body(results['questions'])
+    page = ArtifactCache.rendered(
+        (session['session_id'], summary.etag, questions.etag),
+        lambda: render_template('results.html',
+                                customer_name=session['customer_name'],
+                                summary=summary.body.decode('utf-8'),
+                                questions=questions.body.decode('utf-8'),
+                                presentation_file=os.path.basename(results['presentation']),
+                                summary_file=os.path.basename(results['summary']),
+                                questions_file=os.path.basename(results['questions']),
+                                job_id=session['session_id'],
+                                data_sources=results.get('data_sources')))
+    return _cached_response(page, 'text/html; charset=utf-8')
+
+def _cached_response(cached, mimetype, download_name=None):
+    """
+    Serve a CachedBody with a strong ETag, gzip when the client accepts it, and
+    If-None-Match / Range handling.
+    """
+    use_gzip = request.accept_encodings['gzip'] > 0
+    response = Response(cached.gzipped if use_gzip else cached.body, mimetype=mimetype)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    # Each encoding is a different representation, so it gets its own strong ETag
+    response.set_etag(cached.etag + ('-gzip' if use_gzip else ''))
+    response.vary.add('Accept-Encoding')
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    if download_name:
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return response.make_conditional(request, accept_ranges=bool(download_name))
+
+@app.route('/download/<job_id>/<filename>')
+def download(job_id, filename):
+    """
+    Serve a job artifact with a strong (content-hash) ETag, so re-downloads are a 304.
+    
+    Range requests are honoured; text artifacts are served gzip-compressed when accepted.
+    """
+    try:
+        job_output_dir = FileCleanup.job_dir(app.config['OUTPUT_FOLDER'], job_id)
+    except ValueError:
+        abort(404)
+    path = safe_join(os.path.abspath(job_output_dir), filename)
+    if not path or not os.path.isfile(path):
+        abort(404)
     
-    # Read questions
-    with open(results['questions'], 'r') as f:
-        questions_content = f.read()
+    if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+        # Werkzeug adds '; charset=utf-8' to text/* types itself
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        return _cached_response(ArtifactCache.file_body(path), mimetype, download_name=filename)
+    return send_from_directory(os.path.abspath(job_output_dir), filename, as_attachment=True,
+                               etag=ArtifactCache.etag(path), conditional=True)
+
+# Batches with a runner thread in this process, so a resume cannot run a batch twice
+_running_batches = set()
+_running_batches_lock = threading.Lock()
+
+def _batch_dir(batch_id):
+    return os.path.join(Config.BATCH_OUTPUT_FOLDER, batch_id)
+
+def _run_batch(batch_id, runner):
+    try:
+        runner.run()
+    finally:
+        with _running_batches_lock:
+            _running_batches.discard(batch_id)
+
+@app.route('/api/batch', methods=['POST'])
+def start_batch():
+    """
+    Start (or resume) a batch of MBRs in the background.
     
-    return render_template('results.html',
-                         customer_name=session['customer_name'],
-                         summary=summary_content,
-                         questions=questions_content,
-                         presentation_file=os.path.basename(results['presentation']),
-                         data_sources=results.get('data_sources'))
-
-@app.route('/download/<filename>')
-def download(filename):
-    return send_file(os.path.join(app.config['OUTPUT_FOLDER'], filename), as_attachment=True)
+    Body: {"entries": [...manifest entries...], "workers": 4, "llm_rate": 5}
+    or {"batch_id": "..."} to resume an earlier batch from its checkpoint (409 while it is running).
+    File paths are relative to BATCH_INPUT_FOLDER and must stay inside it.
+    """
+    payload = request.get_json(silent=True) or {}
+    batch_id = payload.get('batch_id')
+    
+    # Bounded so one caller can neither spawn unlimited threads nor hog Bedrock
+    workers = payload.get('workers')
+    if workers is not None and (type(workers) is not int or not 1 <= workers <= Config.BATCH_MAX_WORKERS):
+        return jsonify(error=f'workers must be an integer from 1 to {Config.BATCH_MAX_WORKERS}'), 400
+    llm_rate = payload.get('llm_rate')
+    if llm_rate is not None and (type(llm_rate) not in (int, float) or not 0 < llm_rate <= Config.BATCH_MAX_LLM_RATE):
+        return jsonify(error=f'llm_rate must be a number above 0 and at most {Config.BATCH_MAX_LLM_RATE:g}'), 400
+    
+    if batch_id:
+        if not re.fullmatch(r'[a-f0-9]{12}', batch_id) or not os.path.exists(os.path.join(_batch_dir(batch_id), 'manifest.json')):
+            return jsonify(error='Unknown batch_id'), 404
+        with open(os.path.join(_batch_dir(batch_id), 'manifest.json'), 'r') as f:
+            entries = json.load(f)
+    else:
+        input_root = os.path.realpath(Config.BATCH_INPUT_FOLDER)
+        try:
+            entries = normalise_entries(payload.get('entries') or [], input_root)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        if not entries:
+            return jsonify(error='No entries provided'), 400
+        for entry in entries:
+            for field in ('presentation', 'previous_mbr', 'sa_notes'):
+                path = entry[field]
+                if path and not os.path.realpath(path).startswith(input_root + os.sep):
+                    return jsonify(error=f"{entry['id']}: {field} must be inside the batch input folder"), 400
+                if path and not os.path.isfile(path):
+                    return jsonify(error=f"{entry['id']}: {field} not found"), 400
+        
+        batch_id = uuid.uuid4().hex[:12]
+        os.makedirs(_batch_dir(batch_id), exist_ok=True)
+        with open(os.path.join(_batch_dir(batch_id), 'manifest.json'), 'w') as f:
+            json.dump(entries, f, indent=2)
+    
+    runner = BatchRunner(entries, _batch_dir(batch_id), workers=workers,
+                         llm_rate=llm_rate, resume=True, worker_pool=worker_pool,
+                         outlook_account_id=session.get('outlook_account_id'))
+    with _running_batches_lock:
+        if batch_id in _running_batches:
+            return jsonify(error='Batch is already running'), 409
+        _running_batches.add(batch_id)
+    threading.Thread(target=_run_batch, args=(batch_id, runner), name=f'batch-{batch_id}', daemon=True).start()
+    return jsonify(batch_id=batch_id, entries=len(entries),
+                   status_url=url_for('get_batch_status', batch_id=batch_id)), 202
+
+@app.route('/api/batch/<batch_id>')
+def get_batch_status(batch_id):
+    """Report per-customer status of a batch from its checkpoint."""
+    if not re.fullmatch(r'[a-f0-9]{12}', batch_id) or not os.path.isdir(_batch_dir(batch_id)):
+        return jsonify(error='Unknown batch_id'), 404
+    status = batch_status(_batch_dir(batch_id))
+    jobs = status.get('jobs', {})
+    counts = {}
+    for job in jobs.values():
+        counts[job.get('status')] = counts.get(job.get('status'), 0) + 1
+    return jsonify(batch_id=batch_id, counts=counts, jobs=jobs, updated=status.get('updated'))
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Expose counters and latency histograms in Prometheus text format."""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/cleanup')
 def cleanup():
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Prepare many MBRs in one run from a manifest.
+
+Usage:
+    python batch_mbr.py manifest.json --output-dir batch_outputs/q1 --workers 6 --processes 4 --llm-rate 8
+
+The manifest is JSON (a list of entries) or CSV with the columns
+customer_name, presentation, customer_account_id, audience_type, previous_mbr, sa_notes
+and an optional id. Re-running with the same --output-dir resumes: entries already
+completed in batch_checkpoint.json are skipped.
+"""
+
+import argparse
+import json
+import sys
+
+from config import Config
+from services.batch_runner import BatchRunner, load_manifest
+from services.worker_pool import WarmWorkerPool
+
+def main():
+    parser = argparse.ArgumentParser(description='Run MBR preparation for many customers')
+    parser.add_argument('manifest', help='JSON or CSV manifest of customers')
+    parser.add_argument('--output-dir', default=f"{Config.BATCH_OUTPUT_FOLDER}/cli",
+                        help='Where per-customer outputs and the checkpoint are written')
+    parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS,
+                        help='Customers processed concurrently')
+    parser.add_argument('--llm-rate', type=float,
+                        help='Global Bedrock calls per second across all workers')
+    parser.add_argument('--processes', type=int, default=Config.WORKER_PROCESSES,
+                        help='Warm worker processes the customers run in (0 = threads in this process)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Ignore the checkpoint and run every entry again')
+    args = parser.parse_args()
+
+    try:
+        entries = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Invalid manifest: {e}")
+        return 2
+
+    worker_pool = WarmWorkerPool(args.processes).start() if args.processes > 0 else None
+    try:
+        runner = BatchRunner(entries, args.output_dir, workers=args.workers, llm_rate=args.llm_rate,
+                             resume=not args.no_resume, worker_pool=worker_pool)
+        summary = runner.run()
+    finally:
+        if worker_pool is not None:
+            worker_pool.close()
+    print(json.dumps({k: v for k, v in summary.items() if k != 'jobs'}, indent=2))
+    return 0 if summary['failed'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Cold-start import time of the web tier, checked against a budget.
+
+Imports the Flask app in fresh interpreters with `python -X importtime`, and reports
+the median cumulative import time of `app`, the slowest direct imports, and any heavy
+pipeline dependency that got loaded at startup (those should only load on first use).
+Exits non-zero when the median is over budget or a heavy module is imported eagerly,
+so it can run as a CI gate.
+
+Usage:
+    python benchmark_import_time.py
+    python benchmark_import_time.py --runs 10 --budget-ms 300 --output importtime.jsonl
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+# Median cumulative `import app` time the web tier should stay under; Flask itself is ~150-200ms of it
+COLD_START_BUDGET_MS = 350
+
+# Packages only the processing pipeline needs; importing any of them at startup is a regression
+HEAVY_MODULES = ('boto3', 'botocore', 'pptx', 'pdfplumber', 'pdfminer', 'msal', 'requests', 'numpy', 'PIL')
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us, depth) for each line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def top_level_import(rows, module):
+    """
+    Find a module's top-level (depth-0) row and its direct imports.
+
+    Returns:
+        (cumulative_us, [(child, cumulative_us), ...]) with the slowest child first
+
+    Raises:
+        RuntimeError: The output has no top-level import of module
+    """
+    # Children are listed before their parent, so a module's direct imports are the depth-1
+    # rows since the previous top-level import
+    children = []
+    for name, _, cumulative, depth in rows:
+        if depth == 1:
+            children.append((name, cumulative))
+        elif depth == 0:
+            if name == module:
+                return cumulative, sorted(children, key=lambda item: item[1], reverse=True)
+            children = []
+    # Already imported at interpreter startup (e.g. sys, os), so -X importtime never reports it
+    raise RuntimeError(f"-X importtime reported no top-level import of {module!r}")
+
+
+def measure(module='app'):
+    """Import a module in a fresh interpreter and summarise its import time."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, AWS_EC2_METADATA_DISABLED='true')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=root, env=env, capture_output=True, text=True, check=True)
+    rows = parse_importtime(proc.stderr)
+    total_us, direct = top_level_import(rows, module)
+    heavy = sorted({name.split('.')[0] for name, _, _, _ in rows if name.split('.')[0] in HEAVY_MODULES})
+    return {'total_ms': total_us / 1000, 'direct_imports': direct, 'heavy_modules': heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Web tier cold-start import time')
+    parser.add_argument('--module', default='app', help='Module to import')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time (median reported)')
+    parser.add_argument('--budget-ms', type=float, default=COLD_START_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=8, help='Slowest direct imports to list')
+    parser.add_argument('--output', help='Append JSON lines here instead of stdout')
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(run['total_ms'] for run in runs)
+    heavy = sorted({name for run in runs for name in run['heavy_modules']})
+    result = {
+        'timestamp': datetime.now().isoformat(),
+        'module': args.module,
+        'runs': args.runs,
+        'median_ms': round(median_ms, 1),
+        'min_ms': round(min(run['total_ms'] for run in runs), 1),
+        'budget_ms': args.budget_ms,
+        'slowest_direct_imports': [[name, round(us / 1000, 1)] for name, us in runs[-1]['direct_imports'][:args.top]],
+        'heavy_modules': heavy,
+        'within_budget': median_ms <= args.budget_ms and not heavy,
+    }
+
+    if args.output:
+        with open(args.output, 'a') as out:
+            out.write(json.dumps(result) + "\n")
+    else:
+        print(json.dumps(result))
+    sys.exit(0 if result['within_budget'] else 1)
+
+
+if __name__ == '__main__':
+    main()
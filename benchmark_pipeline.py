@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for PresentationAgent.process_presentation.
+
+Generates synthetic decks, notes and PDFs, stubs out AWS, Bedrock and Graph
+with realistic latency, and reports wall-clock time, per-stage time, peak RSS
+and LLM calls for each scenario as JSON lines.
+
+Each scenario runs in a fresh process so peak RSS is not polluted by earlier runs.
+
+Usage:
+    python benchmark_pipeline.py
+    python benchmark_pipeline.py --slides 10,50,200 --notes-kb 0,64 --pdf-pages 0,40 --output bench.jsonl
+    python benchmark_pipeline.py --bedrock-latency fixed:0 --aws-latency 0 --graph-latency 0   # CPU only
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+SLIDE_TOPICS = [
+    ("Monthly Business Review", "Q1 2026 - Customer Name"),
+    ("Agenda", "Executive summary\nCost review\nSupport\nRoadmap"),
+    ("AWS Cost Overview", "Total spend and breakdown by service\nEC2 instances\nRDS databases\nS3 storage"),
+    ("EC2 Usage and Rightsizing", "Instance families, utilization, rightsizing candidates"),
+    ("RDS Performance Review", "Slow queries during peak hours, Aurora migration options"),
+    ("Reserved Instances and Savings Plans", "Coverage and utilization, upcoming expirations"),
+    ("Support Case Summary", "Open cases, resolution time, key issues addressed"),
+    ("Trusted Advisor Findings", "Security, cost optimization and fault tolerance checks"),
+    ("Security & Compliance", "IAM review, encryption at rest, Security Hub findings"),
+    ("Innovation Opportunities", "Containers on ECS or EKS, serverless, generative AI"),
+    ("Operational Metrics", "CloudWatch alarms, deployment frequency, incidents"),
+    ("Section Divider", ""),
+    ("Thank You", "Questions?"),
+]
+
+NOTES_PARAGRAPHS = [
+    "Platform team reports RDS slow queries at peak, considering Aurora Serverless v2.",
+    "Container strategy still open between ECS and EKS for the monolith split.",
+    "Finance flagged a 30% cost increase and wants Savings Plans coverage numbers.",
+    "Security team preparing for a SOC2 audit next quarter, needs Security Hub guidance.",
+    "Data team evaluating Bedrock for support ticket summarisation.",
+    "Lambda timeouts on the order pipeline traced to a downstream dependency.",
+]
+
+
+def build_deck(path, slide_count):
+    """Write a synthetic MBR deck with slide_count slides cycling through SLIDE_TOPICS."""
+    from pptx import Presentation
+
+    prs = Presentation()
+    for i in range(slide_count):
+        title, body = SLIDE_TOPICS[i % len(SLIDE_TOPICS)]
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title if i < len(SLIDE_TOPICS) else f"{title} ({i})"
+        if body:
+            slide.placeholders[1].text_frame.text = body
+        else:
+            slide.placeholders[1].element.getparent().remove(slide.placeholders[1].element)
+    prs.save(path)
+
+
+def build_notes(path, size_kb):
+    """Write roughly size_kb of plain-text SA notes."""
+    target = size_kb * 1024
+    with open(path, 'w') as f:
+        written = 0
+        for paragraph in itertools.cycle(NOTES_PARAGRAPHS):
+            if written >= target:
+                break
+            f.write(paragraph + "\n\n")
+            written += len(paragraph) + 2
+
+
+def build_pdf(path, page_count):
+    """Write a minimal text PDF with page_count pages of notes."""
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for i in range(page_count):
+        lines = [NOTES_PARAGRAPHS[(i + j) % len(NOTES_PARAGRAPHS)] for j in range(12)]
+        stream = b"BT /F1 10 Tf 14 TL 50 750 Td " + b" ".join(
+            b"(" + line.encode() + b") Tj T*" for line in lines) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % p for p in page_ids) + \
+        b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(bytes(out))
+
+
+class StubAWSClient:
+    """Stands in for the ce/health/support boto3 clients with a fixed per-call latency."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_cost_and_usage(self, **kwargs):
+        self._wait()
+        services = ['Amazon Elastic Compute Cloud - Compute', 'Amazon Relational Database Service',
+                    'Amazon Simple Storage Service', 'AWS Lambda', 'Amazon CloudFront']
+        start = date(2026, 1, 1)
+        # 90 days per service and account, growing ~1% a day
+        return {'ResultsByTime': [
+            {'TimePeriod': {'Start': str(start + timedelta(days=day))},
+             'Groups': [{'Keys': [svc, account],
+                         'Metrics': {'UnblendedCost': {'Amount': str(30.0 * (i + 1) * (1.01 ** day))}}}
+                        for i, svc in enumerate(services) for account in ('111111111111', '222222222222')]}
+            for day in range(90)]}
+
+    def describe_events(self, **kwargs):
+        self._wait()
+        return {'events': [{'service': 'EC2', 'eventTypeCode': 'AWS_EC2_INSTANCE_RETIREMENT_SCHEDULED',
+                            'statusCode': 'upcoming', 'region': 'us-east-1'}]}
+
+    def describe_cases(self, **kwargs):
+        self._wait()
+        return {'cases': [{'caseId': '1', 'subject': 'RDS performance degradation', 'status': 'opened',
+                           'severityCode': 'normal', 'serviceCode': 'amazon-rds'}]}
+
+    def describe_trusted_advisor_checks(self, **kwargs):
+        self._wait()
+        return {'checks': [{'id': f'check{i}', 'name': f'Check {i}', 'category': category}
+                           for i, category in enumerate(['cost_optimizing', 'security', 'fault_tolerance',
+                                                         'performance', 'service_limits'] * 8)]}
+
+    def describe_trusted_advisor_check_result(self, checkId, **kwargs):
+        self._wait()
+        flagged = int(checkId[5:]) % 3
+        return {'result': {'checkId': checkId, 'status': ['ok', 'warning', 'error'][flagged],
+                           'resourcesSummary': {'resourcesFlagged': flagged * 4},
+                           'categorySpecificSummary': {'costOptimizing': {'estimatedMonthlySavings': flagged * 120.0}}}}
+
+    def get_reservation_coverage(self, **kwargs):
+        self._wait()
+        return {'Total': {'CoverageHours': {'CoverageHoursPercentage': '41.5'}, 'CoverageCost': {'OnDemandCost': '5200'}}}
+
+    def get_reservation_utilization(self, **kwargs):
+        self._wait()
+        return {'Total': {'UtilizationPercentage': '87.2', 'UnusedHours': '120', 'NetRISavings': '1500'}}
+
+    def get_savings_plans_coverage(self, **kwargs):
+        self._wait()
+        return {'SavingsPlansCoverages': [{'Coverage': {'SpendCoveredBySavingsPlans': '600', 'OnDemandCost': '400',
+                                                        'TotalCost': '1000'}}]}
+
+    def get_savings_plans_utilization(self, **kwargs):
+        self._wait()
+        return {'Total': {'Utilization': {'UtilizationPercentage': '96.0', 'UnusedCommitment': '30'},
+                          'Savings': {'NetSavings': '2100'}}}
+
+
+class StubGraphResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class StubGraphSession:
+    """Stands in for the pooled Graph session: two pages of mail per search."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def get(self, url, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        now = datetime.now(timezone.utc)
+        page = 2 if 'page=2' in url else 1
+        payload = {'value': [
+            {'subject': f'Customer thread {page}-{i}', 'from': {'emailAddress': {'name': 'Customer'}},
+             'receivedDateTime': (now - timedelta(days=page * 10 + i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+             'bodyPreview': NOTES_PARAGRAPHS[i % len(NOTES_PARAGRAPHS)]}
+            for i in range(10)]}
+        if page == 1:
+            payload['@odata.nextLink'] = url.split('?')[0] + '?page=2'
+        return StubGraphResponse(payload)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024, 1)
+
+
+def run_scenario(scenario, options, queue):
+    """Run one pipeline in this (child) process and put the result dict on the queue."""
+    try:
+        sys.stdout = open(os.devnull, 'w')
+        workdir = tempfile.mkdtemp(prefix='mbr-bench-')
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'bench')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'bench')
+        os.environ['AWS_EC2_METADATA_DISABLED'] = 'true'
+
+        from config import Config
+        from services.bedrock_stub import BedrockStubServer
+
+        stub = BedrockStubServer(latency=options['bedrock_latency'], seed=options['seed'])
+        stub.start_background()
+        Config.BEDROCK_ENDPOINT_URL = stub.endpoint_url
+        Config.CACHE_FOLDER = os.path.join(workdir, 'cache')
+
+        deck_path = os.path.join(workdir, 'deck.pptx')
+        build_deck(deck_path, scenario['slides'])
+        uploaded_files = {}
+        if scenario['notes_kb']:
+            uploaded_files['sa_notes'] = os.path.join(workdir, 'sa_notes.txt')
+            build_notes(uploaded_files['sa_notes'], scenario['notes_kb'])
+        if scenario['pdf_pages']:
+            uploaded_files['previous_mbr'] = os.path.join(workdir, 'previous_mbr.pdf')
+            build_pdf(uploaded_files['previous_mbr'], scenario['pdf_pages'])
+
+        import services.outlook_service as outlook_module
+        from services.presentation_agent import PresentationAgent
+
+        outlook_module._http_session = StubGraphSession(options['graph_latency'])
+        started = time.perf_counter()
+        agent = PresentationAgent()
+        aws = agent.context_gatherer.aws_service
+        aws.ce_client = aws.health_client = aws.support_client = StubAWSClient(options['aws_latency'])
+        aws.aws_available = True
+        agent.context_gatherer.outlook_service.token = 'bench-token'
+
+        output_dir = os.path.join(workdir, 'outputs')
+        os.makedirs(output_dir)
+        results = agent.process_presentation(deck_path, 'BenchCustomer', 'technical', uploaded_files, output_dir)
+        wall = time.perf_counter() - started
+
+        stub_stats = stub.stats.snapshot()
+        stub.shutdown()
+        queue.put(dict(
+            scenario,
+            wall_s=round(wall, 4),
+            stages=results.get('timings', {}),
+            peak_rss_mb=peak_rss_mb(),
+            llm_calls=results.get('llm_calls'),
+            llm_input_tokens=stub_stats['input_tokens'],
+            llm_output_tokens=stub_stats['output_tokens'],
+            output_pptx_bytes=os.path.getsize(results['presentation'])
+        ))
+    except Exception as e:
+        queue.put(dict(scenario, error=repr(e)))
+
+
+def parse_int_list(value):
+    return [int(v) for v in value.split(',') if v != '']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end MBR pipeline benchmark')
+    parser.add_argument('--slides', type=parse_int_list, default=[10, 50, 200])
+    parser.add_argument('--notes-kb', type=parse_int_list, default=[16])
+    parser.add_argument('--pdf-pages', type=parse_int_list, default=[20])
+    parser.add_argument('--runs', type=int, default=1, help='Repetitions per scenario')
+    parser.add_argument('--bedrock-latency', default='lognormal:0.05,0.3',
+                        help='Latency spec for the Bedrock stub (see services/bedrock_stub.py)')
+    parser.add_argument('--aws-latency', type=float, default=0.2, help='Seconds per AWS API call')
+    parser.add_argument('--graph-latency', type=float, default=0.15, help='Seconds per Graph request')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Append JSON lines here instead of stdout')
+    args = parser.parse_args()
+
+    options = {
+        'bedrock_latency': args.bedrock_latency,
+        'aws_latency': args.aws_latency,
+        'graph_latency': args.graph_latency,
+        'seed': args.seed
+    }
+    meta = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        **options
+    }
+
+    ctx = multiprocessing.get_context('spawn')
+    out = open(args.output, 'a') if args.output else sys.stdout
+    try:
+        for slides, notes_kb, pdf_pages in itertools.product(args.slides, args.notes_kb, args.pdf_pages):
+            for run in range(args.runs):
+                scenario = {'slides': slides, 'notes_kb': notes_kb, 'pdf_pages': pdf_pages, 'run': run}
+                queue = ctx.Queue()
+                proc = ctx.Process(target=run_scenario, args=(scenario, options, queue))
+                proc.start()
+                result = queue.get()
+                proc.join()
+                out.write(json.dumps(dict(meta, **result)) + "\n")
+                out.flush()
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
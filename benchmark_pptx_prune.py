@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Output size and save time of reordered decks, with and without pruning removed slides.
+
+Builds media-heavy synthetic decks (one incompressible picture per slide, plus notes),
+keeps a fraction of the slides via PowerPointService.reorder_slides, and reports the
+saved file size, save time and part counts for prune=False vs prune=True as JSON lines.
+
+Usage:
+    python benchmark_pptx_prune.py
+    python benchmark_pptx_prune.py --slides 20,100 --image-kb 200 --keep 0.5 --runs 3
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import zipfile
+from datetime import datetime
+
+
+def parse_int_list(value):
+    return [int(v) for v in value.split(',') if v != '']
+
+
+def build_deck(slide_count, image_kb):
+    """In-memory deck where every slide has a title, a unique picture and speaker notes."""
+    from PIL import Image
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    side = max(8, int((image_kb * 1024 / 3) ** 0.5))
+    prs = Presentation()
+    for i in range(slide_count):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {i}"
+        # Random pixels so PNG compression and python-pptx's image de-duplication don't hide the cost
+        image = io.BytesIO()
+        Image.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(image, 'PNG')
+        image.seek(0)
+        slide.shapes.add_picture(image, Inches(1), Inches(1.5), width=Inches(6))
+        slide.notes_slide.notes_text_frame.text = f"Presenter notes for slide {i}"
+    source = io.BytesIO()
+    prs.save(source)
+    return source.getvalue()
+
+
+def measure(deck_bytes, keep_fraction, prune):
+    from pptx import Presentation
+    from services.pptx_service import PowerPointService
+    from services.slide_records import ScoredSlide, SlideRecord
+
+    prs = Presentation(io.BytesIO(deck_bytes))
+    slide_count = len(prs.slides)
+    # Keep evenly spaced slides, as if the rest scored below the keep threshold
+    keep_count = max(1, round(slide_count * keep_fraction))
+    kept = [ScoredSlide(SlideRecord(i * slide_count // keep_count), 8) for i in range(keep_count)]
+    PowerPointService().reorder_slides(prs, kept, prune=prune)
+
+    output = io.BytesIO()
+    started = time.perf_counter()
+    prs.save(output)
+    save_s = time.perf_counter() - started
+
+    names = zipfile.ZipFile(output).namelist()
+    return {
+        'kept_slides': len(kept),
+        'output_bytes': len(output.getvalue()),
+        'save_s': save_s,
+        'media_parts': sum(1 for n in names if n.startswith('ppt/media/')),
+        'slide_parts': sum(1 for n in names if n.startswith('ppt/slides/slide')),
+    }
+
+
+def main():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='Pruned vs unpruned output deck size and save time')
+    parser.add_argument('--slides', type=parse_int_list, default=[20, 100])
+    parser.add_argument('--image-kb', type=parse_int_list, default=[100])
+    parser.add_argument('--keep', type=float, default=0.5, help='Fraction of slides kept')
+    parser.add_argument('--runs', type=int, default=3, help='Save-time repetitions (median reported)')
+    parser.add_argument('--output', help='Append JSON lines here instead of stdout')
+    args = parser.parse_args()
+
+    out = open(args.output, 'a') if args.output else sys.stdout
+    try:
+        for slides, image_kb in itertools.product(args.slides, args.image_kb):
+            deck_bytes = build_deck(slides, image_kb)
+            result = {'timestamp': datetime.now().isoformat(), 'slides': slides, 'image_kb': image_kb,
+                      'keep': args.keep, 'input_bytes': len(deck_bytes)}
+            for prune in (False, True):
+                runs = [measure(deck_bytes, args.keep, prune) for _ in range(args.runs)]
+                key = 'pruned' if prune else 'unpruned'
+                result[key] = dict(runs[0], save_s=round(statistics.median(r['save_s'] for r in runs), 4))
+            result['bytes_saved_pct'] = round(100 * (1 - result['pruned']['output_bytes'] /
+                                                     result['unpruned']['output_bytes']), 1)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
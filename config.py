@@ -12,11 +12,110 @@ class Config:
     AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
     AWS_PROFILE = os.getenv('AWS_PROFILE', 'default')
     BEDROCK_MODEL_ID = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-5-sonnet-20241022-v2:0')
+    BEDROCK_ENDPOINT_URL = os.getenv('BEDROCK_ENDPOINT_URL') or None
+    
+    # Model tiering: cheap model for scoring/classification, BEDROCK_MODEL_ID for narrative.
+    # Routes/pricing are JSON, e.g. BEDROCK_MODEL_ROUTES='{"relevance": "fast", "questions": "strong"}'
+    BEDROCK_FAST_MODEL_ID = os.getenv('BEDROCK_FAST_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
+    BEDROCK_MODEL_ROUTES = os.getenv('BEDROCK_MODEL_ROUTES')
+    BEDROCK_CUSTOMER_MODEL_ROUTES = os.getenv('BEDROCK_CUSTOMER_MODEL_ROUTES')
+    BEDROCK_MODEL_PRICING = os.getenv('BEDROCK_MODEL_PRICING')
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '32'))
+    
+    # Cost Explorer/Health/Support/STS calls fail fast instead of waiting out botocore's
+    # defaults (60s timeouts, legacy retries); attempts include the first call
+    AWS_CONNECT_TIMEOUT = float(os.getenv('AWS_CONNECT_TIMEOUT', '3'))
+    AWS_READ_TIMEOUT = float(os.getenv('AWS_READ_TIMEOUT', '15'))
+    AWS_MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', '2'))
+    
+    # Per-backend circuit breakers: failures in a row before a backend goes straight to
+    # its fallback, and seconds before it is probed again
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '3'))
+    BREAKER_RESET_SECONDS = float(os.getenv('BREAKER_RESET_SECONDS', '300'))
+    
+    # Global Bedrock call rate across all concurrent runs (calls/second, 0 = unlimited)
+    LLM_RATE_LIMIT = float(os.getenv('LLM_RATE_LIMIT', '0'))
+    LLM_RATE_BURST = int(os.getenv('LLM_RATE_BURST', '5'))
+    
+    # Pipeline stages that may run at once within one job (1 = sequential)
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', '4'))
+    
+    # Concurrent slide scoring calls per job, and as many talking-point calls on their own pool;
+    # with speculation on, a slide's talking points start as soon as its score says it will be kept
+    SLIDE_WORKERS = int(os.getenv('SLIDE_WORKERS', '8'))
+    SPECULATIVE_TALKING_POINTS = os.getenv('SPECULATIVE_TALKING_POINTS', 'true').lower() == 'true'
+    
+    # Batch mode: default worker count and where API-submitted manifests may read files from
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))
+    # Upper bounds for the workers and llm_rate a /api/batch caller may ask for
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '16'))
+    BATCH_MAX_LLM_RATE = float(os.getenv('BATCH_MAX_LLM_RATE', '20'))
+    # Kept apart from UPLOAD_FOLDER/OUTPUT_FOLDER, which the cleanup sweeper expires file by file
+    BATCH_INPUT_FOLDER = os.getenv('BATCH_INPUT_FOLDER', 'batch_inputs')
+    BATCH_OUTPUT_FOLDER = os.getenv('BATCH_OUTPUT_FOLDER', 'batch_outputs')
     
     OUTLOOK_CLIENT_ID = os.getenv('OUTLOOK_CLIENT_ID')
     OUTLOOK_CLIENT_SECRET = os.getenv('OUTLOOK_CLIENT_SECRET')
     OUTLOOK_TENANT_ID = os.getenv('OUTLOOK_TENANT_ID')
     OUTLOOK_AUTHORITY = f"https://login.microsoftonline.com/{os.getenv('OUTLOOK_TENANT_ID', 'common')}"
     OUTLOOK_SCOPE = ["https://graph.microsoft.com/Mail.Read"]
+    OUTLOOK_PAGE_SIZE = int(os.getenv('OUTLOOK_PAGE_SIZE', '50'))
+    OUTLOOK_MAX_MESSAGES = int(os.getenv('OUTLOOK_MAX_MESSAGES', '20'))
+    OUTLOOK_POOL_SIZE = int(os.getenv('OUTLOOK_POOL_SIZE', '10'))
+    OUTLOOK_TIMEOUT = float(os.getenv('OUTLOOK_TIMEOUT', '15'))
+    OUTLOOK_CONNECT_TIMEOUT = float(os.getenv('OUTLOOK_CONNECT_TIMEOUT', '3'))
+    OUTLOOK_MAX_RETRIES = int(os.getenv('OUTLOOK_MAX_RETRIES', '1'))
+    
+    # Background cleanup of uploads/outputs: age limit, total size quota (0 = none), sweep interval,
+    # and the grace period before a recent file can be evicted for the quota
+    CLEANUP_MAX_AGE_HOURS = float(os.getenv('CLEANUP_MAX_AGE_HOURS', '24'))
+    STORAGE_QUOTA_MB = int(os.getenv('STORAGE_QUOTA_MB', '2048'))
+    CLEANUP_INTERVAL_SECONDS = float(os.getenv('CLEANUP_INTERVAL_SECONDS', '600'))
+    CLEANUP_MIN_AGE_SECONDS = float(os.getenv('CLEANUP_MIN_AGE_SECONDS', '300'))
+    
+    # Content-addressed store of uploaded files; job upload directories hold hard links into it
+    UPLOAD_STORE_FOLDER = os.getenv('UPLOAD_STORE_FOLDER', 'upload_store')
+    
+    # Web tier: import the processing pipeline in the background after the first request
+    PRELOAD_PIPELINE = os.getenv('PRELOAD_PIPELINE', 'true').lower() == 'true'
+    
+    # Pre-forked pipeline worker processes for web and batch jobs (0 = run jobs in the web process),
+    # jobs per worker before it is replaced (0 = never) and the per-job result timeout in seconds
+    WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', '2'))
+    WORKER_MAX_JOBS = int(os.getenv('WORKER_MAX_JOBS', '0'))
+    WORKER_JOB_TIMEOUT = float(os.getenv('WORKER_JOB_TIMEOUT', '1800'))
+    
+    # Cost trend analytics over daily Cost Explorer data: rolling-average window, trailing baseline
+    # for anomaly z-scores, the |z| that counts as an anomaly, the smallest daily cost worth flagging,
+    # and how many movers/anomalies go into the context
+    COST_ROLLING_DAYS = int(os.getenv('COST_ROLLING_DAYS', '7'))
+    COST_BASELINE_DAYS = int(os.getenv('COST_BASELINE_DAYS', '28'))
+    COST_ANOMALY_Z = float(os.getenv('COST_ANOMALY_Z', '3.0'))
+    COST_ANOMALY_MIN_DAILY = float(os.getenv('COST_ANOMALY_MIN_DAILY', '10'))
+    COST_TOP_MOVERS = int(os.getenv('COST_TOP_MOVERS', '5'))
+    
+    # Trusted Advisor check results fetched at once, flagged checks kept in the context, and how long
+    # Trusted Advisor and RI/Savings Plans data is cached per account (seconds, 0 = no caching)
+    TRUSTED_ADVISOR_WORKERS = int(os.getenv('TRUSTED_ADVISOR_WORKERS', '8'))
+    TRUSTED_ADVISOR_TOP = int(os.getenv('TRUSTED_ADVISOR_TOP', '10'))
+    AWS_DATA_CACHE_TTL = float(os.getenv('AWS_DATA_CACHE_TTL', '3600'))
+    
+    # Local state that persists between runs (Outlook cursors, token cache, ...)
+    CACHE_FOLDER = os.getenv('CACHE_FOLDER', 'cache')
     
     ALLOWED_EXTENSIONS = {'pptx', 'pdf', 'txt', 'docx'}
+    
+    # Uploaded notes extraction: stop reading once this many characters are collected (0 = unlimited)
+    EXTRACT_MAX_CHARS = int(os.getenv('EXTRACT_MAX_CHARS', '60000'))
+    EXTRACT_CACHE_SIZE = int(os.getenv('EXTRACT_CACHE_SIZE', '32'))
+    
+    # Result artifacts: cached ETags, gzip bodies and rendered results pages (entries)
+    ARTIFACT_CACHE_SIZE = int(os.getenv('ARTIFACT_CACHE_SIZE', '128'))
+    
+    # Notes retrieval: chunk size and how much notes text goes into each prompt
+    NOTES_CHUNK_CHARS = int(os.getenv('NOTES_CHUNK_CHARS', '800'))
+    NOTES_EXCERPT_CHARS = int(os.getenv('NOTES_EXCERPT_CHARS', '2000'))
+    NOTES_ANALYSIS_CHARS = int(os.getenv('NOTES_ANALYSIS_CHARS', '8000'))
+    
+    # Score title/agenda/divider slides and obvious signal matches locally instead of via the LLM
+    SLIDE_PREFILTER = os.getenv('SLIDE_PREFILTER', 'true').lower() == 'true'
@@ -0,0 +1,63 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from config import Config
+from services.metrics import metrics
+
+
+class AccountDataCache:
+    """
+    Per-account TTL cache for slow-changing AWS data (Trusted Advisor, RI/SP coverage).
+
+    Entries are keyed by (account, collector). Concurrent misses for the same key wait for
+    the first fetch instead of repeating it. Failed fetches are not cached.
+    """
+
+    _entries = {}
+    _inflight = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_or_fetch(account: str, collector: str, fetch: Callable[[], object], ttl: Optional[float] = None):
+        """
+        Return the cached value for an account's collector, fetching it when missing or expired.
+
+        Args:
+            account: Account the data belongs to (customer account ID, or 'default')
+            collector: Name of the data set (e.g. 'trusted_advisor')
+            fetch: Zero-argument callable returning fresh data; exceptions propagate
+            ttl: Seconds a value stays fresh (defaults to Config.AWS_DATA_CACHE_TTL, 0 disables caching)
+        """
+        ttl = Config.AWS_DATA_CACHE_TTL if ttl is None else ttl
+        key = (account, collector)
+        while True:
+            with AccountDataCache._lock:
+                entry = AccountDataCache._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    metrics.inc('mbr_cache_requests_total', cache=f'account_{collector}', result='hit')
+                    return entry[1]
+                waiter = AccountDataCache._inflight.get(key)
+                if waiter is None:
+                    waiter = AccountDataCache._inflight[key] = threading.Event()
+                    break
+            # Another thread is fetching the same data; use its result (or retry if it failed)
+            waiter.wait()
+
+        metrics.inc('mbr_cache_requests_total', cache=f'account_{collector}', result='miss')
+        try:
+            value = fetch()
+            if ttl > 0:
+                with AccountDataCache._lock:
+                    AccountDataCache._entries[key] = (time.monotonic() + ttl, value)
+            return value
+        finally:
+            with AccountDataCache._lock:
+                AccountDataCache._inflight.pop(key, None)
+            waiter.set()
+
+    @staticmethod
+    def clear():
+        """Drop all cached entries."""
+        with AccountDataCache._lock:
+            AccountDataCache._entries.clear()
@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from config import Config
+from services.metrics import metrics
+
+# Text artifacts worth serving gzip-compressed (.pptx is already a zip)
+COMPRESSIBLE_EXTENSIONS = {'.md', '.txt', '.json', '.csv'}
+
+
+class CachedBody(NamedTuple):
+    """A response body with its precompressed variant and strong ETag."""
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def _compress(body: bytes) -> bytes:
+    # mtime=0 keeps the gzip bytes (and so their ETag) stable for the same input
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class ArtifactCache:
+    """LRU cache of result-artifact ETags, gzip variants and rendered pages."""
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _get_or_build(key: tuple, build: Callable[[], object], kind: str):
+        with ArtifactCache._lock:
+            if key in ArtifactCache._entries:
+                ArtifactCache._entries.move_to_end(key)
+                metrics.inc('mbr_cache_requests_total', cache=f'artifact_{kind}', result='hit')
+                return ArtifactCache._entries[key]
+
+        metrics.inc('mbr_cache_requests_total', cache=f'artifact_{kind}', result='miss')
+        value = build()
+
+        with ArtifactCache._lock:
+            ArtifactCache._entries[key] = value
+            while len(ArtifactCache._entries) > Config.ARTIFACT_CACHE_SIZE:
+                ArtifactCache._entries.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _file_key(kind: str, filepath: str) -> tuple:
+        stat = os.stat(filepath)
+        return kind, os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def etag(filepath: str) -> str:
+        """
+        Strong ETag (SHA-256 of the content) for a file.
+
+        The hash is computed once per file version; later calls only stat the file.
+        """
+        def build():
+            digest = hashlib.sha256()
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        return ArtifactCache._get_or_build(ArtifactCache._file_key('etag', filepath), build, 'etag')
+
+    @staticmethod
+    def file_body(filepath: str) -> CachedBody:
+        """Content, gzip variant and ETag of a small text artifact, read and compressed once per version."""
+        def build():
+            with open(filepath, 'rb') as f:
+                body = f.read()
+            return CachedBody(body, _compress(body), hashlib.sha256(body).hexdigest())
+        return ArtifactCache._get_or_build(ArtifactCache._file_key('body', filepath), build, 'body')
+
+    @staticmethod
+    def rendered(key: tuple, render: Callable[[], str]) -> CachedBody:
+        """
+        Cached rendered page.
+
+        Args:
+            key: Everything the page depends on (e.g. job id plus the ETags of its inputs)
+            render: Zero-argument callable returning the HTML
+        """
+        def build():
+            body = render().encode('utf-8')
+            return CachedBody(body, _compress(body), hashlib.sha256(body).hexdigest())
+        return ArtifactCache._get_or_build(('page',) + tuple(key), build, 'page')
+
+    @staticmethod
+    def clear():
+        """Drop all cached entries."""
+        with ArtifactCache._lock:
+            ArtifactCache._entries.clear()
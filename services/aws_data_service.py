@@ -1,7 +1,41 @@
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import contextvars
+import numpy as np
 from config import Config
 from services.role_assumer import AWSRoleAssumer
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.client_pool import fast_fail_config, get_client
+from services.account_cache import AccountDataCache
+from services.cost_analytics import CostAnalytics
+from services.metrics import metrics
+
+def fan_out(fn, items, max_workers):
+    """
+    Call fn on every item concurrently on a bounded thread pool.
+    
+    Each call runs in a copy of the caller's context, so spans reach the job trace.
+    
+    Returns:
+        (results of the calls that succeeded in item order, number that failed)
+    """
+    if not items:
+        return [], 0
+    results = []
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))), thread_name_prefix='mbr-aws') as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failed += 1
+                if not isinstance(e, CircuitOpenError):
+                    print(f"   ⚠️  AWS call failed: {e}")
+    return results, failed
+
+# Backends with their own circuit breaker (per account)
+AWS_BACKENDS = ('cost_explorer', 'health', 'support', 'trusted_advisor', 'commitments')
 
 class AWSDataService:
     def __init__(self, customer_account_id=None, role_name="TAMAccessRole"):
@@ -26,9 +60,9 @@ class AWSDataService:
                     role_name
                 )
                 if session:
-                    self.ce_client = session.client('ce', region_name=Config.AWS_REGION)
-                    self.health_client = session.client('health', region_name='us-east-1')
-                    self.support_client = session.client('support', region_name='us-east-1')
+                    self.ce_client = session.client('ce', region_name=Config.AWS_REGION, config=fast_fail_config())
+                    self.health_client = session.client('health', region_name='us-east-1', config=fast_fail_config())
+                    self.support_client = session.client('support', region_name='us-east-1', config=fast_fail_config())
                     self.using_customer_account = True
                     print(f"✅ SUCCESS! Using customer account {customer_account_id}")
                     print(f"   All AWS API calls will use customer's data\n")
@@ -37,9 +71,9 @@ class AWSDataService:
             else:
                 # Use default credentials
                 print("\n⚠️  No customer account ID provided - using your credentials")
-                self.ce_client = boto3.client('ce', region_name=Config.AWS_REGION)
-                self.health_client = boto3.client('health', region_name='us-east-1')
-                self.support_client = boto3.client('support', region_name='us-east-1')
+                self.ce_client = get_client('ce', Config.AWS_REGION, fast_fail=True)
+                self.health_client = get_client('health', 'us-east-1', fast_fail=True)
+                self.support_client = get_client('support', 'us-east-1', fast_fail=True)
                 print("   Using your account data (not customer's)\n")
             
             self.aws_available = True
@@ -52,6 +86,7 @@ class AWSDataService:
     def get_cost_data(self, account_id=None):
         if not self.aws_available:
             print("   ❌ Using mock cost data (AWS unavailable)")
+            metrics.inc('mbr_mock_fallback_total', backend='cost_explorer')
             return self._mock_cost_data()
         try:
             account_info = f"customer account {self.customer_account_id}" if self.using_customer_account else "your account"
@@ -59,38 +94,50 @@ class AWSDataService:
             
             end_date = datetime.now().date()
             start_date = end_date - timedelta(days=90)
-            response = self.ce_client.get_cost_and_usage(
-                TimePeriod={'Start': start_date.strftime('%Y-%m-%d'), 'End': end_date.strftime('%Y-%m-%d')},
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[{'Type': 'SERVICE', 'Key': 'SERVICE'}]
-            )
-            services = {}
-            for result in response['ResultsByTime']:
-                for group in result['Groups']:
-                    service = group['Keys'][0]
-                    cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                    services[service] = services.get(service, 0) + cost
-            top_services = sorted(services.items(), key=lambda x: x[1], reverse=True)[:10]
+            # Daily cost per service and account; trends are computed locally and only the
+            # compact facts go into the context
+            request = {
+                'TimePeriod': {'Start': start_date.strftime('%Y-%m-%d'), 'End': end_date.strftime('%Y-%m-%d')},
+                'Granularity': 'DAILY',
+                'Metrics': ['UnblendedCost'],
+                'GroupBy': [{'Type': 'DIMENSION', 'Key': 'SERVICE'}, {'Type': 'DIMENSION', 'Key': 'LINKED_ACCOUNT'}]
+            }
+            results_by_time = []
+            with metrics.span('aws.cost_explorer'):
+                while True:
+                    response = self._breaker('cost_explorer').call(self.ce_client.get_cost_and_usage, **request)
+                    results_by_time.extend(response['ResultsByTime'])
+                    if not response.get('NextPageToken'):
+                        break
+                    request['NextPageToken'] = response['NextPageToken']
             
-            total_cost = sum(services.values())
+            with metrics.span('cost.analytics'):
+                analytics = CostAnalytics.from_results_by_time(results_by_time)
+                top_services = analytics.totals('service')[:10]
+                trends = analytics.facts()
+            total_cost = sum(svc['cost'] for svc in analytics.totals('service'))
             print(f"   ✅ Retrieved real cost data: ${total_cost:,.2f} total spend")
             return {
-                'top_services': [{'service': s[0], 'cost': round(s[1], 2)} for s in top_services],
-                'total_cost': round(sum(services.values()), 2),
+                'top_services': top_services,
+                'total_cost': round(total_cost, 2),
                 'period': f"{start_date} to {end_date}",
+                'trends': trends,
                 'source': 'customer_account' if self.using_customer_account else 'your_account'
             }
         except Exception as e:
             print(f"   ❌ Cost Explorer error: {e}")
             print(f"   ⚠️  Falling back to mock data")
+            metrics.inc('mbr_mock_fallback_total', backend='cost_explorer')
             return self._mock_cost_data()
     
     def get_health_events(self):
         if not self.aws_available:
+            metrics.inc('mbr_mock_fallback_total', backend='health')
             return self._mock_health_events()
         try:
-            response = self.health_client.describe_events(filter={'eventStatusCodes': ['open', 'upcoming']})
+            with metrics.span('aws.health'):
+                response = self._breaker('health').call(self.health_client.describe_events,
+                                                        filter={'eventStatusCodes': ['open', 'upcoming']})
             events = []
             for event in response.get('events', [])[:10]:
                 events.append({
@@ -103,13 +150,17 @@ class AWSDataService:
             return events
         except Exception as e:
             print(f"Health API error: {e}")
+            metrics.inc('mbr_mock_fallback_total', backend='health')
             return self._mock_health_events()
     
     def get_support_cases(self):
         if not self.aws_available:
+            metrics.inc('mbr_mock_fallback_total', backend='support')
             return self._mock_support_cases()
         try:
-            response = self.support_client.describe_cases(includeResolvedCases=False, maxResults=20)
+            with metrics.span('aws.support'):
+                response = self._breaker('support').call(self.support_client.describe_cases,
+                                                         includeResolvedCases=False, maxResults=20)
             cases = []
             for case in response.get('cases', []):
                 cases.append({
@@ -123,8 +174,154 @@ class AWSDataService:
             return cases
         except Exception as e:
             print(f"Support API error: {e}")
+            metrics.inc('mbr_mock_fallback_total', backend='support')
             return self._mock_support_cases()
     
+    def _account_key(self):
+        return self.customer_account_id if self.using_customer_account else 'default'
+    
+    def _breaker(self, backend):
+        return get_breaker(backend, self._account_key())
+    
+    def breaker_states(self):
+        """Circuit breaker state of each AWS backend for this account, for data_sources."""
+        return {backend: self._breaker(backend).snapshot() for backend in AWS_BACKENDS}
+    
+    def get_trusted_advisor(self):
+        """
+        Trusted Advisor check results, summarised per status and category.
+        
+        Every check's result is fetched concurrently on a bounded pool and cached per
+        account for AWS_DATA_CACHE_TTL. Needs Business/Enterprise Support.
+        """
+        if not self.aws_available:
+            metrics.inc('mbr_mock_fallback_total', backend='trusted_advisor')
+            return self._mock_trusted_advisor()
+        try:
+            # The breaker sees one call per collection, so only a failed check listing or a run
+            # where every check failed counts against it
+            return AccountDataCache.get_or_fetch(
+                self._account_key(), 'trusted_advisor',
+                lambda: self._breaker('trusted_advisor').call(self._fetch_trusted_advisor))
+        except Exception as e:
+            print(f"Trusted Advisor error: {e}")
+            metrics.inc('mbr_mock_fallback_total', backend='trusted_advisor')
+            return self._mock_trusted_advisor()
+    
+    def _fetch_trusted_advisor(self):
+        with metrics.span('aws.trusted_advisor.checks'):
+            checks = self.support_client.describe_trusted_advisor_checks(language='en')['checks']
+        
+        def check_result(check):
+            with metrics.span('aws.trusted_advisor.result'):
+                response = self.support_client.describe_trusted_advisor_check_result(checkId=check['id'], language='en')
+            return check, response['result']
+        
+        results, failed = fan_out(check_result, checks, Config.TRUSTED_ADVISOR_WORKERS)
+        if checks and not results:
+            raise RuntimeError(f"all {len(checks)} Trusted Advisor checks failed")
+        
+        status_counts = {}
+        by_category = {}
+        flagged = []
+        total_savings = 0.0
+        for check, result in results:
+            status = result.get('status', 'not_available')
+            status_counts[status] = status_counts.get(status, 0) + 1
+            savings = result.get('categorySpecificSummary', {}).get('costOptimizing', {}).get('estimatedMonthlySavings', 0.0)
+            total_savings += savings
+            if status in ('warning', 'error'):
+                category = by_category.setdefault(check.get('category', 'other'), {'warning': 0, 'error': 0})
+                category[status] += 1
+                flagged.append({
+                    'name': check.get('name'),
+                    'category': check.get('category'),
+                    'status': status,
+                    'flagged_resources': result.get('resourcesSummary', {}).get('resourcesFlagged', 0),
+                    'estimated_monthly_savings': round(savings, 2)
+                })
+        # Red checks first, then the biggest savings, then the most flagged resources
+        flagged.sort(key=lambda c: (c['status'] != 'error', -c['estimated_monthly_savings'], -c['flagged_resources']))
+        print(f"   ✅ Trusted Advisor: {len(results)} checks, {len(flagged)} flagged, "
+              f"${total_savings:,.0f}/month potential savings")
+        return {
+            'checks_evaluated': len(results),
+            'checks_failed': failed,
+            'status_counts': status_counts,
+            'by_category': by_category,
+            'estimated_monthly_savings': round(total_savings, 2),
+            'flagged_checks': flagged[:Config.TRUSTED_ADVISOR_TOP],
+            'source': 'customer_account' if self.using_customer_account else 'your_account'
+        }
+    
+    def get_commitment_coverage(self):
+        """
+        Reserved Instance and Savings Plans coverage and utilization for the last 30 days.
+        
+        The four Cost Explorer calls run concurrently; the result is cached per account
+        for AWS_DATA_CACHE_TTL.
+        """
+        if not self.aws_available:
+            metrics.inc('mbr_mock_fallback_total', backend='commitments')
+            return self._mock_commitment_coverage()
+        try:
+            return AccountDataCache.get_or_fetch(self._account_key(), 'commitments', self._fetch_commitment_coverage)
+        except Exception as e:
+            print(f"RI/Savings Plans coverage error: {e}")
+            metrics.inc('mbr_mock_fallback_total', backend='commitments')
+            return self._mock_commitment_coverage()
+    
+    def _fetch_commitment_coverage(self):
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=30)
+        period = {'Start': start_date.strftime('%Y-%m-%d'), 'End': end_date.strftime('%Y-%m-%d')}
+        calls = {
+            'ri_coverage': self.ce_client.get_reservation_coverage,
+            'ri_utilization': self.ce_client.get_reservation_utilization,
+            'sp_coverage': self.ce_client.get_savings_plans_coverage,
+            'sp_utilization': self.ce_client.get_savings_plans_utilization,
+        }
+        
+        def call(name):
+            with metrics.span(f'aws.{name}'):
+                return name, self._breaker('commitments').call(calls[name], TimePeriod=period)
+        
+        results, failed = fan_out(call, list(calls), len(calls))
+        if not results:
+            raise RuntimeError("all RI/Savings Plans calls failed")
+        responses = dict(results)
+        
+        ri_coverage = responses.get('ri_coverage', {}).get('Total', {})
+        ri_utilization = responses.get('ri_utilization', {}).get('Total', {})
+        sp_coverages = [c.get('Coverage', {}) for c in responses.get('sp_coverage', {}).get('SavingsPlansCoverages', [])]
+        sp_total = responses.get('sp_utilization', {}).get('Total', {})
+        sp_spend = sum(float(c.get('TotalCost', 0)) for c in sp_coverages)
+        sp_covered = sum(float(c.get('SpendCoveredBySavingsPlans', 0)) for c in sp_coverages)
+        
+        def number(value, digits=2):
+            return round(float(value), digits) if value not in (None, '') else None
+        
+        print(f"   ✅ Retrieved RI/Savings Plans coverage ({len(results)}/{len(calls)} calls succeeded)")
+        return {
+            'period': f"{start_date} to {end_date}",
+            'reserved_instances': {
+                'coverage_pct': number(ri_coverage.get('CoverageHours', {}).get('CoverageHoursPercentage'), 1),
+                'on_demand_cost': number(ri_coverage.get('CoverageCost', {}).get('OnDemandCost')),
+                'utilization_pct': number(ri_utilization.get('UtilizationPercentage'), 1),
+                'unused_hours': number(ri_utilization.get('UnusedHours'), 1),
+                'net_savings': number(ri_utilization.get('NetRISavings'))
+            },
+            'savings_plans': {
+                'coverage_pct': round(100 * sp_covered / sp_spend, 1) if sp_spend else None,
+                'on_demand_cost': round(sum(float(c.get('OnDemandCost', 0)) for c in sp_coverages), 2) if sp_coverages else None,
+                'utilization_pct': number(sp_total.get('Utilization', {}).get('UtilizationPercentage'), 1),
+                'unused_commitment': number(sp_total.get('Utilization', {}).get('UnusedCommitment')),
+                'net_savings': number(sp_total.get('Savings', {}).get('NetSavings'))
+            },
+            'calls_failed': failed,
+            'source': 'customer_account' if self.using_customer_account else 'your_account'
+        }
+    
     def _mock_cost_data(self):
         return {
             'top_services': [
@@ -135,13 +332,60 @@ class AWSDataService:
                 {'service': 'Amazon CloudFront', 'cost': 1200.30}
             ],
             'total_cost': 32450.80,
-            'period': 'Last 90 days (MOCK DATA)'
+            'period': 'Last 90 days (MOCK DATA)',
+            'trends': self._mock_cost_trends()
         }
     
+    @staticmethod
+    def _mock_cost_trends():
+        # Synthetic daily series: EC2 steps up ~30% for the last month, S3 has a one-day spike
+        end_date = datetime.now().date()
+        dates = [str(end_date - timedelta(days=90 - day)) for day in range(90)]
+        days = np.arange(90)
+        noise = 1 + 0.02 * np.sin(days * 1.7)
+        daily = np.vstack([
+            150.0 * np.where(days >= 60, 1.3, 1.0) * noise,
+            99.0 * noise,
+            np.where(days == 85, 140.0, 35.0),
+            20.5 * noise,
+        ])
+        services = ['Amazon EC2', 'Amazon RDS', 'Amazon S3', 'AWS Lambda']
+        return CostAnalytics(dates, [(service, 'MOCK') for service in services], daily).facts()
+    
     def _mock_health_events(self):
         return [{'service': 'EC2', 'event_type': 'AWS_EC2_INSTANCE_RETIREMENT_SCHEDULED', 
                  'status': 'upcoming', 'start_time': '2026-03-01', 'region': 'us-east-1'}]
     
+    def _mock_trusted_advisor(self):
+        return {
+            'checks_evaluated': 4,
+            'checks_failed': 0,
+            'status_counts': {'ok': 1, 'warning': 2, 'error': 1},
+            'by_category': {'cost_optimizing': {'warning': 1, 'error': 0}, 'security': {'warning': 0, 'error': 1},
+                            'fault_tolerance': {'warning': 1, 'error': 0}},
+            'estimated_monthly_savings': 2140.0,
+            'flagged_checks': [
+                {'name': 'Security Groups - Specific Ports Unrestricted', 'category': 'security',
+                 'status': 'error', 'flagged_resources': 3, 'estimated_monthly_savings': 0.0},
+                {'name': 'Low Utilization Amazon EC2 Instances', 'category': 'cost_optimizing',
+                 'status': 'warning', 'flagged_resources': 12, 'estimated_monthly_savings': 2140.0},
+                {'name': 'Amazon RDS Backups', 'category': 'fault_tolerance',
+                 'status': 'warning', 'flagged_resources': 2, 'estimated_monthly_savings': 0.0}
+            ],
+            'source': 'mock'
+        }
+    
+    def _mock_commitment_coverage(self):
+        return {
+            'period': 'Last 30 days (MOCK DATA)',
+            'reserved_instances': {'coverage_pct': 42.5, 'on_demand_cost': 6120.0, 'utilization_pct': 88.0,
+                                   'unused_hours': 310.0, 'net_savings': 1830.0},
+            'savings_plans': {'coverage_pct': 55.0, 'on_demand_cost': 4890.0, 'utilization_pct': 97.5,
+                              'unused_commitment': 42.0, 'net_savings': 2210.0},
+            'calls_failed': 0,
+            'source': 'mock'
+        }
+    
     def _mock_support_cases(self):
         return [
             {'case_id': '12345', 'subject': 'RDS performance degradation', 'status': 'opened',
@@ -0,0 +1,223 @@
+import csv
+import json
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import Config
+from services.metrics import metrics
+from services.rate_limiter import RateLimiter
+
+MANIFEST_FIELDS = ('id', 'customer_name', 'presentation', 'customer_account_id',
+                   'audience_type', 'previous_mbr', 'sa_notes')
+
+
+def load_manifest(manifest_path: str) -> List[dict]:
+    """
+    Read a batch manifest from JSON or CSV.
+
+    JSON may be a list of entries or {"entries": [...]}; CSV needs a header row.
+    Each entry needs 'customer_name' and 'presentation'; 'id', 'customer_account_id',
+    'audience_type', 'previous_mbr' and 'sa_notes' are optional. Relative paths are
+    resolved against the manifest's directory.
+
+    Args:
+        manifest_path: Path to a .json or .csv manifest
+
+    Returns:
+        List of normalised entry dicts
+    """
+    if manifest_path.lower().endswith('.csv'):
+        with open(manifest_path, newline='', encoding='utf-8') as f:
+            entries = list(csv.DictReader(f))
+    else:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data.get('entries', []) if isinstance(data, dict) else data
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    return normalise_entries(entries, base_dir)
+
+
+def normalise_entries(entries: List[dict], base_dir: Optional[str] = None) -> List[dict]:
+    """
+    Validate manifest entries and fill in defaults.
+
+    Raises:
+        ValueError: If an entry is missing required fields or has a bad account ID
+    """
+    normalised = []
+    seen_ids = set()
+    for position, raw in enumerate(entries, 1):
+        entry = {field: (str(raw[field]).strip() if raw.get(field) not in (None, '') else None)
+                 for field in MANIFEST_FIELDS}
+        if not entry['customer_name'] or not entry['presentation']:
+            raise ValueError(f"Manifest entry {position} needs customer_name and presentation")
+
+        account_id = entry['customer_account_id']
+        if account_id and (not account_id.isdigit() or len(account_id) != 12):
+            raise ValueError(f"Manifest entry {position}: customer_account_id must be exactly 12 digits")
+
+        entry['audience_type'] = entry['audience_type'] or 'technical'
+        for field in ('presentation', 'previous_mbr', 'sa_notes'):
+            if entry[field] and base_dir and not os.path.isabs(entry[field]):
+                entry[field] = os.path.join(base_dir, entry[field])
+
+        job_id = entry['id'] or f"{position:03d}_{re.sub(r'[^A-Za-z0-9]+', '_', entry['customer_name']).strip('_')}"
+        if job_id in seen_ids:
+            raise ValueError(f"Duplicate manifest id: {job_id}")
+        seen_ids.add(job_id)
+        entry['id'] = job_id
+        normalised.append(entry)
+    return normalised
+
+
+class BatchRunner:
+    """Run many MBRs through PresentationAgent concurrently, with resumable checkpoints."""
+
+    def __init__(self, entries: List[dict], output_dir: str, workers: Optional[int] = None,
+                 llm_rate: Optional[float] = None, resume: bool = True, worker_pool=None,
+                 outlook_account_id: Optional[str] = None):
+        """
+        Args:
+            entries: Normalised manifest entries (see load_manifest)
+            output_dir: Directory for per-customer outputs and the checkpoint file
+            workers: Concurrent pipeline runs (defaults to Config.BATCH_WORKERS)
+            llm_rate: Bedrock calls/second for this batch across all its workers; applied by a
+                limiter the batch owns, on top of the process-wide LLM_RATE_LIMIT
+            resume: Skip entries already recorded as completed in the checkpoint
+            worker_pool: Optional WarmWorkerPool to run entries in, so they use separate cores
+            outlook_account_id: Signed-in user whose mailbox is searched (None = mock email data)
+        """
+        self.entries = entries
+        self.output_dir = output_dir
+        self.workers = max(1, workers or Config.BATCH_WORKERS)
+        self.resume = resume
+        self.llm_rate = llm_rate
+        self.worker_pool = worker_pool
+        self.outlook_account_id = outlook_account_id
+        self.checkpoint_path = os.path.join(output_dir, 'batch_checkpoint.json')
+        self.lock = threading.Lock()
+        self.rate_limiter = RateLimiter(llm_rate, Config.LLM_RATE_BURST) if llm_rate else None
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.checkpoint = self._load_checkpoint() if resume else {}
+        self.checkpoint.setdefault('jobs', {})
+
+    def _load_checkpoint(self) -> dict:
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, job_id: str, record: dict):
+        """Update one job in the checkpoint and write it atomically."""
+        with self.lock:
+            self.checkpoint['jobs'][job_id] = record
+            self.checkpoint['updated'] = datetime.now().isoformat()
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.checkpoint, f, indent=2)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def pending_entries(self) -> List[dict]:
+        """Entries not yet completed according to the checkpoint."""
+        done = {job_id for job_id, job in self.checkpoint['jobs'].items() if job.get('status') == 'completed'}
+        return [entry for entry in self.entries if entry['id'] not in done]
+
+    def _run_entry(self, entry: dict) -> dict:
+        job_dir = os.path.join(self.output_dir, entry['id'])
+        os.makedirs(job_dir, exist_ok=True)
+        uploaded_files = {key: entry[key] for key in ('previous_mbr', 'sa_notes') if entry[key]}
+
+        self._record(entry['id'], {'status': 'running', 'customer_name': entry['customer_name'],
+                                   'started': datetime.now().isoformat()})
+        started = time.perf_counter()
+        job = {
+            'pptx_path': entry['presentation'],
+            'customer_name': entry['customer_name'],
+            'audience_type': entry['audience_type'],
+            'uploaded_files': uploaded_files,
+            'output_dir': job_dir
+        }
+        if self.worker_pool is not None:
+            results = self.worker_pool.run_job(customer_account_id=entry['customer_account_id'],
+                                               llm_rate=self.llm_rate,
+                                               outlook_account_id=self.outlook_account_id, **job)
+        else:
+            # Imported here so loading the batch API doesn't pull in the pipeline's dependencies
+            from services.presentation_agent import PresentationAgent
+            agent = PresentationAgent(customer_account_id=entry['customer_account_id'],
+                                      outlook_account_id=self.outlook_account_id,
+                                      rate_limiter=self.rate_limiter)
+            results = agent.process_presentation(**job)
+        return {
+            'status': 'completed',
+            'customer_name': entry['customer_name'],
+            'finished': datetime.now().isoformat(),
+            'seconds': round(time.perf_counter() - started, 2),
+            'presentation': results['presentation'],
+            'summary': results['summary'],
+            'questions': results['questions'],
+            'llm_calls': results.get('llm_calls'),
+            'timings': results.get('timings')
+        }
+
+    def run(self) -> dict:
+        """
+        Process every pending entry and return a summary.
+
+        Returns:
+            Dict with 'completed', 'failed', 'skipped' counts, wall time and per-job records
+        """
+        pending = self.pending_entries()
+        skipped = len(self.entries) - len(pending)
+        print(f"\n=== Batch: {len(pending)} to run, {skipped} already completed, {self.workers} workers ===\n")
+
+        started = time.perf_counter()
+        completed = failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='mbr-batch') as pool:
+            futures = {pool.submit(self._run_entry, entry): entry for entry in pending}
+            for future in as_completed(futures):
+                entry = futures[future]
+                try:
+                    record = future.result()
+                    completed += 1
+                    metrics.inc('mbr_batch_jobs_total', outcome='completed')
+                    print(f"✅ [{entry['id']}] {entry['customer_name']} done in {record['seconds']}s")
+                except Exception as e:
+                    record = {'status': 'failed', 'customer_name': entry['customer_name'],
+                              'finished': datetime.now().isoformat(), 'error': str(e),
+                              'traceback': traceback.format_exc(limit=5)}
+                    failed += 1
+                    metrics.inc('mbr_batch_jobs_total', outcome='failed')
+                    print(f"❌ [{entry['id']}] {entry['customer_name']} failed: {e}")
+                self._record(entry['id'], record)
+
+        summary = {
+            'completed': completed,
+            'failed': failed,
+            'skipped': skipped,
+            'workers': self.workers,
+            'seconds': round(time.perf_counter() - started, 2),
+            'checkpoint': self.checkpoint_path,
+            'jobs': dict(self.checkpoint['jobs'])
+        }
+        print(f"\n=== Batch complete: {completed} completed, {failed} failed, {skipped} skipped "
+              f"in {summary['seconds']}s ===")
+        return summary
+
+
+def batch_status(output_dir: str) -> Dict[str, dict]:
+    """Read the checkpoint of a batch run (used for status polling)."""
+    try:
+        with open(os.path.join(output_dir, 'batch_checkpoint.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
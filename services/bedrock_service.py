@@ -1,19 +1,69 @@
-import boto3
 import json
+import threading
+import time
 from config import Config
+from services.model_router import ModelRouter
+from services.client_pool import get_client
+from services.metrics import metrics
+from services.rate_limiter import llm_rate_limiter
 
 class BedrockService:
-    def __init__(self):
+    def __init__(self, customer_name=None, router=None, rate_limiter=None):
+        """
+        Initialize Bedrock Service.
+        
+        Args:
+            customer_name: Optional customer, for per-customer model routing
+            router: Optional ModelRouter (defaults to one built from Config)
+            rate_limiter: Optional extra RateLimiter for this job's calls (e.g. a batch's
+                --llm-rate); the process-wide LLM_RATE_LIMIT always applies as well
+        """
+        self.call_count = 0
+        self.customer_name = customer_name
+        self.router = router or ModelRouter()
+        self.rate_limiter = rate_limiter
+        self.usage_by_model = {}
+        self._usage_lock = threading.Lock()
+        self._last_call = threading.local()
         try:
-            self.client = boto3.client('bedrock-runtime', region_name=Config.AWS_REGION)
+            # BEDROCK_ENDPOINT_URL points the client at a local stand-in (see services/bedrock_stub.py)
+            self.client = get_client('bedrock-runtime', Config.AWS_REGION,
+                                     endpoint_url=Config.BEDROCK_ENDPOINT_URL)
             self.model_id = Config.BEDROCK_MODEL_ID
             self.bedrock_available = True
         except Exception as e:
             print(f"Bedrock client initialization failed: {e}. Using mock responses.")
             self.bedrock_available = False
     
-    def invoke_claude(self, prompt, system_prompt=None, max_tokens=4096):
+    def _record_usage(self, model_id, input_tokens, output_tokens, seconds):
+        """Accumulate per-model calls, tokens, latency and estimated cost for this service."""
+        cost = self.router.cost(model_id, input_tokens, output_tokens)
+        self._last_call.cost = cost
+        metrics.inc('mbr_llm_cost_usd_total', cost, model=model_id)
+        with self._usage_lock:
+            usage = self.usage_by_model.setdefault(model_id, {
+                'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'seconds': 0.0, 'cost_usd': 0.0})
+            usage['calls'] += 1
+            usage['input_tokens'] += input_tokens
+            usage['output_tokens'] += output_tokens
+            usage['seconds'] = round(usage['seconds'] + seconds, 4)
+            usage['cost_usd'] = round(usage['cost_usd'] + cost, 6)
+    
+    def usage_summary(self):
+        """JSON-serialisable copy of per-model usage, e.g. for the results page."""
+        with self._usage_lock:
+            return {model_id: dict(usage) for model_id, usage in self.usage_by_model.items()}
+    
+    def last_call_cost(self):
+        """Estimated USD cost of the most recent invoke_claude on this thread (0 for mock responses)."""
+        return getattr(self._last_call, 'cost', 0.0)
+    
+    def invoke_claude(self, prompt, system_prompt=None, max_tokens=4096, task='default'):
+        self._last_call.cost = 0.0
+        with self._usage_lock:
+            self.call_count += 1
         if not self.bedrock_available:
+            metrics.inc('mbr_mock_fallback_total', backend='bedrock')
             return self._mock_response(prompt)
         
         messages = [{"role": "user", "content": prompt}]
@@ -25,15 +75,33 @@ class BedrockService:
         if system_prompt:
             body["system"] = system_prompt
         
+        model_id = self.router.model_for(task, self.customer_name)
         try:
-            response = self.client.invoke_model(modelId=self.model_id, body=json.dumps(body))
-            response_body = json.loads(response['body'].read())
+            waited = llm_rate_limiter.acquire()
+            if self.rate_limiter is not None:
+                waited += self.rate_limiter.acquire()
+            if waited:
+                metrics.observe('mbr_rate_limit_wait_seconds', waited, limiter='llm')
+            started = time.perf_counter()
+            with metrics.span('bedrock.invoke_model', model=model_id, task=task):
+                response = self.client.invoke_model(modelId=model_id, body=json.dumps(body))
+                response_body = json.loads(response['body'].read())
+            usage = response_body.get('usage', {})
+            input_tokens = usage.get('input_tokens', 0)
+            output_tokens = usage.get('output_tokens', 0)
+            metrics.inc('mbr_llm_calls_total', model=model_id, outcome='ok')
+            metrics.inc('mbr_llm_tokens_total', input_tokens, model=model_id, direction='input')
+            metrics.inc('mbr_llm_tokens_total', output_tokens, model=model_id, direction='output')
+            self._record_usage(model_id, input_tokens, output_tokens, time.perf_counter() - started)
             return response_body['content'][0]['text']
         except Exception as e:
             print(f"Bedrock error: {e}. Using mock response.")
+            metrics.inc('mbr_llm_calls_total', model=model_id, outcome='error')
+            metrics.inc('mbr_mock_fallback_total', backend='bedrock')
             return self._mock_response(prompt)
     
-    def _mock_response(self, prompt):
+    @staticmethod
+    def _mock_response(prompt):
         prompt_lower = prompt.lower()
         
         # Customer analysis
@@ -178,16 +246,18 @@ MBR Focus Areas:
 Context: {json.dumps(context_data, indent=2)}
 
 Return structured JSON analysis."""
-        return self.invoke_claude(prompt, "You are an AWS TAM assistant analyzing customer data for MBRs.")
+        return self.invoke_claude(prompt, "You are an AWS TAM assistant analyzing customer data for MBRs.",
+                                  task='analysis')
     
-    def generate_talking_points(self, slide_content, customer_context):
+    def generate_talking_points(self, slide_content, customer_context, notes_excerpt=None):
+        notes_section = f"\nRelevant notes:\n{notes_excerpt}\n" if notes_excerpt else ""
         prompt = f"""Generate 3-5 concise talking points for this slide based on customer context.
 
 Slide: {slide_content}
 Customer: {customer_context}
-
+{notes_section}
 Return bulleted list only."""
-        return self.invoke_claude(prompt, max_tokens=1000)
+        return self.invoke_claude(prompt, max_tokens=1000, task='talking_points')
     
     def generate_questions(self, customer_analysis):
         prompt = f"""Generate 5-7 high-value open-ended questions for TAM to ask during MBR.
@@ -196,7 +266,7 @@ Analysis: {customer_analysis}
 
 Focus on: future plans, optimization, new use cases, concerns.
 Return numbered list."""
-        return self.invoke_claude(prompt, max_tokens=1500)
+        return self.invoke_claude(prompt, max_tokens=1500, task='questions')
     
     def assess_slide_relevance(self, slide_title, slide_content, customer_priorities):
         prompt = f"""Rate slide relevance (1-10):
@@ -209,7 +279,7 @@ Content: {slide_content}
 Customer: {customer_priorities}
 
 Format: SCORE|EXPLANATION"""
-        response = self.invoke_claude(prompt, max_tokens=200)
+        response = self.invoke_claude(prompt, max_tokens=200, task='relevance')
         if response and '|' in response:
             parts = response.split('|', 1)
             try:
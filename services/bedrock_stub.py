@@ -0,0 +1,351 @@
+"""
+Local stand-in for the bedrock-runtime API, for offline load testing.
+
+Speaks the InvokeModel and InvokeModelWithResponseStream wire protocols
+(Anthropic messages bodies, AWS event-stream framing), answers with the same
+canned text as BedrockService's mock mode, and adds configurable latency,
+throttling and token accounting.
+
+Run it, then point the app at it:
+
+    python -m services.bedrock_stub --port 8765 --latency lognormal:1.5,0.4 --throttle-rate 0.02
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8765 AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub python app.py
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import math
+import random
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import unquote
+
+from services.bedrock_service import BedrockService
+from services.extraction_cache import CHARS_PER_TOKEN
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token)."""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN)) if text else 0
+
+
+class LatencyModel:
+    """
+    Samples request latency in seconds from a distribution spec.
+
+    Specs:
+        fixed:SECONDS
+        uniform:LOW,HIGH
+        normal:MEAN,STDDEV
+        lognormal:MEDIAN,SIGMA
+    """
+
+    def __init__(self, spec: str = 'fixed:0', seed: Optional[int] = None):
+        kind, _, params = spec.partition(':')
+        self.kind = kind
+        self.params = [float(p) for p in params.split(',')] if params else [0.0]
+        if kind not in ('fixed', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self.lock:
+            if self.kind == 'fixed':
+                value = self.params[0]
+            elif self.kind == 'uniform':
+                value = self.rng.uniform(self.params[0], self.params[1])
+            elif self.kind == 'normal':
+                value = self.rng.gauss(self.params[0], self.params[1])
+            else:
+                value = self.rng.lognormvariate(math.log(self.params[0]), self.params[1])
+        return max(0.0, value)
+
+
+def encode_event(headers: dict, payload: bytes) -> bytes:
+    """
+    Frame one message in the AWS event-stream binary format.
+
+    Layout: total length, headers length, prelude CRC, headers, payload, message CRC.
+    All header values are encoded as strings (type 7).
+    """
+    header_bytes = b''
+    for name, value in headers.items():
+        name_bytes = name.encode('utf-8')
+        value_bytes = value.encode('utf-8')
+        header_bytes += (bytes([len(name_bytes)]) + name_bytes + bytes([7])
+                         + struct.pack('>H', len(value_bytes)) + value_bytes)
+
+    total_length = 12 + len(header_bytes) + len(payload) + 4
+    prelude = struct.pack('>II', total_length, len(header_bytes))
+    message = prelude + struct.pack('>I', binascii.crc32(prelude) & 0xffffffff) + header_bytes + payload
+    return message + struct.pack('>I', binascii.crc32(message) & 0xffffffff)
+
+
+class StubStats:
+    """Thread-safe request, throttle, token and latency accounting."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.throttled = 0
+            self.in_flight = 0
+            self.by_model = {}
+            self.latencies = []
+
+    def record(self, model_id: str, input_tokens: int, output_tokens: int, latency: float):
+        with self.lock:
+            model = self.by_model.setdefault(model_id, {'requests': 0, 'input_tokens': 0, 'output_tokens': 0})
+            model['requests'] += 1
+            model['input_tokens'] += input_tokens
+            model['output_tokens'] += output_tokens
+            self.latencies.append(latency)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+
+            def pct(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4) if latencies else 0
+
+            return {
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'in_flight': self.in_flight,
+                'input_tokens': sum(m['input_tokens'] for m in self.by_model.values()),
+                'output_tokens': sum(m['output_tokens'] for m in self.by_model.values()),
+                'by_model': json.loads(json.dumps(self.by_model)),
+                'latency_p50': pct(0.50),
+                'latency_p95': pct(0.95),
+                'latency_max': latencies[-1] if latencies else 0
+            }
+
+
+class BedrockStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('x-amzn-RequestId', str(uuid.uuid4()))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, error_type: str, message: str):
+        self._send_json(status, {'message': message}, {'x-amzn-ErrorType': error_type})
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._send_json(200, self.server.stats.snapshot())
+        else:
+            self._send_error(404, 'ResourceNotFoundException', f"Unknown path {self.path}")
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw_body = self.rfile.read(length) if length else b''
+
+        if self.path == '/stats/reset':
+            self.server.stats.reset()
+            self._send_json(200, {'reset': True})
+            return
+
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] != 'model' or parts[2] not in ('invoke', 'invoke-with-response-stream'):
+            self._send_error(404, 'ResourceNotFoundException', f"Unknown path {self.path}")
+            return
+        model_id = unquote(parts[1])
+        streaming = parts[2] == 'invoke-with-response-stream'
+
+        try:
+            body = json.loads(raw_body or b'{}')
+        except ValueError:
+            self._send_error(400, 'ValidationException', 'Malformed input request')
+            return
+
+        stats = self.server.stats
+        with stats.lock:
+            stats.requests += 1
+            throttle = (self.server.throttle_rate and random.random() < self.server.throttle_rate) or \
+                (self.server.max_concurrency and stats.in_flight >= self.server.max_concurrency)
+            if throttle:
+                stats.throttled += 1
+            else:
+                stats.in_flight += 1
+        if throttle:
+            self._send_error(429, 'ThrottlingException', 'Too many requests, please wait before trying again.')
+            return
+
+        try:
+            self._respond(model_id, body, streaming)
+        finally:
+            with stats.lock:
+                stats.in_flight -= 1
+
+    def _respond(self, model_id: str, body: dict, streaming: bool):
+        started = time.monotonic()
+        prompt = ''.join(
+            block.get('text', '') if isinstance(block, dict) else str(block)
+            for message in body.get('messages', [])
+            for block in (message.get('content') if isinstance(message.get('content'), list)
+                          else [message.get('content', '')])
+        )
+        system = body.get('system', '')
+        text = BedrockService._mock_response(prompt)
+        max_tokens = body.get('max_tokens', 4096)
+        text = text[:max_tokens * CHARS_PER_TOKEN]
+
+        input_tokens = count_tokens(system) + count_tokens(prompt)
+        output_tokens = count_tokens(text)
+
+        time.sleep(self.server.latency.sample())
+
+        if streaming:
+            self._stream(model_id, text, input_tokens, output_tokens, started)
+        else:
+            latency_ms = int((time.monotonic() - started) * 1000)
+            self._send_json(200, {
+                'id': f"msg_stub_{uuid.uuid4().hex[:16]}",
+                'type': 'message',
+                'role': 'assistant',
+                'model': model_id,
+                'content': [{'type': 'text', 'text': text}],
+                'stop_reason': 'end_turn',
+                'stop_sequence': None,
+                'usage': {'input_tokens': input_tokens, 'output_tokens': output_tokens}
+            }, {
+                'X-Amzn-Bedrock-Input-Token-Count': str(input_tokens),
+                'X-Amzn-Bedrock-Output-Token-Count': str(output_tokens),
+                'X-Amzn-Bedrock-Invocation-Latency': str(latency_ms)
+            })
+
+        self.server.stats.record(model_id, input_tokens, output_tokens, time.monotonic() - started)
+
+    def _stream(self, model_id: str, text: str, input_tokens: int, output_tokens: int, started: float):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.amazon.eventstream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('x-amzn-RequestId', str(uuid.uuid4()))
+        self.end_headers()
+
+        def send(event: dict):
+            payload = json.dumps({'bytes': base64.b64encode(json.dumps(event).encode('utf-8')).decode('ascii')})
+            frame = encode_event({
+                ':event-type': 'chunk',
+                ':content-type': 'application/json',
+                ':message-type': 'event'
+            }, payload.encode('utf-8'))
+            self.wfile.write(f"{len(frame):x}\r\n".encode('ascii') + frame + b"\r\n")
+            self.wfile.flush()
+
+        send({'type': 'message_start', 'message': {
+            'id': f"msg_stub_{uuid.uuid4().hex[:16]}", 'type': 'message', 'role': 'assistant',
+            'model': model_id, 'content': [], 'stop_reason': None,
+            'usage': {'input_tokens': input_tokens, 'output_tokens': 0}}})
+        send({'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}})
+
+        chunk_chars = CHARS_PER_TOKEN * 4
+        for offset in range(0, len(text), chunk_chars):
+            if self.server.token_latency:
+                time.sleep(self.server.token_latency * 4)
+            send({'type': 'content_block_delta', 'index': 0,
+                  'delta': {'type': 'text_delta', 'text': text[offset:offset + chunk_chars]}})
+
+        latency_ms = int((time.monotonic() - started) * 1000)
+        send({'type': 'content_block_stop', 'index': 0})
+        send({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+              'usage': {'output_tokens': output_tokens}})
+        send({'type': 'message_stop', 'amazon-bedrock-invocationMetrics': {
+            'inputTokenCount': input_tokens, 'outputTokenCount': output_tokens,
+            'invocationLatency': latency_ms, 'firstByteLatency': latency_ms}})
+
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class BedrockStubServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stub's latency, throttling and stats settings."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: str = 'fixed:0',
+                 token_latency: float = 0.0, throttle_rate: float = 0.0, max_concurrency: int = 0,
+                 seed: Optional[int] = None, verbose: bool = False):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Per-request latency distribution spec (see LatencyModel)
+            token_latency: Extra seconds per output token when streaming
+            throttle_rate: Probability of answering with ThrottlingException
+            max_concurrency: Throttle requests beyond this many in flight (0 = unlimited)
+            seed: Random seed for reproducible latency samples
+            verbose: Log each request
+        """
+        super().__init__((host, port), BedrockStubHandler)
+        self.latency = LatencyModel(latency, seed)
+        self.token_latency = token_latency
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.verbose = verbose
+        self.stats = StubStats()
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start_background(self) -> threading.Thread:
+        """Serve from a daemon thread and return it."""
+        thread = threading.Thread(target=self.serve_forever, name='bedrock-stub', daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local bedrock-runtime stand-in for load testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='lognormal:1.5,0.4',
+                        help='fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--token-latency', type=float, default=0.0,
+                        help='Extra seconds per output token when streaming')
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--max-concurrency', type=int, default=0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = BedrockStubServer(args.host, args.port, args.latency, args.token_latency,
+                               args.throttle_rate, args.max_concurrency, args.seed, args.verbose)
+    print(f"Bedrock stub listening on {server.endpoint_url}")
+    print(f"Set BEDROCK_ENDPOINT_URL={server.endpoint_url} (plus any dummy AWS credentials)")
+    print(f"Token accounting: GET {server.endpoint_url}/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats.snapshot(), indent=2))
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
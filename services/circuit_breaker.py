@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config import Config
+from services.metrics import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one backend, shared by every job in the process.
+
+    After failure_threshold failures in a row the breaker opens and calls fail immediately
+    with CircuitOpenError, so callers go straight to their fallback. Once reset_timeout has
+    passed a single probe call is let through: success closes the breaker, failure re-opens it.
+    """
+
+    def __init__(self, backend: str, account: str = 'default',
+                 failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        """
+        Args:
+            backend: Backend name used in metrics and data_sources (e.g. 'cost_explorer')
+            account: Account the calls run as, since permissions differ per assumed role
+            failure_threshold: Failures in a row that open the breaker (defaults to Config.BREAKER_FAILURE_THRESHOLD)
+            reset_timeout: Seconds an open breaker waits before probing (defaults to Config.BREAKER_RESET_SECONDS)
+        """
+        self.backend = backend
+        self.account = account
+        self.failure_threshold = max(1, failure_threshold or Config.BREAKER_FAILURE_THRESHOLD)
+        self.reset_timeout = Config.BREAKER_RESET_SECONDS if reset_timeout is None else reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error = None
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def _transition(self, state: str):
+        self.state = state
+        metrics.inc('mbr_circuit_breaker_transitions_total', backend=self.backend, state=state)
+        print(f"   🔌 {self.backend} circuit {state.replace('_', '-')} ({self.account})")
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now (claims the probe when half-open)."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.probing = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)[:200]
+            self.probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def call(self, fn: Callable, *args, is_failure: Optional[Callable[[Exception], bool]] = None, **kwargs):
+        """
+        Call fn through the breaker.
+
+        Args:
+            is_failure: Decides whether an exception from fn means the backend is unhealthy
+                (default: every exception). Errors it rejects, e.g. one caller's expired
+                token, are re-raised but count as the backend answering.
+
+        Raises:
+            CircuitOpenError: The backend is failing and was not called
+        """
+        if not self.allow():
+            metrics.inc('mbr_circuit_breaker_rejections_total', backend=self.backend)
+            raise CircuitOpenError(f"{self.backend} circuit open after {self.failures} failures: {self.last_error}")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure(e)
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        """JSON-serialisable state for data_sources."""
+        with self.lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'retry_in_seconds': retry_in
+            }
+
+
+_breakers: Dict[tuple, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_breaker(backend: str, account: Optional[str] = None) -> CircuitBreaker:
+    """Return the process-wide breaker for a backend and account, creating it on first use."""
+    key = (backend, account or 'default')
+    with _lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(backend, key[1])
+        return breaker
+
+
+def clear():
+    """Forget all breakers (e.g. after credentials change)."""
+    with _lock:
+        _breakers.clear()
@@ -0,0 +1,62 @@
+import threading
+from typing import Optional
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+from config import Config
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def fast_fail_config() -> BotoConfig:
+    """
+    Botocore config for the AWS data APIs: short connect/read timeouts and a small
+    standard-mode retry budget, so a slow or denied endpoint reaches its fallback quickly.
+    """
+    return BotoConfig(
+        connect_timeout=Config.AWS_CONNECT_TIMEOUT,
+        read_timeout=Config.AWS_READ_TIMEOUT,
+        retries={'max_attempts': Config.AWS_MAX_ATTEMPTS, 'mode': 'standard'},
+        max_pool_connections=Config.AWS_MAX_POOL_CONNECTIONS
+    )
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, endpoint_url: Optional[str] = None,
+               fast_fail: bool = False):
+    """
+    Return a process-wide boto3 client for the default credentials.
+
+    boto3 clients are thread-safe, so concurrent pipeline runs share one client
+    (and its HTTP connection pool) per service/region/endpoint instead of each
+    paying client construction and TLS setup again.
+
+    Args:
+        service_name: boto3 service name (e.g. 'bedrock-runtime', 'ce')
+        region_name: AWS region (defaults to Config.AWS_REGION)
+        endpoint_url: Optional endpoint override
+        fast_fail: Use fast_fail_config() timeouts and retries (for data APIs, not Bedrock)
+
+    Returns:
+        Shared boto3 client
+    """
+    region_name = region_name or Config.AWS_REGION
+    key = (service_name, region_name, endpoint_url, fast_fail)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = boto3.client(
+                service_name,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=fast_fail_config() if fast_fail else BotoConfig(max_pool_connections=Config.AWS_MAX_POOL_CONNECTIONS)
+            )
+            _clients[key] = client
+        return client
+
+
+def clear():
+    """Drop all cached clients (e.g. after credentials change)."""
+    with _lock:
+        _clients.clear()
@@ -1,17 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 from services.aws_data_service import AWSDataService
 from services.outlook_service import OutlookService
 from services.pdf_extractor import PDFExtractor
+from services.office_extractor import OfficeExtractor
+from services.extraction_cache import resolve_budget
+from services.notes_index import DOCUMENT_EXTRACTION_FAILED, PDF_EXTRACTION_FAILED, UNSUPPORTED_FILE_TYPE
 
 class ContextGatherer:
-    def __init__(self, customer_account_id=None):
+    def __init__(self, customer_account_id=None, outlook_account_id=None):
         """
         Initialize Context Gatherer.
         
         Args:
             customer_account_id: Optional customer AWS account ID for role assumption
+            outlook_account_id: MSAL home_account_id of the signed-in user whose mailbox is searched
         """
         self.aws_service = AWSDataService(customer_account_id=customer_account_id)
-        self.outlook_service = OutlookService()
+        self.outlook_service = OutlookService(account_id=outlook_account_id)
     
     def gather_all_context(self, customer_name, uploaded_files):
         context = {
@@ -22,19 +28,28 @@ class ContextGatherer:
             'summary': ''
         }
         
-        print("Gathering AWS Cost Explorer data...")
-        context['aws_data']['costs'] = self.aws_service.get_cost_data()
-        
-        print("Gathering AWS Health events...")
-        context['aws_data']['health_events'] = self.aws_service.get_health_events()
-        
-        print("Gathering Support cases...")
-        context['aws_data']['support_cases'] = self.aws_service.get_support_cases()
-        
-        print("Searching Outlook emails...")
-        context['email_data'] = self.outlook_service.search_customer_emails(customer_name)
+        # The collectors talk to different backends, so fetch them all at once; the
+        # uploaded notes are extracted meanwhile on this thread
+        collectors = {
+            'costs': ("Gathering AWS Cost Explorer data...", self.aws_service.get_cost_data),
+            'health_events': ("Gathering AWS Health events...", self.aws_service.get_health_events),
+            'support_cases': ("Gathering Support cases...", self.aws_service.get_support_cases),
+            'trusted_advisor': ("Gathering Trusted Advisor checks...", self.aws_service.get_trusted_advisor),
+            'commitments': ("Gathering RI/Savings Plans coverage...", self.aws_service.get_commitment_coverage),
+            'emails': ("Searching Outlook emails...", lambda: self.outlook_service.search_customer_emails(customer_name)),
+        }
+        with ThreadPoolExecutor(max_workers=len(collectors), thread_name_prefix='mbr-context') as pool:
+            futures = {}
+            for name, (message, collect) in collectors.items():
+                print(message)
+                futures[name] = pool.submit(contextvars.copy_context().run, collect)
+            context['uploaded_notes'] = self._process_uploaded_files(uploaded_files)
+            for name, future in futures.items():
+                if name == 'emails':
+                    context['email_data'] = future.result()
+                else:
+                    context['aws_data'][name] = future.result()
         
-        context['uploaded_notes'] = self._process_uploaded_files(uploaded_files)
         context['summary'] = self._create_context_summary(context)
         
         return context
@@ -47,16 +62,23 @@ class ContextGatherer:
             try:
                 if filepath.endswith('.txt'):
                     with open(filepath, 'r', encoding='utf-8') as f:
-                        notes[file_type] = f.read()
+                        notes[file_type] = f.read(resolve_budget() or -1)
                 elif filepath.endswith('.pdf'):
                     # Extract text from PDF
                     extracted_text = PDFExtractor.extract_text(filepath)
                     if extracted_text:
                         notes[file_type] = extracted_text
                     else:
-                        notes[file_type] = "[PDF extraction failed or empty]"
+                        notes[file_type] = PDF_EXTRACTION_FAILED
+                elif filepath.endswith(('.docx', '.pptx')):
+                    # Stream text out of the Office XML parts
+                    extracted_text = OfficeExtractor.extract_text(filepath)
+                    if extracted_text:
+                        notes[file_type] = extracted_text
+                    else:
+                        notes[file_type] = DOCUMENT_EXTRACTION_FAILED
                 else:
-                    notes[file_type] = "[File type not yet supported for extraction]"
+                    notes[file_type] = UNSUPPORTED_FILE_TYPE
             except Exception as e:
                 notes[file_type] = f"[Error: {e}]"
         return notes
@@ -69,6 +91,11 @@ class ContextGatherer:
             summary += "Top Services:\n"
             for svc in costs.get('top_services', [])[:5]:
                 summary += f"  - {svc['service']}: ${svc['cost']:,.2f}\n"
+            highlights = costs.get('trends', {}).get('highlights', [])
+            if highlights:
+                summary += "Cost Trends:\n"
+                for line in highlights:
+                    summary += f"  - {line}\n"
             summary += "\n"
         
         health = context['aws_data'].get('health_events', [])
@@ -85,6 +112,26 @@ class ContextGatherer:
                 summary += f"  - {case['subject']} ({case['severity']})\n"
             summary += "\n"
         
+        advisor = context['aws_data'].get('trusted_advisor', {})
+        if advisor:
+            counts = advisor.get('status_counts', {})
+            summary += (f"Trusted Advisor: {counts.get('error', 0)} red, {counts.get('warning', 0)} yellow of "
+                        f"{advisor.get('checks_evaluated', 0)} checks, "
+                        f"${advisor.get('estimated_monthly_savings', 0):,.0f}/month potential savings\n")
+            for check in advisor.get('flagged_checks', [])[:3]:
+                summary += f"  - {check['name']} ({check['status']}, {check['flagged_resources']} resources)\n"
+            summary += "\n"
+        
+        commitments = context['aws_data'].get('commitments', {})
+        if commitments:
+            for label, key in (("Reserved Instances", 'reserved_instances'), ("Savings Plans", 'savings_plans')):
+                data = commitments.get(key, {})
+                if data.get('coverage_pct') is not None or data.get('utilization_pct') is not None:
+                    coverage = f"{data['coverage_pct']:.0f}%" if data.get('coverage_pct') is not None else 'n/a'
+                    utilization = f"{data['utilization_pct']:.0f}%" if data.get('utilization_pct') is not None else 'n/a'
+                    summary += f"{label}: {coverage} coverage, {utilization} utilization\n"
+            summary += "\n"
+        
         emails = context.get('email_data', [])
         if emails:
             summary += f"Recent Emails: {len(emails)}\n"
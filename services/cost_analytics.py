@@ -0,0 +1,207 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import Config
+
+# Daily averages are scaled to this many days to compare full and partial months
+DAYS_PER_MONTH = 30.4
+
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+class CostAnalytics:
+    """
+    Trend and anomaly facts from daily Cost Explorer data.
+
+    Daily costs are held as a (series x day) matrix, one row per (service, account) pair.
+    Service, account and grand-total rows are added by multiplying with 0/1 membership
+    matrices, and month-over-month deltas, rolling averages and trailing-baseline z-scores
+    are then computed for every row at once. facts() turns the results into a compact,
+    JSON-serialisable summary that goes into the LLM context instead of the raw data.
+    """
+
+    def __init__(self, dates: Sequence[str], keys: Sequence[Tuple[str, str]], costs,
+                 rolling_days: Optional[int] = None, baseline_days: Optional[int] = None,
+                 z_threshold: Optional[float] = None, min_daily_cost: Optional[float] = None):
+        """
+        Args:
+            dates: ISO dates, one per column of costs
+            keys: (service, account) for each row of costs
+            costs: Array-like of shape (len(keys), len(dates)) with daily cost
+            rolling_days: Window for rolling daily averages (defaults to Config.COST_ROLLING_DAYS)
+            baseline_days: Trailing days each z-score is measured against (defaults to Config.COST_BASELINE_DAYS)
+            z_threshold: |z| at which a day is an anomaly (defaults to Config.COST_ANOMALY_Z)
+            min_daily_cost: Ignore anomalies where both actual and expected cost are below this
+                (defaults to Config.COST_ANOMALY_MIN_DAILY)
+        """
+        self.dates = np.array(dates, dtype='datetime64[D]')
+        self.keys = [tuple(key) for key in keys]
+        self.rolling_days = rolling_days or Config.COST_ROLLING_DAYS
+        self.baseline_days = baseline_days or Config.COST_BASELINE_DAYS
+        self.z_threshold = z_threshold or Config.COST_ANOMALY_Z
+        self.min_daily_cost = Config.COST_ANOMALY_MIN_DAILY if min_daily_cost is None else min_daily_cost
+
+        series = np.asarray(costs, dtype=np.float64).reshape(len(self.keys), len(self.dates))
+        self.services = sorted({service for service, _ in self.keys})
+        self.accounts = sorted({account for _, account in self.keys})
+        columns = np.arange(len(self.keys))
+        by_service = np.zeros((len(self.services), len(self.keys)))
+        by_service[[self.services.index(s) for s, _ in self.keys], columns] = 1
+        by_account = np.zeros((len(self.accounts), len(self.keys)))
+        by_account[[self.accounts.index(a) for _, a in self.keys], columns] = 1
+
+        # Rows: every (service, account) series, then per-service, per-account and the grand total
+        self.matrix = np.vstack([series, by_service @ series, by_account @ series, series.sum(axis=0, keepdims=True)])
+        n = len(self.keys)
+        self.rows = {
+            'series': slice(0, n),
+            'service': slice(n, n + len(self.services)),
+            'account': slice(n + len(self.services), n + len(self.services) + len(self.accounts)),
+            'total': slice(len(self.matrix) - 1, len(self.matrix)),
+        }
+        self._compute()
+
+    @classmethod
+    def from_results_by_time(cls, results_by_time: List[dict], metric: str = 'UnblendedCost', **kwargs) -> 'CostAnalytics':
+        """
+        Build from Cost Explorer get_cost_and_usage ResultsByTime (DAILY granularity).
+
+        Groups keyed by SERVICE and LINKED_ACCOUNT become (service, account) rows; with a
+        single group key the account is ''. Columns are keyed by TimePeriod.Start, so a day
+        whose groups were split across NextPageToken pages is summed into one column.
+        """
+        dates = sorted({result['TimePeriod']['Start'] for result in results_by_time})
+        column = {day: col for col, day in enumerate(dates)}
+        index = {}
+        rows, cols, amounts = [], [], []
+        for result in results_by_time:
+            col = column[result['TimePeriod']['Start']]
+            for group in result.get('Groups', []):
+                keys = group['Keys']
+                key = (keys[0], keys[1] if len(keys) > 1 else '')
+                rows.append(index.setdefault(key, len(index)))
+                cols.append(col)
+                amounts.append(float(group['Metrics'][metric]['Amount']))
+        costs = np.zeros((len(index), len(dates)))
+        np.add.at(costs, (rows, cols), amounts)
+        return cls(dates, list(index), costs, **kwargs)
+
+    def _compute(self):
+        x = self.matrix
+        days = x.shape[1]
+
+        # Month-over-month on daily averages, so a partial current month compares fairly
+        self.months, month_of_day = np.unique(self.dates.astype('datetime64[M]'), return_inverse=True)
+        in_month = np.zeros((days, len(self.months)))
+        in_month[np.arange(days), month_of_day] = 1
+        self.monthly = x @ in_month
+        self.monthly_days = in_month.sum(axis=0)
+        run_rate = self.monthly / np.maximum(self.monthly_days, 1) * DAYS_PER_MONTH
+        if len(self.months) >= 2:
+            self.previous_run_rate, self.current_run_rate = run_rate[:, -2], run_rate[:, -1]
+        else:
+            self.previous_run_rate = self.current_run_rate = run_rate[:, -1] if len(self.months) else np.zeros(len(x))
+        self.mom_change = self.current_run_rate - self.previous_run_rate
+        self.mom_pct = np.divide(self.mom_change * 100, self.previous_run_rate,
+                                 out=np.full(len(x), np.nan), where=self.previous_run_rate > 0)
+
+        # Rolling daily averages from prefix sums: column j averages days j..j+window-1
+        csum = np.concatenate([np.zeros((len(x), 1)), np.cumsum(x, axis=1)], axis=1)
+        window = max(1, min(self.rolling_days, days))
+        self.rolling = (csum[:, window:] - csum[:, :-window]) / window
+
+        # z-score of each day against the mean/std of the baseline_days before it
+        self.zscores = np.zeros_like(x)
+        self.expected = np.zeros_like(x)
+        baseline = self.baseline_days
+        if days > baseline:
+            csq = np.concatenate([np.zeros((len(x), 1)), np.cumsum(x * x, axis=1)], axis=1)
+            t = np.arange(baseline, days)
+            mean = (csum[:, t] - csum[:, t - baseline]) / baseline
+            var = np.maximum((csq[:, t] - csq[:, t - baseline]) / baseline - mean * mean, 0)
+            # Floor the spread at 10% of the mean so near-constant series don't flag small wobbles
+            std = np.maximum(np.sqrt(var), 0.1 * np.abs(mean))
+            self.expected[:, t] = mean
+            self.zscores[:, t] = np.divide(x[:, t] - mean, std, out=np.zeros_like(mean), where=std > 0)
+
+    def _label(self, row: int) -> Dict[str, str]:
+        if row < self.rows['series'].stop:
+            service, account = self.keys[row]
+            return {'service': service, 'account': account}
+        if row < self.rows['service'].stop:
+            return {'service': self.services[row - self.rows['service'].start]}
+        if row < self.rows['account'].stop:
+            return {'account': self.accounts[row - self.rows['account'].start]}
+        return {}
+
+    def anomalies(self, top_n: Optional[int] = None) -> List[dict]:
+        """Days where a (service, account) series moved more than z_threshold from its trailing baseline."""
+        rows = self.rows['series']
+        z = self.zscores[rows]
+        material = np.maximum(self.matrix[rows], self.expected[rows]) >= self.min_daily_cost
+        series, day = np.nonzero((np.abs(z) >= self.z_threshold) & material)
+        order = np.argsort(-np.abs(z[series, day]), kind='stable')[:top_n or Config.COST_TOP_MOVERS]
+        return [dict(self._label(int(series[i])),
+                     date=str(self.dates[day[i]]),
+                     cost=_round(self.matrix[series[i], day[i]]),
+                     expected=_round(self.expected[series[i], day[i]]),
+                     z_score=_round(z[series[i], day[i]], 1))
+                for i in order]
+
+    def top_movers(self, view: str = 'service', top_n: Optional[int] = None) -> List[dict]:
+        """Rows of a view with the largest absolute month-over-month change in monthly run rate."""
+        rows = np.arange(len(self.matrix))[self.rows[view]]
+        order = rows[np.argsort(-np.abs(self.mom_change[rows]), kind='stable')][:top_n or Config.COST_TOP_MOVERS]
+        return [dict(self._label(int(row)),
+                     previous_monthly=_round(self.previous_run_rate[row]),
+                     current_monthly=_round(self.current_run_rate[row]),
+                     change=_round(self.mom_change[row]),
+                     change_pct=_round(self.mom_pct[row], 1))
+                for row in order if self.mom_change[row] != 0]
+
+    def totals(self, view: str = 'service') -> List[dict]:
+        """Total cost per row of a view over the whole period, largest first."""
+        rows = np.arange(len(self.matrix))[self.rows[view]]
+        totals = self.matrix[rows].sum(axis=1)
+        return [dict(self._label(int(rows[i])), cost=_round(totals[i])) for i in np.argsort(-totals, kind='stable')]
+
+    def facts(self, top_n: Optional[int] = None) -> dict:
+        """Compact trend summary for the LLM context and the context summary."""
+        top_n = top_n or Config.COST_TOP_MOVERS
+        total = self.rows['total'].start
+        movers = self.top_movers('service', top_n)
+        anomalies = self.anomalies(top_n)
+        recent = self.rolling[total]
+        facts = {
+            'days': len(self.dates),
+            'monthly_totals': [{'month': str(month), 'cost': _round(cost), 'days': int(n)}
+                               for month, cost, n in zip(self.months, self.monthly[total], self.monthly_days)],
+            'previous_monthly': _round(self.previous_run_rate[total]),
+            'current_monthly': _round(self.current_run_rate[total]),
+            'mom_change_pct': _round(self.mom_pct[total], 1),
+            f'daily_average_{self.rolling_days}d': _round(recent[-1]) if len(recent) else None,
+            f'previous_daily_average_{self.rolling_days}d': (_round(recent[-1 - self.rolling_days])
+                                                             if len(recent) > self.rolling_days else None),
+            'top_movers': movers,
+            'anomalies': anomalies,
+        }
+        if len(self.accounts) > 1:
+            facts['account_movers'] = self.top_movers('account', top_n)
+
+        highlights = []
+        if facts['mom_change_pct'] is not None:
+            direction = 'up' if facts['mom_change_pct'] >= 0 else 'down'
+            highlights.append(f"Total monthly run rate {direction} {abs(facts['mom_change_pct']):.0f}% month over month "
+                              f"(${facts['previous_monthly']:,.0f} -> ${facts['current_monthly']:,.0f})")
+        for mover in [m for m in movers if m['change_pct'] is None or abs(m['change_pct']) >= 1][:3]:
+            pct = f" ({mover['change_pct']:+.0f}%)" if mover['change_pct'] is not None else " (new)"
+            highlights.append(f"{mover['service']}: {mover['change']:+,.0f} USD/month{pct}")
+        for anomaly in anomalies[:3]:
+            where = f" in {anomaly['account']}" if anomaly.get('account') and len(self.accounts) > 1 else ""
+            highlights.append(f"Anomaly: {anomaly['service']}{where} ${anomaly['cost']:,.0f} on {anomaly['date']} "
+                              f"vs ${anomaly['expected']:,.0f} expected (z={anomaly['z_score']:+.1f})")
+        facts['highlights'] = highlights
+        return facts
@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional
+
+from config import Config
+from services.metrics import metrics
+
+# Rough conversion used to turn a token budget into a character budget
+CHARS_PER_TOKEN = 4
+
+
+def resolve_budget(max_chars: Optional[int] = None, max_tokens: Optional[int] = None) -> int:
+    """
+    Work out the character budget for an extraction.
+
+    Args:
+        max_chars: Explicit character budget (falls back to Config.EXTRACT_MAX_CHARS)
+        max_tokens: Optional token budget, converted at ~4 characters per token
+
+    Returns:
+        Character budget, or 0 for unlimited
+    """
+    budget = Config.EXTRACT_MAX_CHARS if max_chars is None else max_chars
+    if max_tokens:
+        token_chars = max_tokens * CHARS_PER_TOKEN
+        budget = min(budget, token_chars) if budget else token_chars
+    return budget
+
+
+def take_within_budget(blocks: Iterable[str], budget: int) -> Iterator[str]:
+    """
+    Pass text blocks through until the character budget is used up.
+
+    The last block is truncated to fit, and the source iterator is closed as
+    soon as the budget is reached so extractors stop reading the file.
+
+    Args:
+        blocks: Iterable of text blocks (pages, paragraphs, slides)
+        budget: Character budget, 0 for unlimited
+
+    Yields:
+        Non-empty text blocks
+    """
+    remaining = budget or None
+    iterator = iter(blocks)
+    try:
+        for block in iterator:
+            if not block:
+                continue
+            if remaining is not None:
+                block = block[:remaining]
+                remaining -= len(block)
+            yield block
+            if remaining is not None and remaining <= 0:
+                return
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()
+
+
+class ExtractionCache:
+    """LRU cache of extracted text keyed by file identity and budget."""
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_or_extract(filepath: str, budget: int, extract: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        Return cached text for a file, extracting it on a miss.
+
+        Args:
+            filepath: Path to the source file
+            budget: Character budget the text was extracted with
+            extract: Zero-argument callable that performs the extraction
+
+        Returns:
+            Extracted text (or None if the extractor found nothing)
+        """
+        # Keyed on the inode rather than the path: uploads of identical content are hard links
+        # to one blob in the upload store, so every job that uploads the same file shares an entry
+        stat = os.stat(filepath)
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, budget)
+
+        with ExtractionCache._lock:
+            if key in ExtractionCache._entries:
+                ExtractionCache._entries.move_to_end(key)
+                metrics.inc('mbr_cache_requests_total', cache='extraction', result='hit')
+                return ExtractionCache._entries[key]
+
+        metrics.inc('mbr_cache_requests_total', cache='extraction', result='miss')
+        with metrics.span('extract.document'):
+            text = extract()
+
+        with ExtractionCache._lock:
+            ExtractionCache._entries[key] = text
+            while len(ExtractionCache._entries) > Config.EXTRACT_CACHE_SIZE:
+                ExtractionCache._entries.popitem(last=False)
+
+        return text
+
+    @staticmethod
+    def clear():
+        """Drop all cached entries."""
+        with ExtractionCache._lock:
+            ExtractionCache._entries.clear()
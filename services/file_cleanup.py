@@ -1,7 +1,43 @@
 import os
+import re
 import shutil
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from config import Config
+from services.metrics import metrics
+
+
+# Per-job directories under uploads/ and outputs/ are named with uuid4().hex
+JOB_ID_RE = re.compile(r'[a-f0-9]{32}')
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def scan_files(directory: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Walk a directory tree with os.scandir, yielding (path, stat) for every regular file.
+    
+    Each file is stat'ed once; symlinks are not followed.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from scan_files(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+    except OSError:
+        return
 
 class FileCleanup:
     """Handle cleanup of temporary files and old outputs."""
@@ -43,28 +79,38 @@ class FileCleanup:
             return 0
         
         deleted_count = 0
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        cutoff_time = (datetime.now() - timedelta(hours=max_age_hours)).timestamp()
         
         try:
-            for filename in os.listdir(directory):
-                filepath = os.path.join(directory, filename)
-                
-                if os.path.isfile(filepath):
-                    file_modified = datetime.fromtimestamp(os.path.getmtime(filepath))
-                    
-                    if file_modified < cutoff_time:
-                        if FileCleanup.cleanup_file(filepath):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff_time:
+                        if FileCleanup.cleanup_file(entry.path):
                             deleted_count += 1
         except Exception as e:
             print(f"Error cleaning directory {directory}: {e}")
         
         return deleted_count
     
+    @staticmethod
+    def job_dir(folder: str, session_id: str) -> str:
+        """
+        Directory holding one job's files under an uploads/outputs folder.
+        
+        Raises:
+            ValueError: If session_id is not a job ID from new_job_id()
+        """
+        if not JOB_ID_RE.fullmatch(session_id or ''):
+            raise ValueError(f"Invalid job id: {session_id!r}")
+        return os.path.join(folder, session_id)
+    
     @staticmethod
     def cleanup_session_files(session_id: str, upload_folder: str, output_folder: str) -> bool:
         """
         Delete all files associated with a session.
         
+        Each job's files live in their own directory, so this is one tree removal per folder.
+        
         Args:
             session_id: Session identifier
             upload_folder: Path to uploads directory
@@ -74,23 +120,23 @@ class FileCleanup:
             True if all files deleted successfully
         """
         success = True
-        
-        # Clean uploads
-        for filename in os.listdir(upload_folder):
-            if session_id in filename:
-                filepath = os.path.join(upload_folder, filename)
-                if not FileCleanup.cleanup_file(filepath):
-                    success = False
-        
-        # Clean outputs
-        for filename in os.listdir(output_folder):
-            if session_id in filename:
-                filepath = os.path.join(output_folder, filename)
-                if not FileCleanup.cleanup_file(filepath):
-                    success = False
-        
+        for folder in (upload_folder, output_folder):
+            try:
+                shutil.rmtree(FileCleanup.job_dir(folder, session_id))
+                print(f"Deleted: {FileCleanup.job_dir(folder, session_id)}")
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                print(f"Error deleting job {session_id} from {folder}: {e}")
+                success = False
         return success
     
+    @staticmethod
+    def job_disk_usage(session_id: str, upload_folder: str, output_folder: str) -> int:
+        """Total bytes used by one job's uploads and outputs."""
+        return sum(st.st_size for folder in (upload_folder, output_folder)
+                   for _, st in scan_files(FileCleanup.job_dir(folder, session_id)))
+    
     @staticmethod
     def cleanup_old_files(upload_folder: str, output_folder: str, max_age_hours: int = 24):
         """
@@ -108,3 +154,168 @@ class FileCleanup:
         
         total = uploads_deleted + outputs_deleted
         print(f"Cleanup complete: {total} files deleted ({uploads_deleted} uploads, {outputs_deleted} outputs)")
+
+
+class CleanupSweeper:
+    """
+    Background thread that keeps upload/output directories bounded.
+    
+    Every interval it walks the directories once with os.scandir and deletes files not
+    accessed or modified for max_age_hours. If the remaining files still exceed quota_bytes, the least recently
+    used ones (by last access or modification) are evicted until usage is under the quota.
+    Per-job directories are expired and evicted whole, by the newest use of any of their files,
+    so a job never loses some of its outputs while keeping others.
+    Files younger than min_age_seconds are never evicted, so in-flight jobs are left alone.
+    """
+    
+    def __init__(self, directories: List[str], max_age_hours: Optional[float] = None,
+                 quota_bytes: Optional[int] = None, interval_seconds: Optional[float] = None,
+                 min_age_seconds: Optional[float] = None, upload_store=None):
+        """
+        Args:
+            directories: Directories to sweep (walked recursively)
+            max_age_hours: Delete files unused for longer than this (defaults to Config.CLEANUP_MAX_AGE_HOURS)
+            quota_bytes: Total size budget across all directories, 0 = no quota
+                (defaults to Config.STORAGE_QUOTA_MB)
+            interval_seconds: Time between sweeps (defaults to Config.CLEANUP_INTERVAL_SECONDS)
+            min_age_seconds: Grace period before a file can be evicted for the quota
+                (defaults to Config.CLEANUP_MIN_AGE_SECONDS)
+            upload_store: Optional UploadStore whose unreferenced blobs are collected after each sweep
+        """
+        self.directories = list(directories)
+        self.max_age_seconds = (max_age_hours if max_age_hours is not None else Config.CLEANUP_MAX_AGE_HOURS) * 3600
+        self.quota_bytes = quota_bytes if quota_bytes is not None else Config.STORAGE_QUOTA_MB * 1024 * 1024
+        self.interval_seconds = interval_seconds if interval_seconds is not None else Config.CLEANUP_INTERVAL_SECONDS
+        self.min_age_seconds = min_age_seconds if min_age_seconds is not None else Config.CLEANUP_MIN_AGE_SECONDS
+        self.upload_store = upload_store
+        self.last_sweep = None
+        self._emptied = set()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def sweep(self) -> dict:
+        """
+        Run one age + quota pass.
+        
+        Returns:
+            Dict with files/bytes deleted for age and quota, and the bytes remaining
+        """
+        now = time.time()
+        self._emptied = set()
+        stats = {'deleted_age': 0, 'deleted_quota': 0, 'freed_bytes': 0, 'remaining_bytes': 0, 'deleted_blobs': 0}
+        with metrics.span('cleanup.sweep'):
+            # A job's uploads and outputs are used together (/results and /download read several
+            # files of one job), so a job directory is expired or evicted as a whole, by the most
+            # recent use of any of its files; anything outside a job directory goes file by file
+            units = {}
+            for directory in self.directories:
+                for path, st in scan_files(directory):
+                    # Last access counts as use: a stored upload linked into a new job keeps its
+                    # old mtime but gets a fresh atime
+                    last_used = max(st.st_atime, st.st_mtime)
+                    top = os.path.relpath(path, directory).split(os.sep)[0]
+                    key = ('job', top) if JOB_ID_RE.fullmatch(top) else ('file', path)
+                    unit = units.setdefault(key, [0.0, 0, []])
+                    unit[0] = max(unit[0], last_used)
+                    unit[1] += st.st_size
+                    unit[2].append(path)
+            
+            remaining = []
+            for last_used, size, paths in units.values():
+                if now - last_used > self.max_age_seconds:
+                    deleted, freed = self._delete_all(paths)
+                    stats['deleted_age'] += deleted
+                    stats['freed_bytes'] += freed
+                    size -= freed
+                    if not size:
+                        continue
+                remaining.append((last_used, size, paths))
+            
+            used = sum(size for _, size, _ in remaining)
+            if self.quota_bytes and used > self.quota_bytes:
+                # Least recently used first
+                for last_used, size, paths in sorted(remaining, key=lambda unit: unit[0]):
+                    if used <= self.quota_bytes:
+                        break
+                    if now - last_used < self.min_age_seconds:
+                        continue
+                    deleted, freed = self._delete_all(paths)
+                    stats['deleted_quota'] += deleted
+                    stats['freed_bytes'] += freed
+                    used -= freed
+            stats['remaining_bytes'] = used
+            
+            for directory in self.directories:
+                self._prune_empty_dirs(directory, now)
+            
+            # Job directories removed above may have dropped the last link to a stored upload
+            if self.upload_store is not None:
+                stats['deleted_blobs'] = self.upload_store.collect_garbage(self.min_age_seconds)
+        
+        metrics.inc('mbr_cleanup_files_total', stats['deleted_age'], reason='age')
+        metrics.inc('mbr_cleanup_files_total', stats['deleted_quota'], reason='quota')
+        self.last_sweep = dict(stats, finished=datetime.now().isoformat())
+        if stats['deleted_age'] or stats['deleted_quota']:
+            print(f"Cleanup sweep: {stats['deleted_age']} expired, {stats['deleted_quota']} evicted for quota, "
+                  f"{stats['freed_bytes'] / 1024 / 1024:.1f} MB freed")
+        return stats
+    
+    def _delete_all(self, paths: List[str]) -> Tuple[int, int]:
+        """Delete files, returning (files deleted, bytes freed)."""
+        deleted = freed = 0
+        for path in paths:
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                continue
+            if self._delete(path):
+                deleted += 1
+                freed += size
+        return deleted, freed
+    
+    def _delete(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            self._emptied.add(os.path.dirname(path))
+            return True
+        except OSError as e:
+            print(f"Error deleting {path}: {e}")
+            return False
+    
+    def _prune_empty_dirs(self, directory: str, now: float):
+        """Remove empty subdirectories (not the root) that this sweep emptied or that are past the grace period."""
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for path in subdirs:
+            self._prune_empty_dirs(path, now)
+            try:
+                recent = now - os.stat(path).st_mtime <= self.min_age_seconds
+                if (path in self._emptied or not recent) and not os.listdir(path):
+                    os.rmdir(path)
+                    self._emptied.add(directory)
+            except OSError:
+                continue
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Cleanup sweep failed: {e}")
+            self._stop.wait(self.interval_seconds)
+    
+    def start(self) -> 'CleanupSweeper':
+        """Start sweeping on a daemon thread; the first sweep runs immediately in the background."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='cleanup-sweeper', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,194 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+# Latency buckets in seconds, from in-process work up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_trace = contextvars.ContextVar('mbr_job_trace', default=None)
+
+
+def _label_key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[dict] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    escaped = []
+    for k, v in pairs:
+        value = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{k}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+class JobTrace:
+    """Per-job timing breakdown: pipeline stages plus totals for every span name."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.calls = {}
+
+    def add_stage(self, stage: str, seconds: float):
+        with self.lock:
+            self.stages[stage] = round(self.stages.get(stage, 0.0) + seconds, 4)
+
+    def add_call(self, name: str, seconds: float):
+        with self.lock:
+            call = self.calls.setdefault(name, {'count': 0, 'seconds': 0.0})
+            call['count'] += 1
+            call['seconds'] = round(call['seconds'] + seconds, 4)
+
+    def breakdown(self) -> dict:
+        """JSON-serialisable copy of the stage and call timings."""
+        with self.lock:
+            return {'stages': dict(self.stages),
+                    'calls': {name: dict(call) for name, call in self.calls.items()}}
+
+
+class MetricsRegistry:
+    """Process-wide counters and histograms, rendered in Prometheus text format."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[tuple, float]] = {}
+        self.histograms: Dict[str, Dict[tuple, list]] = {}
+        self.help = {}
+
+    def describe(self, name: str, help_text: str):
+        self.help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a counter."""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation in a histogram."""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            # [bucket counts..., sum, count]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self.lock:
+            return self.counters.get(name, {}).get(_label_key(labels), 0)
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """
+        Time a block of work.
+
+        The duration goes into the mbr_span_seconds histogram (labelled with the
+        span name) and into the current job trace, if one is active.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe('mbr_span_seconds', elapsed, span=name, **labels)
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.add_call(name, elapsed)
+
+    def stage(self, stage: str, seconds: float):
+        """Record a pipeline stage duration measured by the caller."""
+        self.observe('mbr_stage_seconds', seconds, stage=stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_stage(stage, seconds)
+
+    @contextmanager
+    def job_trace(self):
+        """Collect a per-job breakdown for spans and stages recorded in this context."""
+        trace = JobTrace()
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+
+    def render_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name in sorted(self.counters):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self.counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+            for name in sorted(self.histograms):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in sorted(self.histograms[name].items()):
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{name}_bucket{_format_labels(key, {'le': f'{bound:g}'})} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, {'le': '+Inf'})} {state[-1]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {state[-2]:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> dict:
+        """Picklable copy of every counter and histogram series, for merging into another process's registry."""
+        with self.lock:
+            return {'counters': {name: dict(series) for name, series in self.counters.items()},
+                    'histograms': {name: {key: list(state) for key, state in series.items()}
+                                   for name, series in self.histograms.items()}}
+
+    def merge(self, exported: dict):
+        """Add series exported by another registry (e.g. a worker process) into this one."""
+        with self.lock:
+            for name, series in exported.get('counters', {}).items():
+                target = self.counters.setdefault(name, {})
+                for key, value in series.items():
+                    target[key] = target.get(key, 0) + value
+            for name, series in exported.get('histograms', {}).items():
+                target = self.histograms.setdefault(name, {})
+                for key, state in series.items():
+                    current = target.get(key)
+                    target[key] = list(state) if current is None else [a + b for a, b in zip(current, state)]
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+metrics = MetricsRegistry()
+metrics.describe('mbr_span_seconds', 'Latency of external calls and internal operations')
+metrics.describe('mbr_stage_seconds', 'Latency of PresentationAgent pipeline stages')
+metrics.describe('mbr_llm_calls_total', 'Bedrock invocations by model and outcome')
+metrics.describe('mbr_llm_tokens_total', 'Bedrock tokens by model and direction')
+metrics.describe('mbr_llm_cost_usd_total', 'Estimated Bedrock spend in USD by model')
+metrics.describe('mbr_slide_prefilter_total', 'Slides scored locally vs sent to the LLM')
+metrics.describe('mbr_cleanup_files_total', 'Files deleted by the cleanup sweeper by reason')
+metrics.describe('mbr_job_disk_bytes_total', 'Bytes of uploads plus outputs written by web jobs')
+metrics.describe('mbr_speculation_total', 'Speculative talking-point calls by outcome (used, wasted, cancelled)')
+metrics.describe('mbr_speculation_wasted_usd_total', 'Estimated Bedrock spend on speculative calls abandoned by failed runs')
+metrics.describe('mbr_cache_requests_total', 'Cache lookups by cache and result')
+metrics.describe('mbr_mock_fallback_total', 'Times a backend fell back to mock data')
+metrics.describe('mbr_jobs_total', 'Pipeline runs by outcome')
+metrics.describe('mbr_batch_jobs_total', 'Batch entries by outcome')
+metrics.describe('mbr_worker_jobs_total', 'Jobs run in warm worker processes by outcome')
+metrics.describe('mbr_rate_limit_wait_seconds', 'Time spent waiting on a rate limiter')
+metrics.describe('mbr_circuit_breaker_transitions_total', 'Circuit breaker state changes by backend and new state')
+metrics.describe('mbr_circuit_breaker_rejections_total', 'Backend calls skipped because the circuit was open')
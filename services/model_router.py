@@ -0,0 +1,88 @@
+import json
+from typing import Optional
+
+from config import Config
+
+# Tasks BedrockService routes; anything else uses the 'default' route
+TASKS = ('relevance', 'classification', 'analysis', 'talking_points', 'questions', 'default')
+
+DEFAULT_ROUTES = {
+    'relevance': 'fast',
+    'classification': 'fast',
+    'analysis': 'strong',
+    'talking_points': 'strong',
+    'questions': 'strong',
+    'default': 'strong'
+}
+
+# USD per 1K tokens (input, output); override with BEDROCK_MODEL_PRICING
+DEFAULT_PRICING = {
+    'anthropic.claude-3-5-sonnet-20241022-v2:0': (0.003, 0.015),
+    'anthropic.claude-3-5-sonnet-20240620-v1:0': (0.003, 0.015),
+    'anthropic.claude-3-5-haiku-20241022-v1:0': (0.0008, 0.004),
+    'anthropic.claude-3-haiku-20240307-v1:0': (0.00025, 0.00125),
+}
+
+
+def _load_json(raw: Optional[str], name: str) -> dict:
+    if not raw:
+        return {}
+    try:
+        value = json.loads(raw)
+        return value if isinstance(value, dict) else {}
+    except ValueError:
+        print(f"Ignoring invalid JSON in {name}")
+        return {}
+
+
+class ModelRouter:
+    """Pick a Bedrock model per task (and optionally per customer) and price its usage."""
+
+    def __init__(self, routes: Optional[dict] = None, customer_routes: Optional[dict] = None,
+                 pricing: Optional[dict] = None):
+        """
+        Args:
+            routes: {task: 'fast' | 'strong' | model_id}, layered over DEFAULT_ROUTES
+                (defaults to Config.BEDROCK_MODEL_ROUTES)
+            customer_routes: {customer name: {task: tier or model_id}}
+                (defaults to Config.BEDROCK_CUSTOMER_MODEL_ROUTES)
+            pricing: {model_id: [input_per_1k, output_per_1k]}, layered over DEFAULT_PRICING
+                (defaults to Config.BEDROCK_MODEL_PRICING)
+        """
+        self.routes = dict(DEFAULT_ROUTES)
+        self.routes.update(routes if routes is not None else _load_json(Config.BEDROCK_MODEL_ROUTES, 'BEDROCK_MODEL_ROUTES'))
+        customer_routes = customer_routes if customer_routes is not None else \
+            _load_json(Config.BEDROCK_CUSTOMER_MODEL_ROUTES, 'BEDROCK_CUSTOMER_MODEL_ROUTES')
+        self.customer_routes = {name.strip().lower(): overrides for name, overrides in customer_routes.items()}
+        self.pricing = dict(DEFAULT_PRICING)
+        for model_id, prices in (pricing if pricing is not None else
+                                 _load_json(Config.BEDROCK_MODEL_PRICING, 'BEDROCK_MODEL_PRICING')).items():
+            self.pricing[model_id] = tuple(prices)
+
+    @staticmethod
+    def _tier_to_model(target: str) -> str:
+        if target == 'fast':
+            return Config.BEDROCK_FAST_MODEL_ID
+        if target == 'strong':
+            return Config.BEDROCK_MODEL_ID
+        return target
+
+    def model_for(self, task: str, customer_name: Optional[str] = None) -> str:
+        """
+        Resolve the model ID for a task.
+
+        Customer overrides win over task routes (a customer's 'default' entry covers
+        every task it does not name); unknown tasks use the 'default' route.
+        """
+        task = task if task in self.routes else 'default'
+        if customer_name:
+            overrides = self.customer_routes.get(customer_name.strip().lower(), {})
+            target = overrides.get(task, overrides.get('default'))
+            if target:
+                return self._tier_to_model(target)
+        return self._tier_to_model(self.routes[task])
+
+    def cost(self, model_id: str, input_tokens: int, output_tokens: int) -> float:
+        """Estimated USD cost of one call (0 for models without a price)."""
+        input_price, output_price = self.pricing.get(model_id, (0.0, 0.0))
+        return input_tokens / 1000 * input_price + output_tokens / 1000 * output_price
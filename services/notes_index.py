@@ -0,0 +1,148 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or our so that the their
+this to was we were will with you your they them these those not no can could should would
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# What ContextGatherer stores instead of text when an upload can't be extracted
+PDF_EXTRACTION_FAILED = "[PDF extraction failed or empty]"
+DOCUMENT_EXTRACTION_FAILED = "[Document extraction failed or empty]"
+UNSUPPORTED_FILE_TYPE = "[File type not yet supported for extraction]"
+EXTRACTION_PLACEHOLDERS = frozenset([PDF_EXTRACTION_FAILED, DOCUMENT_EXTRACTION_FAILED, UNSUPPORTED_FILE_TYPE])
+EXTRACTION_ERROR_RE = re.compile(r"\[Error: [^\n]*\]")
+
+
+def is_extraction_placeholder(text: str) -> bool:
+    """Whether text is an extraction placeholder rather than real notes (which may start with '[')."""
+    return text in EXTRACTION_PLACEHOLDERS or bool(EXTRACTION_ERROR_RE.fullmatch(text))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and single characters removed."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class NotesIndex:
+    """In-memory BM25 index over chunks of uploaded notes."""
+
+    def __init__(self, documents: Dict[str, str], chunk_chars: Optional[int] = None,
+                 k1: float = 1.5, b: float = 0.75):
+        """
+        Chunk the notes and build the term matrix.
+
+        Args:
+            documents: Mapping of source name (e.g. 'sa_notes') to extracted text
+            chunk_chars: Target chunk size in characters (defaults to Config.NOTES_CHUNK_CHARS)
+            k1: BM25 term frequency saturation
+            b: BM25 length normalisation
+        """
+        self.chunk_chars = chunk_chars or Config.NOTES_CHUNK_CHARS
+        self.chunks = []
+        for source, text in documents.items():
+            if not text or is_extraction_placeholder(text):
+                continue
+            for chunk in self._chunk(text):
+                self.chunks.append({'source': source, 'text': chunk})
+
+        self.vocab = {}
+        rows = []
+        for chunk in self.chunks:
+            counts = {}
+            for token in tokenize(chunk['text']):
+                term_id = self.vocab.setdefault(token, len(self.vocab))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            rows.append(counts)
+
+        tf = np.zeros((len(self.chunks), len(self.vocab)), dtype=np.float32)
+        for row, counts in enumerate(rows):
+            if counts:
+                tf[row, list(counts.keys())] = list(counts.values())
+
+        # Precompute the BM25 weight of every (chunk, term) pair once
+        doc_len = tf.sum(axis=1, keepdims=True)
+        avg_len = float(doc_len.mean()) if len(self.chunks) else 0.0
+        df = (tf > 0).sum(axis=0)
+        n = len(self.chunks)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * doc_len / (avg_len or 1.0))
+        self.weights = tf * (k1 + 1) / (tf + norm) if n else tf
+
+    def _chunk(self, text: str) -> List[str]:
+        """Group paragraphs into chunks of roughly chunk_chars, splitting oversized paragraphs."""
+        chunks = []
+        current = ''
+        for paragraph in re.split(r'\n\s*\n|\n', text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            while len(paragraph) > self.chunk_chars:
+                cut = paragraph.rfind(' ', 0, self.chunk_chars)
+                cut = cut if cut > 0 else self.chunk_chars
+                if current:
+                    chunks.append(current)
+                    current = ''
+                chunks.append(paragraph[:cut])
+                paragraph = paragraph[cut:].strip()
+            if current and len(current) + len(paragraph) + 1 > self.chunk_chars:
+                chunks.append(current)
+                current = ''
+            current = f"{current}\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def search(self, query: str, top_k: int = 3) -> List[dict]:
+        """
+        Rank chunks against a query.
+
+        Args:
+            query: Free text (slide title and content, context summary, ...)
+            top_k: Maximum number of chunks to return
+
+        Returns:
+            List of {'source', 'text', 'score'} dicts, best first, only chunks that match
+        """
+        term_ids = sorted({self.vocab[t] for t in tokenize(query) if t in self.vocab})
+        if not term_ids:
+            return []
+
+        scores = self.weights[:, term_ids] @ self.idf[term_ids]
+        top = np.argsort(-scores, kind='stable')[:top_k]
+        return [dict(self.chunks[i], score=float(scores[i])) for i in top if scores[i] > 0]
+
+    def excerpt(self, query: str, max_chars: Optional[int] = None, top_k: int = 3) -> str:
+        """
+        Build a prompt-ready excerpt of the chunks most relevant to a query.
+
+        Args:
+            query: Free text to rank chunks against
+            max_chars: Character budget for the excerpt (defaults to Config.NOTES_EXCERPT_CHARS)
+            top_k: Maximum number of chunks to include
+
+        Returns:
+            Chunks labelled with their source, or '' when nothing matches
+        """
+        max_chars = max_chars or Config.NOTES_EXCERPT_CHARS
+        parts = []
+        used = 0
+        for hit in self.search(query, top_k):
+            block = f"[{hit['source']}] {hit['text']}"
+            if used + len(block) > max_chars:
+                block = block[:max_chars - used]
+            if block:
+                parts.append(block)
+                used += len(block)
+            if used >= max_chars:
+                break
+        return "\n---\n".join(parts)
@@ -0,0 +1,159 @@
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional
+
+from services.extraction_cache import ExtractionCache, resolve_budget, take_within_budget
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+P_NS = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+NOTES_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide'
+
+
+class OfficeExtractor:
+    """Extract text from DOCX and PPTX files by streaming their XML parts."""
+
+    @staticmethod
+    def _iter_paragraphs(xml_file, paragraph_tag: str, text_tag: str) -> Iterator[str]:
+        """
+        Stream paragraphs out of an XML part without building the whole tree.
+
+        Args:
+            xml_file: File-like object for the XML part
+            paragraph_tag: Fully qualified paragraph element tag
+            text_tag: Fully qualified text run element tag
+
+        Yields:
+            Text of each non-empty paragraph
+        """
+        parts = []
+        for event, elem in ET.iterparse(xml_file, events=('end',)):
+            if elem.tag == text_tag:
+                if elem.text:
+                    parts.append(elem.text)
+            elif elem.tag == paragraph_tag:
+                text = ''.join(parts).strip()
+                parts = []
+                elem.clear()
+                if text:
+                    yield text
+
+    @staticmethod
+    def _read_rels(zf: zipfile.ZipFile, part_name: str) -> dict:
+        """Return the relationships of a part as {rId: (type, absolute target)}."""
+        folder, filename = posixpath.split(part_name)
+        rels_name = posixpath.join(folder, '_rels', filename + '.rels')
+        if rels_name not in zf.namelist():
+            return {}
+        rels = {}
+        root = ET.fromstring(zf.read(rels_name))
+        for rel in root.iter(f'{PKG_REL_NS}Relationship'):
+            target = posixpath.normpath(posixpath.join(folder, rel.get('Target', '')))
+            rels[rel.get('Id')] = (rel.get('Type'), target)
+        return rels
+
+    @staticmethod
+    def _slide_part_names(zf: zipfile.ZipFile) -> List[str]:
+        """Return slide part names in presentation order."""
+        presentation = 'ppt/presentation.xml'
+        rels = OfficeExtractor._read_rels(zf, presentation)
+        root = ET.fromstring(zf.read(presentation))
+        slide_ids = root.find(f'{P_NS}sldIdLst')
+        if slide_ids is None:
+            return []
+        return [rels[sld.get(f'{R_NS}id')][1] for sld in slide_ids
+                if sld.get(f'{R_NS}id') in rels]
+
+    @staticmethod
+    def iter_docx_paragraphs(docx_path: str) -> Iterator[str]:
+        """
+        Lazily yield paragraph text from a Word document.
+
+        Args:
+            docx_path: Path to the DOCX file
+
+        Yields:
+            Text of each non-empty paragraph, in document order
+        """
+        with zipfile.ZipFile(docx_path) as zf:
+            with zf.open('word/document.xml') as xml_file:
+                yield from OfficeExtractor._iter_paragraphs(xml_file, f'{W_NS}p', f'{W_NS}t')
+
+    @staticmethod
+    def iter_pptx_slides(pptx_path: str) -> Iterator[str]:
+        """
+        Lazily yield the text of each slide, including its speaker notes.
+
+        Args:
+            pptx_path: Path to the PPTX file
+
+        Yields:
+            Text of each non-empty slide, in presentation order
+        """
+        with zipfile.ZipFile(pptx_path) as zf:
+            for slide_part in OfficeExtractor._slide_part_names(zf):
+                with zf.open(slide_part) as xml_file:
+                    lines = list(OfficeExtractor._iter_paragraphs(xml_file, f'{A_NS}p', f'{A_NS}t'))
+
+                for rel_type, target in OfficeExtractor._read_rels(zf, slide_part).values():
+                    if rel_type == NOTES_REL_TYPE and target in zf.namelist():
+                        with zf.open(target) as xml_file:
+                            notes = list(OfficeExtractor._iter_paragraphs(xml_file, f'{A_NS}p', f'{A_NS}t'))
+                        # Notes slides repeat the slide number placeholder; keep only real text
+                        notes = [line for line in notes if not line.isdigit()]
+                        if notes:
+                            lines.append('Notes: ' + ' '.join(notes))
+
+                yield '\n'.join(lines)
+
+    @staticmethod
+    def iter_blocks(filepath: str, max_chars: Optional[int] = None,
+                    max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield text blocks from a DOCX or PPTX file until the budget is used up.
+
+        Args:
+            filepath: Path to a .docx or .pptx file
+            max_chars: Character budget (defaults to Config.EXTRACT_MAX_CHARS, 0 = unlimited)
+            max_tokens: Optional token budget
+
+        Yields:
+            Paragraphs (DOCX) or slides (PPTX)
+        """
+        if filepath.lower().endswith('.docx'):
+            blocks = OfficeExtractor.iter_docx_paragraphs(filepath)
+        elif filepath.lower().endswith('.pptx'):
+            blocks = OfficeExtractor.iter_pptx_slides(filepath)
+        else:
+            raise ValueError(f"Unsupported Office file type: {filepath}")
+        return take_within_budget(blocks, resolve_budget(max_chars, max_tokens))
+
+    @staticmethod
+    def extract_text(filepath: str, max_chars: Optional[int] = None,
+                     max_tokens: Optional[int] = None) -> Optional[str]:
+        """
+        Extract text from a DOCX or PPTX file, stopping once the budget is reached.
+
+        Args:
+            filepath: Path to a .docx or .pptx file
+            max_chars: Character budget (defaults to Config.EXTRACT_MAX_CHARS, 0 = unlimited)
+            max_tokens: Optional token budget
+
+        Returns:
+            Extracted text as a single string, or None if extraction fails
+        """
+        try:
+            separator = "\n\n" if filepath.lower().endswith('.pptx') else "\n"
+
+            def extract():
+                blocks = list(OfficeExtractor.iter_blocks(filepath, max_chars, max_tokens))
+                return separator.join(blocks) if blocks else None
+
+            return ExtractionCache.get_or_extract(filepath, resolve_budget(max_chars, max_tokens), extract)
+
+        except Exception as e:
+            print(f"Office extraction error for {filepath}: {e}")
+            return None
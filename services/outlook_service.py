@@ -1,52 +1,293 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
 import msal
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
+from services.circuit_breaker import get_breaker
+from services.metrics import metrics
+
+GRAPH_MESSAGES_URL = "https://graph.microsoft.com/v1.0/me/messages"
+
+# Only the fields we turn into email topics
+MESSAGE_FIELDS = "subject,from,receivedDateTime,bodyPreview"
+
+# Graph responses that mean the service itself is struggling (counted by the circuit breaker)
+UNHEALTHY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+_cursor_lock = threading.Lock()
+
+# Shared across OutlookService instances (one is created per /process run)
+_http_session = None
+_msal_app = None
+_token_cache = None
+_shared_lock = threading.Lock()
+
+def get_http_session():
+    """Return the process-wide keep-alive session for Graph calls."""
+    global _http_session
+    with _shared_lock:
+        if _http_session is None:
+            session = requests.Session()
+            # A small retry budget for transient errors; Retry-After is ignored so a
+            # throttled Graph falls back to mock data instead of stalling the run
+            retries = Retry(total=Config.OUTLOOK_MAX_RETRIES, backoff_factor=0.5,
+                            status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset(['GET']),
+                            respect_retry_after_header=False, raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=Config.OUTLOOK_POOL_SIZE, max_retries=retries)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
+def _token_cache_path():
+    return os.path.join(Config.CACHE_FOLDER, 'msal_token_cache.json')
+
+def get_msal_app():
+    """
+    Return the process-wide MSAL app backed by a persistent token cache.
+
+    Building ConfidentialClientApplication does authority discovery over the
+    network, so it is done once per process rather than per auth call.
+    """
+    global _msal_app, _token_cache
+    # Taken first: get_http_session() acquires _shared_lock itself
+    http_client = get_http_session()
+    with _shared_lock:
+        if _msal_app is None:
+            _token_cache = msal.SerializableTokenCache()
+            try:
+                with open(_token_cache_path(), 'r') as f:
+                    _token_cache.deserialize(f.read())
+            except OSError:
+                pass
+            _msal_app = msal.ConfidentialClientApplication(
+                Config.OUTLOOK_CLIENT_ID,
+                authority=Config.OUTLOOK_AUTHORITY,
+                client_credential=Config.OUTLOOK_CLIENT_SECRET,
+                token_cache=_token_cache,
+                http_client=http_client
+            )
+        return _msal_app
+
+class GraphError(Exception):
+    """A Graph request returned a non-200 status."""
+    
+    def __init__(self, status_code):
+        super().__init__(f"Graph returned HTTP {status_code}")
+        self.status_code = status_code
+
+def is_graph_failure(error):
+    """Transport errors and 5xx/429 trip the Graph breaker; 4xx (e.g. an expired token) do not."""
+    return not isinstance(error, GraphError) or error.status_code in UNHEALTHY_STATUSES
+
+def home_account_id(result):
+    """MSAL home_account_id ("<oid>.<tid>") of the user an auth-code result belongs to."""
+    claims = result.get('id_token_claims') or {}
+    if claims.get('oid') and claims.get('tid'):
+        return f"{claims['oid']}.{claims['tid']}"
+    return None
+
+def _persist_token_cache():
+    """Write the token cache to disk if MSAL changed it (owner-only permissions)."""
+    with _shared_lock:
+        if _token_cache is None or not _token_cache.has_state_changed:
+            return
+        path = _token_cache_path()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        fd = os.open(f"{path}.tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(_token_cache.serialize())
+        os.replace(f"{path}.tmp", path)
+        _token_cache.has_state_changed = False
 
 class OutlookService:
-    def __init__(self):
+    def __init__(self, account_id=None):
+        """
+        Initialize Outlook Service.
+        
+        Args:
+            account_id: MSAL home_account_id of the signed-in user whose mailbox is searched;
+                without it no cached token is used and mock email data is returned
+        """
+        self.account_id = account_id
         self.client_id = Config.OUTLOOK_CLIENT_ID
         self.client_secret = Config.OUTLOOK_CLIENT_SECRET
         self.authority = Config.OUTLOOK_AUTHORITY
         self.scope = Config.OUTLOOK_SCOPE
         self.token = None
+        self.cursor_path = os.path.join(Config.CACHE_FOLDER, 'outlook_cursors.json')
     
     def get_auth_url(self, redirect_uri):
-        app = msal.ConfidentialClientApplication(self.client_id, authority=self.authority, client_credential=self.client_secret)
+        app = get_msal_app()
         return app.get_authorization_request_url(self.scope, redirect_uri=redirect_uri)
     
     def get_token_from_code(self, code, redirect_uri):
-        app = msal.ConfidentialClientApplication(self.client_id, authority=self.authority, client_credential=self.client_secret)
+        app = get_msal_app()
         result = app.acquire_token_by_authorization_code(code, scopes=self.scope, redirect_uri=redirect_uri)
+        _persist_token_cache()
         if "access_token" in result:
             self.token = result["access_token"]
+            self.account_id = home_account_id(result)
             return True
         return False
     
+    def acquire_token(self):
+        """
+        Return an access token, silently refreshing from the token cache if needed.
+        
+        The token cache is shared by the whole process, so only this service's own
+        account is ever looked up in it.
+        
+        Returns:
+            Access token string, or None if this user has not signed in
+        """
+        if self.token:
+            return self.token
+        if not self.client_id or not self.account_id:
+            return None
+        try:
+            app = get_msal_app()
+            for account in app.get_accounts():
+                if account.get('home_account_id') != self.account_id:
+                    continue
+                result = get_breaker('outlook_auth', self.account_id).call(app.acquire_token_silent,
+                                                                           self.scope, account=account)
+                if result and "access_token" in result:
+                    self.token = result["access_token"]
+                break
+            _persist_token_cache()
+        except Exception as e:
+            print(f"Outlook token refresh failed: {e}")
+        return self.token
+    
     def search_customer_emails(self, customer_name, days=90):
-        if not self.token:
+        if not self.acquire_token():
+            metrics.inc('mbr_mock_fallback_total', backend='outlook')
             return self._mock_email_data(customer_name)
         try:
-            headers = {'Authorization': f'Bearer {self.token}', 'Content-Type': 'application/json'}
-            search_query = f"$search=\"{customer_name}\"&$top=50"
-            url = f"https://graph.microsoft.com/v1.0/me/messages?{search_query}"
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                emails = response.json().get('value', [])
-                topics = []
-                for email in emails[:20]:
-                    topics.append({
-                        'subject': email.get('subject', ''),
-                        'from': email.get('from', {}).get('emailAddress', {}).get('name', ''),
-                        'received': email.get('receivedDateTime', ''),
-                        'preview': email.get('bodyPreview', '')[:200]
-                    })
-                return topics
-            else:
-                return self._mock_email_data(customer_name)
+            window_start = datetime.now(timezone.utc) - timedelta(days=days)
+            cursor = self._load_cursor(customer_name)
+            
+            # Only ask Graph for mail newer than what earlier runs already pulled
+            since = window_start
+            if cursor.get('last_received'):
+                since = max(since, _parse_received(cursor['last_received']))
+            
+            # Shared across this user's jobs: once Graph keeps failing, runs skip straight to mock data
+            new_topics = get_breaker('outlook', self.account_id).call(
+                self._fetch_messages, customer_name, since, is_failure=is_graph_failure)
+            
+            seen = set()
+            topics = []
+            for topic in sorted(new_topics + cursor.get('messages', []),
+                                key=lambda t: t['received'], reverse=True):
+                key = (topic['received'], topic['subject'])
+                if key in seen or _parse_received(topic['received']) < window_start:
+                    continue
+                seen.add(key)
+                topics.append(topic)
+            topics = topics[:Config.OUTLOOK_MAX_MESSAGES]
+            
+            if topics:
+                self._save_cursor(customer_name, {
+                    'last_received': topics[0]['received'],
+                    'messages': topics
+                })
+            return topics
         except Exception as e:
             print(f"Outlook API error: {e}")
+            metrics.inc('mbr_mock_fallback_total', backend='outlook')
             return self._mock_email_data(customer_name)
     
+    def _fetch_messages(self, customer_name, since):
+        """
+        Page through Graph search results received on or after `since`.
+
+        Graph does not allow $filter together with $search on messages, so the
+        date bound is pushed to the server as a KQL `received>=` clause.
+
+        Returns:
+            List of email topic dicts (a failed later page keeps what was read so far)
+        
+        Raises:
+            GraphError: If the first request returns a non-200 status
+        """
+        headers = {'Authorization': f'Bearer {self.token}', 'Content-Type': 'application/json'}
+        search_name = customer_name.replace('"', '')
+        params = {
+            '$search': f'"{search_name} AND received>={since.strftime("%Y-%m-%d")}"',
+            '$select': MESSAGE_FIELDS,
+            '$top': Config.OUTLOOK_PAGE_SIZE
+        }
+        
+        url = GRAPH_MESSAGES_URL
+        topics = []
+        while url and len(topics) < Config.OUTLOOK_MAX_MESSAGES:
+            with metrics.span('graph.messages'):
+                response = get_http_session().get(url, headers=headers, params=params,
+                                                  timeout=(Config.OUTLOOK_CONNECT_TIMEOUT, Config.OUTLOOK_TIMEOUT))
+            if response.status_code != 200:
+                if not topics:
+                    raise GraphError(response.status_code)
+                break
+            payload = response.json()
+            for email in payload.get('value', []):
+                received = email.get('receivedDateTime', '')
+                # KQL dates are day-granular; drop anything before the exact cursor
+                if received and _parse_received(received) <= since:
+                    continue
+                topics.append({
+                    'subject': email.get('subject', ''),
+                    'from': email.get('from', {}).get('emailAddress', {}).get('name', ''),
+                    'received': received,
+                    'preview': email.get('bodyPreview', '')[:200]
+                })
+            # nextLink already carries the query string
+            url = payload.get('@odata.nextLink')
+            params = None
+        return topics
+    
+    def _cursor_key(self, customer_name):
+        """Cursors hold mail from one user's mailbox, so they are keyed by account and customer."""
+        if not self.account_id:
+            return None
+        return f"{self.account_id}|{customer_name.lower()}"
+    
+    def _load_cursor(self, customer_name):
+        key = self._cursor_key(customer_name)
+        if key is None:
+            return {}
+        with _cursor_lock:
+            try:
+                with open(self.cursor_path, 'r') as f:
+                    return json.load(f).get(key, {})
+            except (OSError, ValueError):
+                return {}
+    
+    def _save_cursor(self, customer_name, cursor):
+        key = self._cursor_key(customer_name)
+        if key is None:
+            return
+        with _cursor_lock:
+            try:
+                with open(self.cursor_path, 'r') as f:
+                    cursors = json.load(f)
+            except (OSError, ValueError):
+                cursors = {}
+            # Drop entries from before cursors were per mailbox; nobody can tell whose mail they hold
+            cursors = {k: v for k, v in cursors.items() if '|' in k}
+            cursors[key] = cursor
+            
+            os.makedirs(os.path.dirname(self.cursor_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cursor_path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cursors, f)
+            os.replace(tmp_path, self.cursor_path)
+    
     def _mock_email_data(self, customer_name):
         return [
             {'subject': f'Re: {customer_name} - Q1 Architecture Review', 'from': 'Customer CTO',
@@ -56,3 +297,8 @@ class OutlookService:
             {'subject': f'Re: {customer_name} RDS Performance', 'from': 'Customer DevOps Lead',
              'received': '2026-02-08', 'preview': 'RDS instance experiencing slow queries during peak hours. Opened support case...'}
         ]
+
+def _parse_received(value):
+    """Parse a Graph receivedDateTime (e.g. 2026-02-15T10:00:00Z) as an aware datetime."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
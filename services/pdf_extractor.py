@@ -1,30 +1,102 @@
 import pdfplumber
-from typing import Optional
+from typing import Iterator, Optional
+from pdfminer.pdftypes import resolve1
+from pdfminer.psparser import LIT
+from services.extraction_cache import ExtractionCache, resolve_budget, take_within_budget
+
+LITERAL_FORM = LIT('Form')
 
 class PDFExtractor:
     """Extract text content from PDF files."""
     
     @staticmethod
-    def extract_text(pdf_path: str) -> Optional[str]:
+    def _declares_fonts(resources, seen: set) -> bool:
+        """Whether a resource dictionary, or a Form XObject it references, declares fonts."""
+        resources = resolve1(resources) or {}
+        if resolve1(resources.get('Font')):
+            return True
+        for ref in (resolve1(resources.get('XObject')) or {}).values():
+            key = getattr(ref, 'objid', None) or id(ref)
+            if key in seen:
+                continue
+            seen.add(key)
+            attrs = getattr(resolve1(ref), 'attrs', {})
+            if resolve1(attrs.get('Subtype')) is LITERAL_FORM and PDFExtractor._declares_fonts(attrs.get('Resources'), seen):
+                return True
+        return False
+    
+    @staticmethod
+    def _has_text_layer(page) -> bool:
+        """
+        Check whether a page declares any fonts without running layout analysis.
+        
+        Pages without a font resource (scans, full-page images) cannot contain
+        extractable text, so they are skipped before pdfplumber parses them.
+        Fonts may sit in the page's own resources or in a Form XObject it draws.
+        """
+        try:
+            return PDFExtractor._declares_fonts(page.page_obj.resources, set())
+        except Exception:
+            return True
+    
+    @staticmethod
+    def _page_texts(pdf) -> Iterator[str]:
+        """Yield the text of each page of an open PDF, releasing each page's layout objects as it goes."""
+        for page in pdf.pages:
+            if not PDFExtractor._has_text_layer(page):
+                continue
+            
+            try:
+                page_text = page.extract_text()
+            finally:
+                # Drop the parsed layout objects so memory stays flat on huge files
+                page.close()
+            
+            yield page_text
+    
+    @staticmethod
+    def _iter_page_texts(pdf_path: str) -> Iterator[str]:
+        """Yield raw page text of the PDF at pdf_path."""
+        with pdfplumber.open(pdf_path) as pdf:
+            yield from PDFExtractor._page_texts(pdf)
+    
+    @staticmethod
+    def iter_pages(pdf_path: str, max_chars: Optional[int] = None,
+                   max_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Lazily yield the text of each page until the budget is used up.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            max_chars: Character budget (defaults to Config.EXTRACT_MAX_CHARS, 0 = unlimited)
+            max_tokens: Optional token budget
+            
+        Yields:
+            Page text, with the final page truncated to fit the budget
+        """
+        return take_within_budget(PDFExtractor._iter_page_texts(pdf_path),
+                                  resolve_budget(max_chars, max_tokens))
+    
+    @staticmethod
+    def extract_text(pdf_path: str, max_chars: Optional[int] = None,
+                     max_tokens: Optional[int] = None) -> Optional[str]:
         """
-        Extract all text from a PDF file.
+        Extract text from a PDF file, stopping once the budget is reached.
         
         Args:
             pdf_path: Path to the PDF file
+            max_chars: Character budget (defaults to Config.EXTRACT_MAX_CHARS, 0 = unlimited)
+            max_tokens: Optional token budget
             
         Returns:
             Extracted text as a single string, or None if extraction fails
         """
         try:
-            text_content = []
-            
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(page_text)
+            def extract():
+                text_content = list(PDFExtractor.iter_pages(pdf_path, max_chars, max_tokens))
+                return "\n\n".join(text_content) if text_content else None
             
-            return "\n\n".join(text_content) if text_content else None
+            return ExtractionCache.get_or_extract(pdf_path, resolve_budget(max_chars, max_tokens), extract)
             
         except Exception as e:
             print(f"PDF extraction error for {pdf_path}: {e}")
@@ -39,7 +111,8 @@ class PDFExtractor:
             pdf_path: Path to the PDF file
             
         Returns:
-            Dictionary with 'text', 'pages', and 'metadata'
+            Dictionary with 'text' (the full text, not limited by the extraction budget),
+            'pages', and 'metadata'
         """
         try:
             text_content = []
@@ -48,8 +121,7 @@ class PDFExtractor:
                 metadata = pdf.metadata
                 page_count = len(pdf.pages)
                 
-                for page in pdf.pages:
-                    page_text = page.extract_text()
+                for page_text in PDFExtractor._page_texts(pdf):
                     if page_text:
                         text_content.append(page_text)
             
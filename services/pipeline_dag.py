@@ -0,0 +1,128 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence
+
+from config import Config
+from services.metrics import metrics
+
+
+class Stage:
+    """One pipeline step: a callable taking the results of finished stages, plus its dependencies."""
+
+    __slots__ = ('name', 'fn', 'deps')
+
+    def __init__(self, name: str, fn: Callable[[Dict[str, object]], object], deps: Sequence[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+class DagExecutor:
+    """
+    Run stages as soon as their dependencies finish, independent ones concurrently.
+
+    Stages run on a thread pool inside a copy of the caller's context, so spans and
+    stages land in the caller's job trace. Each stage's start/end is kept so the run's
+    critical path (the chain of stages that determined the wall time) can be reported.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Stages allowed to run at once (defaults to Config.PIPELINE_WORKERS;
+                1 runs the graph sequentially in dependency order)
+        """
+        self.max_workers = max(1, max_workers or Config.PIPELINE_WORKERS)
+        self.stages: Dict[str, Stage] = {}
+        self.windows: Dict[str, tuple] = {}
+        self.wall_seconds = 0.0
+
+    @staticmethod
+    def _check(stages: Sequence[Stage]):
+        names = {stage.name for stage in stages}
+        if len(names) != len(stages):
+            raise ValueError("Duplicate stage names")
+        for stage in stages:
+            missing = set(stage.deps) - names
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {sorted(missing)}")
+        # Kahn's algorithm: every stage must become ready eventually
+        remaining = {stage.name: set(stage.deps) for stage in stages}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependency cycle among stages: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _timed(self, stage: Stage, results: Dict[str, object], run_start: float):
+        start = time.perf_counter()
+        try:
+            return stage.fn(results)
+        finally:
+            end = time.perf_counter()
+            self.windows[stage.name] = (start - run_start, end - run_start)
+            metrics.stage(stage.name, end - start)
+
+    def run(self, stages: Sequence[Stage]) -> Dict[str, object]:
+        """
+        Execute the graph.
+
+        Args:
+            stages: Stages in any order; dependencies refer to stage names
+
+        Returns:
+            Dict of stage name -> return value
+
+        Raises:
+            ValueError: On unknown dependencies or cycles
+            Exception: The first exception raised by a stage (nothing new is started after it)
+        """
+        self._check(stages)
+        self.stages = {stage.name: stage for stage in stages}
+        self.windows = {}
+        results: Dict[str, object] = {}
+        pending = dict(self.stages)
+        running = {}
+        run_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mbr-stage') as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(dep in results for dep in stage.deps):
+                        del pending[name]
+                        ctx = contextvars.copy_context()
+                        running[pool.submit(ctx.run, self._timed, stage, results, run_start)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    # Re-raises the stage's exception; the pool waits for stages already running
+                    results[name] = future.result()
+
+        self.wall_seconds = time.perf_counter() - run_start
+        return results
+
+    def critical_path(self) -> List[str]:
+        """Stages on the longest dependency chain of the last run, first to last."""
+        if not self.windows:
+            return []
+        name = max(self.windows, key=lambda n: self.windows[n][1])
+        path = [name]
+        while self.stages[name].deps:
+            # The dependency that finished last is the one this stage waited for
+            name = max(self.stages[name].deps, key=lambda n: self.windows[n][1])
+            path.append(name)
+        return path[::-1]
+
+    def timing_report(self) -> dict:
+        """JSON-serialisable critical path, wall time and per-stage [start, end] offsets."""
+        path = self.critical_path()
+        return {
+            'critical_path': path,
+            'critical_path_seconds': round(sum(self.windows[n][1] - self.windows[n][0] for n in path), 4),
+            'wall_seconds': round(self.wall_seconds, 4),
+            'windows': {name: [round(start, 4), round(end, 4)] for name, (start, end) in self.windows.items()}
+        }
@@ -1,5 +1,6 @@
 from pptx import Presentation
 from datetime import datetime
+from services.slide_records import SlideRecord, as_scored_slide
 
 class PowerPointService:
     def load_presentation(self, filepath):
@@ -8,24 +9,27 @@ class PowerPointService:
     def extract_slide_content(self, prs):
         slides_data = []
         for idx, slide in enumerate(prs.slides):
-            slide_data = {'index': idx, 'title': '', 'content': [], 'notes': ''}
-            if slide.shapes.title:
-                slide_data['title'] = slide.shapes.title.text
+            slide_data = SlideRecord(idx)
+            title_shape = slide.shapes.title
+            if title_shape:
+                slide_data.title = title_shape.text
             for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text and shape != slide.shapes.title:
-                    slide_data['content'].append(shape.text)
+                if hasattr(shape, "text") and shape.text and shape != title_shape:
+                    slide_data.content.append(shape.text)
             if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-                slide_data['notes'] = slide.notes_slide.notes_text_frame.text
+                slide_data.notes = slide.notes_slide.notes_text_frame.text
             slides_data.append(slide_data)
         return slides_data
     
-    def reorder_slides(self, prs, kept_slides):
+    def reorder_slides(self, prs, kept_slides, prune=True):
         """
         Reorder slides by moving them within the presentation.
         
         Args:
             prs: Original presentation
-            kept_slides: List of slide items with 'slide' dict and 'score', sorted by relevance
+            kept_slides: List of ScoredSlide (or {'slide': {'index': ...}} dicts), sorted by relevance
+            prune: Also drop the presentation's relationships to removed slides, so their
+                parts, notes and any media only they use are left out of the saved file
             
         Returns:
             Modified presentation with reordered slides
@@ -37,7 +41,7 @@ class PowerPointService:
         slide_ids = {i: sldIdLst[i] for i in range(len(prs.slides))}
         
         # Build new order: kept slides sorted by score, then removed slides at end
-        new_order_indices = [item['slide']['index'] for item in kept_slides]
+        new_order_indices = [as_scored_slide(item).slide.index for item in kept_slides]
         
         # Reorder by removing all and re-adding in new order
         for slide_id in list(sldIdLst):
@@ -47,6 +51,14 @@ class PowerPointService:
             if idx in slide_ids:
                 sldIdLst.append(slide_ids[idx])
         
+        # Saving only writes parts reachable from the package, so unlinking a removed
+        # slide drops it together with its notes and any media no kept slide uses
+        if prune:
+            kept = set(new_order_indices)
+            for idx, slide_id in slide_ids.items():
+                if idx not in kept:
+                    prs.part.drop_rel(slide_id.rId)
+        
         return prs
     
     def add_talking_points(self, slide, talking_points):
@@ -63,19 +75,27 @@ class PowerPointService:
         return output_path
     
     def create_change_summary(self, changes):
+        """
+        Build the Markdown change summary.
+        
+        Args:
+            changes: Dict whose 'removed_slides' and 'reordered' lists hold ScoredSlide, or the
+                flat dicts written to results['changes'] ({'index', 'title', 'reason'} and
+                {'title', 'original_index', 'score'})
+        """
         summary = "# MBR Presentation Changes Summary\n\n"
         summary += f"Generated: {changes.get('timestamp', datetime.now().isoformat())}\n\n"
         
         if changes.get('removed_slides'):
             summary += "## Slides Removed\n"
-            for slide in changes['removed_slides']:
-                summary += f"- Slide {slide['index']}: {slide['title']} - {slide['reason']}\n"
+            for item in map(as_scored_slide, changes['removed_slides']):
+                summary += f"- Slide {item.slide.index}: {item.slide.title} - {item.reason}\n"
             summary += "\n"
         
         if changes.get('reordered'):
             summary += "## Slides Reordered\n"
-            for idx, slide in enumerate(changes['reordered'], 1):
-                summary += f"{idx}. {slide['title']} (was position {slide['original_index'] + 1})\n"
+            for idx, item in enumerate(map(as_scored_slide, changes['reordered']), 1):
+                summary += f"{idx}. {item.slide.title} (was position {item.slide.index + 1})\n"
             summary += "\n"
         
         if changes.get('talking_points_added'):
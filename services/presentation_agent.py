@@ -1,105 +1,338 @@
 from services.bedrock_service import BedrockService
 from services.pptx_service import PowerPointService
 from services.context_gatherer import ContextGatherer
+from services.notes_index import NotesIndex
+from services.slide_prefilter import SlidePrefilter
+from services.slide_similarity import SlideSimilarity
+from services.slide_records import ScoredSlide
+from services.circuit_breaker import get_breaker
+from services.metrics import metrics
+from services.pipeline_dag import DagExecutor, Stage
+from config import Config
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import contextvars
 import json
 import os
+import threading
+
+# Slides scoring below this are removed from the deck
+KEEP_THRESHOLD = 4
+
+
+def _count_wasted_cost(future):
+    if not future.cancelled() and future.exception() is None:
+        metrics.inc('mbr_speculation_wasted_usd_total', future.result()[1])
 
 class PresentationAgent:
-    def __init__(self, customer_account_id=None):
+    def __init__(self, customer_account_id=None, outlook_account_id=None, rate_limiter=None):
         """
         Initialize Presentation Agent.
         
         Args:
             customer_account_id: Optional customer AWS account ID for role assumption
+            outlook_account_id: MSAL home_account_id of the signed-in user whose mailbox is searched
+            rate_limiter: Optional RateLimiter for this job's Bedrock calls, on top of LLM_RATE_LIMIT
         """
-        self.bedrock = BedrockService()
+        self.bedrock = BedrockService(rate_limiter=rate_limiter)
         self.pptx_service = PowerPointService()
-        self.context_gatherer = ContextGatherer(customer_account_id=customer_account_id)
+        self.context_gatherer = ContextGatherer(customer_account_id=customer_account_id,
+                                                outlook_account_id=outlook_account_id)
+        self.stage_timings = {}
+        self.speculation = {}
+        self._slide_pool = None
+        self._speculation_pool = None
+        self._speculative = {}
+        self._speculation_open = False
+        self._speculation_lock = threading.Lock()
+    
+    def _analysis_context(self, context, notes_index):
+        """
+        Replace whole uploaded notes with the chunks most relevant to the account.
+        
+        The context summary (top services, cases, email subjects) is used as the
+        query; if nothing matches, the leading chunks are sent instead.
+        """
+        if not len(notes_index):
+            return context
+        
+        excerpt = notes_index.excerpt(context['summary'], max_chars=Config.NOTES_ANALYSIS_CHARS, top_k=10)
+        if not excerpt:
+            excerpt = '\n---\n'.join(chunk['text'] for chunk in notes_index.chunks)[:Config.NOTES_ANALYSIS_CHARS]
+        return dict(context, uploaded_notes=excerpt)
     
     def process_presentation(self, pptx_path, customer_name, audience_type, uploaded_files, output_dir):
+        with metrics.job_trace() as trace:
+            try:
+                results = self._run_pipeline(pptx_path, customer_name, audience_type,
+                                             uploaded_files, output_dir, trace)
+            except Exception:
+                metrics.inc('mbr_jobs_total', outcome='error')
+                raise
+        metrics.inc('mbr_jobs_total', outcome='ok')
+        return results
+    
+    def _run_pipeline(self, pptx_path, customer_name, audience_type, uploaded_files, output_dir, trace):
         print(f"\n=== Processing MBR for {customer_name} ===\n")
+        self.stage_timings = {}
+        self.speculation = {'used': 0, 'wasted': 0, 'cancelled': 0}
+        self._speculative = {}
+        self._speculation_open = Config.SPECULATIVE_TALKING_POINTS
+        self.bedrock.customer_name = customer_name
+        job = {
+            'pptx_path': pptx_path,
+            'customer_name': customer_name,
+            'uploaded_files': uploaded_files,
+            'output_dir': output_dir
+        }
+        
+        # Deck parsing runs alongside context gathering, and questions alongside talking points
+        executor = DagExecutor()
+        self._slide_pool = ThreadPoolExecutor(max_workers=Config.SLIDE_WORKERS, thread_name_prefix='mbr-slide')
+        # Talking points get their own pool, so a kept slide's call starts at once instead of
+        # queueing behind every scoring task
+        self._speculation_pool = ThreadPoolExecutor(max_workers=Config.SLIDE_WORKERS, thread_name_prefix='mbr-speculate')
+        try:
+            r = executor.run([
+                Stage('gather_context', lambda r: self._gather_context(job)),
+                Stage('analyze_context', lambda r: self._analyze_context(r), ['gather_context']),
+                Stage('load_presentation', lambda r: self._load_presentation(job)),
+                Stage('score_slides', lambda r: self._score_slides(r), ['analyze_context', 'load_presentation']),
+                Stage('reorder_slides', lambda r: self._reorder_slides(r), ['score_slides']),
+                Stage('talking_points', lambda r: self._talking_points(r), ['reorder_slides']),
+                Stage('questions', lambda r: self._questions(r), ['analyze_context']),
+                Stage('save_outputs', lambda r: self._save_outputs(job, r), ['talking_points', 'questions']),
+            ])
+        except Exception:
+            self._abandon_speculation()
+            raise
+        finally:
+            # A failed run neither waits for nor leaves queued any LLM calls
+            self._slide_pool.shutdown(wait=False, cancel_futures=True)
+            self._speculation_pool.shutdown(wait=False, cancel_futures=True)
+        timing_report = executor.timing_report()
+        self.stage_timings = {name: round(end - start, 4) for name, (start, end) in timing_report['windows'].items()}
+        self.stage_timings['total'] = timing_report['wall_seconds']
         
+        context = r['gather_context']['context']
+        outputs = r['save_outputs']
+        print(f"\n=== Processing Complete ===")
+        print(f"Critical path: {' -> '.join(timing_report['critical_path'])} "
+              f"({timing_report['critical_path_seconds']:.2f}s of {timing_report['wall_seconds']:.2f}s)")
+        print(f"Modified presentation: {outputs['presentation']}")
+        print(f"Change summary: {outputs['summary']}")
+        print(f"Questions: {outputs['questions']}")
+        
+        # Track data sources for web display
+        aws_service = self.context_gatherer.aws_service
+        data_sources = {
+            'customer_account_used': aws_service.using_customer_account if hasattr(aws_service, 'using_customer_account') else False,
+            'customer_account_id': aws_service.customer_account_id if hasattr(aws_service, 'customer_account_id') else None,
+            'cost_data_real': context['aws_data'].get('costs', {}).get('source') == 'customer_account',
+            'total_cost': context['aws_data'].get('costs', {}).get('total_cost', 0),
+            'health_data_real': False,  # Would be True if Premium Support
+            'support_data_real': False,  # Would be True if Premium Support
+            'ai_used': True,  # Bedrock was used
+            'error_message': 'Role assumption failed - using mock data' if not (aws_service.using_customer_account if hasattr(aws_service, 'using_customer_account') else False) else None,
+            'timings': dict(trace.breakdown(), total=self.stage_timings.get('total'),
+                            critical_path=timing_report['critical_path'],
+                            critical_path_seconds=timing_report['critical_path_seconds']),
+            'models': self.bedrock.usage_summary(),
+            'circuit_breakers': dict(aws_service.breaker_states(), outlook=get_breaker(
+                'outlook', self.context_gatherer.outlook_service.account_id).snapshot()),
+            'speculation': dict(self.speculation)
+        }
+        
+        return {
+            'presentation': outputs['presentation'],
+            'summary': outputs['summary'],
+            'questions': outputs['questions'],
+            'changes': outputs['changes'],
+            'data_sources': data_sources,
+            'timings': dict(self.stage_timings),
+            'llm_calls': self.bedrock.call_count
+        }
+    
+    def _gather_context(self, job):
         # Step 1: Gather context
         print("Step 1: Gathering customer context...")
-        context = self.context_gatherer.gather_all_context(customer_name, uploaded_files)
+        context = self.context_gatherer.gather_all_context(job['customer_name'], job['uploaded_files'])
         
+        # Index uploaded notes so prompts only carry the relevant chunks
+        notes_index = NotesIndex(context['uploaded_notes'])
+        if len(notes_index):
+            print(f"Indexed {len(notes_index)} notes chunks")
+        return {'context': context, 'notes_index': notes_index}
+    
+    def _analyze_context(self, r):
         # Step 2: Analyze context with Claude
         print("\nStep 2: Analyzing customer priorities...")
-        customer_analysis = self.bedrock.analyze_customer_context(context)
-        
+        gathered = r['gather_context']
+        return self.bedrock.analyze_customer_context(
+            self._analysis_context(gathered['context'], gathered['notes_index']))
+    
+    def _load_presentation(self, job):
         # Step 3: Load presentation
         print("\nStep 3: Loading presentation...")
-        prs = self.pptx_service.load_presentation(pptx_path)
+        prs = self.pptx_service.load_presentation(job['pptx_path'])
         slides_data = self.pptx_service.extract_slide_content(prs)
         print(f"Found {len(slides_data)} slides")
-        
-        # Step 4: Assess slide relevance
-        print("\nStep 4: Assessing slide relevance...")
-        slide_scores = []
-        for slide in slides_data:
+        return {'prs': prs, 'slides': slides_data}
+    
+    def _slide_talking_points(self, slide, gathered):
+        """Generate talking points for one slide; returns (text, estimated USD cost)."""
+        slide_text = f"Title: {slide.title}\nContent: {slide.text}"
+        talking_points = self.bedrock.generate_talking_points(
+            slide_text,
+            gathered['context']['summary'],
+            notes_excerpt=gathered['notes_index'].excerpt(slide_text)
+        )
+        return talking_points, self.bedrock.last_call_cost()
+    
+    def _submit(self, fn, *args):
+        # Run on the slide pool inside this context so spans land in the job trace
+        return self._slide_pool.submit(contextvars.copy_context().run, fn, *args)
+    
+    def _speculate(self, slide, gathered):
+        """Start a kept slide's talking points on the speculation pool."""
+        with self._speculation_lock:
+            if self._speculation_open:
+                self._speculative[slide.index] = self._speculation_pool.submit(
+                    contextvars.copy_context().run, self._slide_talking_points, slide, gathered)
+    
+    def _score_slide(self, slide, prefilter, customer_analysis, gathered):
+        prescored = prefilter.prescore(slide) if prefilter else None
+        if prescored:
+            score, reason = prescored
+        else:
             score, reason = self.bedrock.assess_slide_relevance(
-                slide['title'],
-                ' '.join(slide['content']),
+                slide.title,
+                slide.text,
                 customer_analysis
             )
-            slide_scores.append({'slide': slide, 'score': score, 'reason': reason})
-            print(f"  Slide {slide['index']}: {slide['title'][:50]} - Score: {score}/10")
-        
+        metrics.inc('mbr_slide_prefilter_total', outcome='local' if prescored else 'llm')
+        print(f"  Slide {slide.index}: {slide.title[:50]} - Score: {score}/10")
+        # The score is final and the slide will be kept, so start its talking points now
+        if score >= KEEP_THRESHOLD:
+            self._speculate(slide, gathered)
+        return ScoredSlide(slide, score, reason), prescored is not None
+    
+    def _score_slides(self, r):
+        # Step 4: Assess slide relevance
+        print("\nStep 4: Assessing slide relevance...")
+        gathered = r['gather_context']
+        customer_analysis = r['analyze_context']
+        slides_data = r['load_presentation']['slides']
+        prefilter = SlidePrefilter(gathered['context']['aws_data']) if Config.SLIDE_PREFILTER else None
+        # Slides are scored concurrently; with speculation each kept slide's talking points
+        # start as soon as its own score is in, instead of after the whole deck is scored
+        futures = [self._submit(self._score_slide, slide, prefilter, customer_analysis, gathered)
+                   for slide in slides_data]
+        scored = [future.result() for future in futures]
+        slide_scores = [item for item, _ in scored]
+        scored_locally = sum(1 for _, local in scored if local)
+        if scored_locally:
+            print(f"  Scored {scored_locally} of {len(slides_data)} slides locally")
+        return {'scores': slide_scores}
+    
+    def _reorder_slides(self, r):
         # Step 5: Reorder slides by relevance
         print("\nStep 5: Reordering slides...")
-        sorted_slides = sorted(slide_scores, key=lambda x: x['score'], reverse=True)
-        removed_slides = [s for s in sorted_slides if s['score'] < 4]
-        kept_slides = [s for s in sorted_slides if s['score'] >= 4]
+        context = r['gather_context']['context']
+        slides_data = r['load_presentation']['slides']
+        slide_scores = r['score_slides']['scores']
+        # Break score ties by similarity to the customer's spend, cases and health events
+        similarities = SlideSimilarity(context['aws_data']).score_slides(slides_data)
+        for item, similarity in zip(slide_scores, similarities):
+            item.similarity = round(float(similarity), 4)
+        sorted_slides = sorted(slide_scores, key=lambda x: x.sort_key, reverse=True)
+        removed_slides = [s for s in sorted_slides if s.score < KEEP_THRESHOLD]
+        kept_slides = [s for s in sorted_slides if s.score >= KEEP_THRESHOLD]
         
         print(f"  Total slides: {len(slide_scores)}")
-        print(f"  Keeping {len(kept_slides)} slides (score >= 4)")
-        print(f"  Removing {len(removed_slides)} slides (score < 4)")
+        print(f"  Keeping {len(kept_slides)} slides (score >= {KEEP_THRESHOLD})")
+        print(f"  Removing {len(removed_slides)} slides (score < {KEEP_THRESHOLD})")
         print(f"  Reordering presentation...")
         
         # Reorder slides in the presentation
-        prs = self.pptx_service.reorder_slides(prs, kept_slides)
+        prs = self.pptx_service.reorder_slides(r['load_presentation']['prs'], kept_slides)
         print(f"  ✓ Presentation now has {len(prs.slides)} slides in new order")
-        
+        return {'prs': prs, 'kept': kept_slides, 'removed': removed_slides}
+    
+    def _talking_points(self, r):
         # Step 6: Generate talking points
         print("\nStep 6: Generating talking points...")
+        gathered = r['gather_context']
+        prs = r['reorder_slides']['prs']
         talking_points_added = []
-        for idx, item in enumerate(kept_slides):
-            slide = item['slide']
+        for idx, item in enumerate(r['reorder_slides']['kept']):
+            slide = item.slide
             slide_obj = prs.slides[idx]  # Use new index after reordering
             
-            talking_points = self.bedrock.generate_talking_points(
-                f"Title: {slide['title']}\nContent: {' '.join(slide['content'])}",
-                context['summary']
-            )
+            with self._speculation_lock:
+                future = self._speculative.pop(slide.index, None)
+            if future is not None:
+                talking_points, _ = future.result()
+                self.speculation['used'] += 1
+                metrics.inc('mbr_speculation_total', outcome='used')
+            else:
+                talking_points, _ = self._slide_talking_points(slide, gathered)
             
             if talking_points:
                 self.pptx_service.add_talking_points(slide_obj, talking_points)
-                talking_points_added.append(slide['index'])
-                print(f"  Added talking points to: {slide['title'][:50]}")
+                talking_points_added.append(slide.index)
+                print(f"  Added talking points to: {slide.title[:50]}")
+        return talking_points_added
+    
+    def _abandon_speculation(self):
+        """
+        Cancel a failed run's speculative talking points without waiting on calls in flight.
         
+        Queued calls are cancelled; running ones are counted as wasted and their cost is
+        added to mbr_speculation_wasted_usd_total when they finish.
+        """
+        with self._speculation_lock:
+            self._speculation_open = False
+            futures = list(self._speculative.values())
+            self._speculative.clear()
+        for future in futures:
+            outcome = 'cancelled' if future.cancel() else 'wasted'
+            if outcome == 'wasted':
+                future.add_done_callback(_count_wasted_cost)
+            self.speculation[outcome] += 1
+            metrics.inc('mbr_speculation_total', outcome=outcome)
+    
+    def _questions(self, r):
         # Step 7: Generate high-value questions
         print("\nStep 7: Generating strategic questions...")
-        questions = self.bedrock.generate_questions(customer_analysis)
-        
+        return self.bedrock.generate_questions(r['analyze_context'])
+    
+    def _save_outputs(self, job, r):
         # Step 8: Save outputs
         print("\nStep 8: Saving outputs...")
+        customer_name = job['customer_name']
+        output_dir = job['output_dir']
+        reordered = r['reorder_slides']
+        questions = r['questions']
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_pptx = os.path.join(output_dir, f"{customer_name}_MBR_{timestamp}.pptx")
-        self.pptx_service.save_presentation(prs, output_pptx)
+        self.pptx_service.save_presentation(reordered['prs'], output_pptx)
         
         # Create change summary
         changes = {
             'timestamp': datetime.now().isoformat(),
-            'removed_slides': [{'index': s['slide']['index'], 'title': s['slide']['title'], 
-                               'reason': s['reason']} for s in removed_slides],
-            'reordered': [{'title': s['slide']['title'], 'original_index': s['slide']['index'], 
-                          'score': s['score']} for s in kept_slides],
-            'talking_points_added': talking_points_added,
-            'customer_context': context['summary']
+            'removed_slides': reordered['removed'],
+            'reordered': reordered['kept'],
+            'talking_points_added': r['talking_points'],
+            'customer_context': r['gather_context']['context']['summary']
         }
         
         summary_md = self.pptx_service.create_change_summary(changes)
+        # Plain dicts for the results (they end up in the Flask session)
+        changes['removed_slides'] = [{'index': s.slide.index, 'title': s.slide.title,
+                                      'reason': s.reason} for s in reordered['removed']]
+        changes['reordered'] = [{'title': s.slide.title, 'original_index': s.slide.index,
+                                 'score': s.score} for s in reordered['kept']]
         summary_path = os.path.join(output_dir, f"{customer_name}_Changes_{timestamp}.md")
         with open(summary_path, 'w') as f:
             f.write(summary_md)
@@ -110,29 +343,5 @@ class PresentationAgent:
             f.write(f"# Strategic Questions for {customer_name} MBR\n\n")
             f.write(f"Generated: {datetime.now().isoformat()}\n\n")
             f.write(questions if questions else "No questions generated")
-        
-        print(f"\n=== Processing Complete ===")
-        print(f"Modified presentation: {output_pptx}")
-        print(f"Change summary: {summary_path}")
-        print(f"Questions: {questions_path}")
-        
-        # Track data sources for web display
-        aws_service = self.context_gatherer.aws_service
-        data_sources = {
-            'customer_account_used': aws_service.using_customer_account if hasattr(aws_service, 'using_customer_account') else False,
-            'customer_account_id': aws_service.customer_account_id if hasattr(aws_service, 'customer_account_id') else None,
-            'cost_data_real': context['aws_data'].get('costs', {}).get('source') == 'customer_account',
-            'total_cost': context['aws_data'].get('costs', {}).get('total_cost', 0),
-            'health_data_real': False,  # Would be True if Premium Support
-            'support_data_real': False,  # Would be True if Premium Support
-            'ai_used': True,  # Bedrock was used
-            'error_message': 'Role assumption failed - using mock data' if not (aws_service.using_customer_account if hasattr(aws_service, 'using_customer_account') else False) else None
-        }
-        
-        return {
-            'presentation': output_pptx,
-            'summary': summary_path,
-            'questions': questions_path,
-            'changes': changes,
-            'data_sources': data_sources
-        }
+        return {'presentation': output_pptx, 'summary': summary_path,
+                'questions': questions_path, 'changes': changes}
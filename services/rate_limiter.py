@@ -0,0 +1,53 @@
+import threading
+import time
+
+from config import Config
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every caller in the process."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Sustained permits per second (0 disables limiting)
+            burst: Permits that can be taken back-to-back after an idle period
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int = 1):
+        """Change the limit in place (e.g. from a batch --llm-rate flag)."""
+        with self.lock:
+            self.rate = rate
+            self.burst = max(1, burst)
+            self.tokens = min(self.tokens, float(self.burst))
+
+    def acquire(self) -> float:
+        """
+        Block until a permit is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                if not self.rate:
+                    return waited
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# Global limit on Bedrock calls across all concurrent pipeline runs
+llm_rate_limiter = RateLimiter(Config.LLM_RATE_LIMIT, Config.LLM_RATE_BURST)
@@ -1,6 +1,8 @@
 import boto3
 from typing import Optional, Dict
 from config import Config
+from services.circuit_breaker import get_breaker
+from services.client_pool import fast_fail_config
 
 class AWSRoleAssumer:
     """Handle AWS IAM role assumption for accessing customer accounts."""
@@ -23,11 +25,13 @@ class AWSRoleAssumer:
             Dictionary with temporary credentials or None if assumption fails
         """
         try:
-            sts_client = boto3.client('sts', region_name=Config.AWS_REGION)
+            sts_client = boto3.client('sts', region_name=Config.AWS_REGION, config=fast_fail_config())
             
             role_arn = f"arn:aws:iam::{customer_account_id}:role/{role_name}"
             
-            response = sts_client.assume_role(
+            # A role that keeps failing to assume is skipped until its breaker probes again
+            response = get_breaker('sts', customer_account_id).call(
+                sts_client.assume_role,
                 RoleArn=role_arn,
                 RoleSessionName=session_name,
                 DurationSeconds=3600  # 1 hour
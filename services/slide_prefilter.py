@@ -0,0 +1,112 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from services.notes_index import tokenize
+from services.slide_records import SlideRecord
+
+# Titles that are structural, never customer-specific
+BOILERPLATE_TITLE_RE = re.compile(
+    r"^(agenda|table of contents|contents|thank you|thanks|questions|q\s*&\s*a|appendix|backup(?: slides?)?)\b[\s\W\d]*$",
+    re.IGNORECASE
+)
+
+# Long Cost Explorer / Support service names -> the short term people put on slides
+SERVICE_ALIASES = {
+    'elastic compute cloud': 'ec2',
+    'relational database service': 'rds',
+    'simple storage service': 's3',
+    'elastic container service': 'ecs',
+    'elastic kubernetes service': 'eks',
+    'elastic block store': 'ebs',
+    'virtual private cloud': 'vpc',
+    'simple queue service': 'sqs',
+    'simple notification service': 'sns',
+    'aurora': 'rds',
+}
+
+# Words that appear in service names and case subjects but say nothing about a slide's topic
+GENERIC_TERMS = frozenset("""
+amazon aws service services compute cloud elastic web issue issues problem request help case
+support new other general account tax usage
+""".split())
+
+BOILERPLATE_SCORE = 5
+MATCHED_SCORE = 8
+# Summed signal weight at which a slide is obviously about the customer's current concerns
+MATCH_THRESHOLD = 1.5
+
+
+def signal_terms(text: str) -> List[str]:
+    """Tokens of a slide or service name with long service names mapped to their short form."""
+    text = (text or '').lower().replace('-', ' ')
+    for phrase, alias in SERVICE_ALIASES.items():
+        text = text.replace(phrase, f" {alias} ")
+    return [t for t in tokenize(text) if t not in GENERIC_TERMS]
+
+
+class SlidePrefilter:
+    """
+    Rule/keyword scorer that settles obvious slides without an LLM call.
+
+    Customer signals (top services by spend, support cases, health events) become one
+    sparse keyword vector; each slide's terms are matched against it. Title, agenda,
+    divider and thank-you slides get a fixed score, slides that hit enough signal weight
+    are scored high, and everything else is left for assess_slide_relevance.
+    """
+
+    def __init__(self, aws_data: Optional[dict] = None, threshold: float = MATCH_THRESHOLD):
+        """
+        Args:
+            aws_data: context['aws_data'] from ContextGatherer (costs, health_events, support_cases)
+            threshold: Signal weight needed to settle a slide as relevant locally
+        """
+        self.threshold = threshold
+        self.weights: Dict[str, float] = {}
+        self.labels: Dict[str, str] = {}
+        aws_data = aws_data or {}
+
+        top_services = aws_data.get('costs', {}).get('top_services', [])
+        for rank, svc in enumerate(top_services[:5]):
+            self._add(signal_terms(svc.get('service', '')), 1.0 - 0.15 * rank, 'top spend')
+        for case in aws_data.get('support_cases', []):
+            self._add(signal_terms(case.get('service', '')), 1.0, 'open case')
+            self._add(signal_terms(case.get('subject', '')), 0.5, 'open case')
+        for event in aws_data.get('health_events', []):
+            self._add(signal_terms(event.get('service', '')), 0.75, 'health event')
+
+    def _add(self, terms: List[str], weight: float, label: str):
+        for term in set(terms):
+            self.weights[term] = self.weights.get(term, 0.0) + weight
+            self.labels.setdefault(term, label)
+
+    def match(self, slide: SlideRecord) -> Tuple[float, List[str]]:
+        """Summed signal weight of a slide's terms and the terms that matched."""
+        terms = set(signal_terms(slide.full_text))
+        hits = sorted((t for t in terms if t in self.weights), key=lambda t: -self.weights[t])
+        return sum(self.weights[t] for t in hits), hits
+
+    def prescore(self, slide: SlideRecord) -> Optional[Tuple[int, str]]:
+        """
+        Score a slide locally if the answer is obvious.
+
+        Args:
+            slide: SlideRecord from PowerPointService.extract_slide_content
+
+        Returns:
+            (score, reason), or None if the slide should go to the LLM
+        """
+        title = (slide.title or '').strip()
+        content = slide.text.strip()
+
+        if BOILERPLATE_TITLE_RE.match(title):
+            return BOILERPLATE_SCORE, f"Structural slide ({title}) - scored locally"
+        if slide.index == 0 and len(content.split()) <= 12:
+            return BOILERPLATE_SCORE, "Title slide - scored locally"
+
+        weight, hits = self.match(slide)
+        if weight >= self.threshold:
+            matched = ', '.join(f"{t.upper() if len(t) <= 3 else t} ({self.labels[t]})" for t in hits[:3])
+            return MATCHED_SCORE, f"Matches customer signals: {matched} - scored locally"
+        if not content and not hits:
+            return BOILERPLATE_SCORE, "Section divider - scored locally"
+        return None
@@ -0,0 +1,70 @@
+from typing import List, Optional
+
+
+class SlideRecord:
+    """One slide's extracted text; the joined content is built once and cached."""
+
+    __slots__ = ('index', 'title', 'content', 'notes', '_text')
+
+    def __init__(self, index: int, title: str = '', content: Optional[List[str]] = None, notes: str = ''):
+        self.index = index
+        self.title = title
+        self.content = content if content is not None else []
+        self.notes = notes
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        """Body text with shapes joined by spaces (what prompts and scorers read)."""
+        if self._text is None:
+            self._text = ' '.join(self.content)
+        return self._text
+
+    @property
+    def full_text(self) -> str:
+        """Title followed by body text."""
+        return f"{self.title} {self.text}"
+
+    def to_dict(self) -> dict:
+        return {'index': self.index, 'title': self.title, 'content': list(self.content), 'notes': self.notes}
+
+    def __repr__(self):
+        return f"SlideRecord(index={self.index}, title={self.title!r})"
+
+
+class ScoredSlide:
+    """A slide with its relevance score, the reason, and the tie-breaking similarity."""
+
+    __slots__ = ('slide', 'score', 'reason', 'similarity')
+
+    def __init__(self, slide: SlideRecord, score: int, reason: str = '', similarity: float = 0.0):
+        self.slide = slide
+        self.score = score
+        self.reason = reason
+        self.similarity = similarity
+
+    @property
+    def sort_key(self):
+        return self.score, self.similarity
+
+    def __repr__(self):
+        return f"ScoredSlide(index={self.slide.index}, score={self.score}, similarity={self.similarity})"
+
+
+def as_scored_slide(item) -> ScoredSlide:
+    """
+    Return item as a ScoredSlide, converting the dict shapes callers used before ScoredSlide.
+
+    Accepts {'slide': {'index': ..., 'title': ...}, 'score': ...} (reorder_slides) and the
+    flat {'index', 'title', 'reason'} / {'title', 'original_index', 'score'} dicts that
+    create_change_summary took and results['changes'] still holds.
+    """
+    if isinstance(item, ScoredSlide):
+        return item
+    slide = item.get('slide')
+    if isinstance(slide, dict):
+        slide = SlideRecord(slide['index'], slide.get('title', ''), slide.get('content'), slide.get('notes', ''))
+    elif slide is None:
+        index = item['index'] if 'index' in item else item['original_index']
+        slide = SlideRecord(index, item.get('title', ''))
+    return ScoredSlide(slide, item.get('score', 0), item.get('reason', ''), item.get('similarity', 0.0))
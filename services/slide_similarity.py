@@ -0,0 +1,78 @@
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from services.slide_prefilter import signal_terms
+from services.slide_records import SlideRecord
+
+# Hashed feature space; collisions are rare at deck/context vocabulary sizes
+HASH_DIMENSIONS = 1 << 12
+
+
+def _bucket(term: str, dimensions: int) -> int:
+    # crc32 rather than hash() so vectors are stable across processes
+    return zlib.crc32(term.encode('utf-8')) % dimensions
+
+
+class SlideSimilarity:
+    """
+    Cosine similarity between slides and the customer's context signals.
+
+    Slide text and context signals are embedded as hashed term vectors; all slide-context
+    similarities come out of one matrix-vector product. Used as a tie-breaker after the
+    LLM relevance score, so it costs no extra LLM calls.
+    """
+
+    def __init__(self, aws_data: Optional[dict] = None, dimensions: int = HASH_DIMENSIONS):
+        """
+        Args:
+            aws_data: context['aws_data'] from ContextGatherer (costs, health_events, support_cases)
+            dimensions: Size of the hashed feature space
+        """
+        self.dimensions = dimensions
+        self.context_vector = np.zeros(dimensions, dtype=np.float32)
+        aws_data = aws_data or {}
+
+        # Top services weighted by their share of spend
+        top_services = aws_data.get('costs', {}).get('top_services', [])
+        total = sum(svc.get('cost', 0) for svc in top_services) or 1.0
+        for svc in top_services:
+            self._add(signal_terms(svc.get('service', '')), 1.0 + svc.get('cost', 0) / total)
+        for case in aws_data.get('support_cases', []):
+            self._add(signal_terms(case.get('service', '')), 1.5)
+            self._add(signal_terms(case.get('subject', '')), 0.5)
+        for event in aws_data.get('health_events', []):
+            self._add(signal_terms(event.get('service', '')), 1.0)
+
+        norm = np.linalg.norm(self.context_vector)
+        if norm:
+            self.context_vector /= norm
+
+    def _add(self, terms: List[str], weight: float):
+        for term in terms:
+            self.context_vector[_bucket(term, self.dimensions)] += weight
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """L2-normalised hashed term-frequency matrix, one row per text."""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in signal_terms(text):
+                matrix[row, _bucket(term, self.dimensions)] += 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def score_slides(self, slides: List[SlideRecord]) -> np.ndarray:
+        """
+        Similarity of each slide to the context signals.
+
+        Args:
+            slides: SlideRecords from PowerPointService.extract_slide_content
+
+        Returns:
+            Array of cosine similarities in [0, 1], aligned with slides
+        """
+        if not slides:
+            return np.zeros(0, dtype=np.float32)
+        return self.embed([s.full_text for s in slides]) @ self.context_vector
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import BinaryIO, NamedTuple, Optional
+
+from config import Config
+from services.file_cleanup import scan_files
+from services.metrics import metrics
+
+# Read/write/hash granularity while streaming an upload to disk
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredUpload(NamedTuple):
+    """Where an ingested upload landed and whether its content was already stored."""
+    path: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+class UploadStore:
+    """
+    Content-addressed store for uploaded decks and notes.
+
+    Uploads are streamed to disk in chunks and hashed on the way, then kept once per
+    SHA-256 under <root>/<hash[:2]>/<hash>. Each job gets a hard link to the blob in its
+    own upload directory, under the original filename, so the rest of the pipeline keeps
+    working with ordinary paths. The blob's link count is its reference count: removing a
+    job directory drops one reference, and collect_garbage deletes blobs no job links to.
+    Identical files share an inode, which the extraction cache keys on.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or Config.UPLOAD_STORE_FOLDER
+        os.makedirs(self.root, exist_ok=True)
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def ingest(self, stream: BinaryIO, job_dir: str, filename: str) -> StoredUpload:
+        """
+        Stream an upload into the store and link it into a job directory.
+
+        Args:
+            stream: Readable binary stream (e.g. FileStorage.stream)
+            job_dir: Job upload directory the file should appear in
+            filename: Name for the job's copy (already passed through secure_filename)
+
+        Returns:
+            StoredUpload with the job-local path and content hash
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.ingest-')
+        try:
+            with metrics.span('upload.ingest'):
+                with os.fdopen(fd, 'wb') as out:
+                    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+                        size += len(chunk)
+
+                sha256 = digest.hexdigest()
+                blob = self.blob_path(sha256)
+                deduplicated = self._touch(blob)
+                if not deduplicated:
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.replace(tmp_path, blob)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        path = os.path.join(job_dir, filename)
+        self._link(blob, path)
+        metrics.inc('mbr_upload_bytes_total', size, result='deduplicated' if deduplicated else 'stored')
+        if deduplicated:
+            print(f"♻️ Reusing stored upload {sha256[:12]} for {filename} ({size / 1024 / 1024:.1f} MB not written)")
+        return StoredUpload(path, sha256, size, deduplicated)
+
+    @staticmethod
+    def _touch(blob: str) -> bool:
+        # Mark an existing blob as used by bumping its atime. The mtime is left alone so caches
+        # keyed on (inode, mtime) still hit for the re-uploaded file.
+        try:
+            st = os.stat(blob)
+            os.utime(blob, ns=(time.time_ns(), st.st_mtime_ns))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _link(self, blob: str, path: str):
+        if os.path.lexists(path):
+            os.remove(path)
+        try:
+            os.link(blob, path)
+        except OSError:
+            # Store on another filesystem (or no hard links): fall back to a private copy
+            shutil.copyfile(blob, path)
+
+    def refcount(self, sha256: str) -> int:
+        """Number of job files linked to a stored blob (0 if only the store holds it)."""
+        try:
+            return os.stat(self.blob_path(sha256)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def collect_garbage(self, min_age_seconds: float = 0) -> int:
+        """
+        Delete blobs no job links to any more.
+
+        Args:
+            min_age_seconds: Keep unreferenced blobs last used more recently than this,
+                so a re-upload of the same file can still reuse them
+
+        Returns:
+            Number of blobs deleted
+        """
+        now = time.time()
+        deleted = 0
+        for path, st in scan_files(self.root):
+            # Leftover temp files from interrupted uploads get at least an hour, in case one is still streaming
+            grace = max(min_age_seconds, 3600) if os.path.basename(path).startswith('.ingest-') else min_age_seconds
+            if st.st_nlink > 1 or now - max(st.st_atime, st.st_mtime) < grace:
+                continue
+            try:
+                os.remove(path)
+                deleted += 1
+            except OSError as e:
+                print(f"Error deleting {path}: {e}")
+        metrics.inc('mbr_cleanup_files_total', deleted, reason='unreferenced')
+        return deleted
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Optional
+
+from config import Config
+from services.metrics import metrics
+from services.rate_limiter import RateLimiter, llm_rate_limiter
+
+# Imported once by the fork server; every worker forked from it starts with these loaded
+PRELOAD_MODULES = ['services.presentation_agent', 'pptx', 'pdfplumber', 'msal', 'numpy']
+
+# Seconds each worker spent in _warm_worker, sent back with its first job
+_warmup_seconds = None
+
+
+def _warm_worker(llm_rate: float, llm_burst: int):
+    """
+    Pool initializer: finish warming a freshly forked worker before it takes jobs.
+
+    Builds the shared boto3 clients (botocore service models are the slow part) and
+    parses a blank deck so python-pptx's templates and lxml are loaded.
+    """
+    global _warmup_seconds
+    started = time.perf_counter()
+    llm_rate_limiter.configure(llm_rate, llm_burst)
+    try:
+        from pptx import Presentation
+        from services.client_pool import get_client
+
+        get_client('bedrock-runtime', Config.AWS_REGION, endpoint_url=Config.BEDROCK_ENDPOINT_URL)
+        get_client('ce', Config.AWS_REGION, fast_fail=True)
+        get_client('health', 'us-east-1', fast_fail=True)
+        get_client('support', 'us-east-1', fast_fail=True)
+        Presentation()
+    except Exception as e:
+        # Warm-up is best effort; the job falls back to building whatever is missing
+        print(f"⚠️ Worker {os.getpid()} warm-up incomplete: {e}")
+    _warmup_seconds = time.perf_counter() - started
+
+
+def _run_job(job: dict, submitted: float, llm_rate: Optional[float] = None):
+    """Run one pipeline job inside a worker; returns the results and the metrics it recorded."""
+    global _warmup_seconds
+    from services.presentation_agent import PresentationAgent
+
+    # A job's rate gets its own limiter; the worker's shared limiter keeps its warm-up setting
+    # so a batch's throttle never carries over to later jobs in this long-lived worker
+    rate_limiter = RateLimiter(llm_rate, llm_rate_limiter.burst) if llm_rate else None
+    metrics.reset()
+    started = time.time()
+    agent = PresentationAgent(customer_account_id=job.pop('customer_account_id', None),
+                              outlook_account_id=job.pop('outlook_account_id', None),
+                              rate_limiter=rate_limiter)
+    startup_seconds = time.time() - started
+    results = agent.process_presentation(**job)
+    results['data_sources']['worker'] = {
+        'pid': os.getpid(),
+        'queue_seconds': round(max(0.0, started - submitted), 4),
+        'startup_seconds': round(startup_seconds, 4),
+        'warmup_seconds': round(_warmup_seconds, 4) if _warmup_seconds is not None else None,
+        'job_llm_rate': rate_limiter.rate if rate_limiter else None,
+        'worker_llm_rate': llm_rate_limiter.rate,
+    }
+    _warmup_seconds = None
+    return results, metrics.export()
+
+
+class WarmWorkerPool:
+    """
+    Pre-forked pool of long-lived worker processes for pipeline jobs.
+
+    Workers are forked from a fork server that has already imported the pipeline and its
+    libraries (python-pptx, pdfplumber, boto3, msal, numpy), then build their boto3 clients
+    once, so a job only pays for its own work. Jobs go to whichever worker is free over
+    the pool's local task queue, so concurrent jobs (web requests or batch entries) run
+    their CPU-heavy PPTX/PDF parsing on separate cores. Metrics recorded in a worker are
+    merged into this process's registry when the job returns.
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_jobs_per_worker: Optional[int] = None,
+                 job_timeout: Optional[float] = None):
+        """
+        Args:
+            processes: Worker processes (defaults to Config.WORKER_PROCESSES)
+            max_jobs_per_worker: Replace a worker after this many jobs, 0 = never
+                (defaults to Config.WORKER_MAX_JOBS)
+            job_timeout: Seconds to wait for one job's result (defaults to Config.WORKER_JOB_TIMEOUT)
+        """
+        self.processes = max(1, processes or Config.WORKER_PROCESSES)
+        self.max_jobs_per_worker = max_jobs_per_worker if max_jobs_per_worker is not None else Config.WORKER_MAX_JOBS
+        self.job_timeout = job_timeout if job_timeout is not None else Config.WORKER_JOB_TIMEOUT
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def start(self) -> 'WarmWorkerPool':
+        """Fork the workers now (blocks until the fork server has preloaded the libraries)."""
+        with self._lock:
+            if self._pool is None:
+                context = multiprocessing.get_context('forkserver')
+                context.set_forkserver_preload(PRELOAD_MODULES)
+                # The global LLM rate is split evenly, since each worker has its own limiter
+                rate = llm_rate_limiter.rate / self.processes if llm_rate_limiter.rate else 0
+                with metrics.span('worker_pool.start'):
+                    self._pool = context.Pool(self.processes, initializer=_warm_worker,
+                                              initargs=(rate, llm_rate_limiter.burst),
+                                              maxtasksperchild=self.max_jobs_per_worker or None)
+                print(f"🔥 Started {self.processes} warm pipeline workers")
+        return self
+
+    def run_job(self, pptx_path, customer_name, audience_type, uploaded_files, output_dir,
+                customer_account_id=None, llm_rate: Optional[float] = None, outlook_account_id=None) -> dict:
+        """
+        Run PresentationAgent.process_presentation in a worker and wait for its results.
+
+        Args:
+            llm_rate: Optional Bedrock calls/second across this pool for the job (e.g. a
+                batch's --llm-rate); the job gets its own limiter with its share of it
+            outlook_account_id: MSAL home_account_id of the user whose mailbox is searched
+
+        Raises:
+            multiprocessing.TimeoutError: If the job runs longer than job_timeout
+            Exception: Whatever the pipeline raised in the worker
+        """
+        self.start()
+        job = {
+            'pptx_path': pptx_path,
+            'customer_name': customer_name,
+            'audience_type': audience_type,
+            'uploaded_files': uploaded_files,
+            'output_dir': output_dir,
+            'customer_account_id': customer_account_id,
+            'outlook_account_id': outlook_account_id
+        }
+        share = llm_rate / self.processes if llm_rate else llm_rate
+        pending = self._pool.apply_async(_run_job, (job, time.time(), share))
+        try:
+            results, worker_metrics = pending.get(self.job_timeout or None)
+        except Exception:
+            metrics.inc('mbr_worker_jobs_total', outcome='error')
+            raise
+        metrics.merge(worker_metrics)
+        metrics.inc('mbr_worker_jobs_total', outcome='ok')
+        return results
+
+    def close(self):
+        """Let running jobs finish, then stop the workers."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
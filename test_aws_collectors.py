@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the Trusted Advisor and RI/Savings Plans collectors fan out concurrently and cache per account.
+"""
+
+import os
+import threading
+import time
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+import services.circuit_breaker as circuit_breaker
+from services.account_cache import AccountDataCache
+from services.aws_data_service import AWSDataService, fan_out
+from services.metrics import metrics
+
+class FakeSupport:
+    def __init__(self, checks=40, latency=0.05, fail=()):
+        self.checks = checks
+        self.latency = latency
+        self.fail = set(fail)
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def describe_trusted_advisor_checks(self, language):
+        return {'checks': [{'id': f'c{i}', 'name': f'Check {i}', 'category': 'cost_optimizing' if i % 2 else 'security'}
+                           for i in range(self.checks)]}
+
+    def describe_trusted_advisor_check_result(self, checkId, language):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        if checkId in self.fail:
+            raise RuntimeError(f"throttled {checkId}")
+        i = int(checkId[1:])
+        return {'result': {'status': 'error' if i == 3 else ('warning' if i % 2 else 'ok'),
+                           'resourcesSummary': {'resourcesFlagged': i},
+                           'categorySpecificSummary': {'costOptimizing': {'estimatedMonthlySavings': 10.0 * (i % 2)}}}}
+
+class FakeCostExplorer:
+    def __init__(self, latency=0.1):
+        self.latency = latency
+        self.calls = []
+
+    def _call(self, name, payload):
+        self.calls.append(name)
+        time.sleep(self.latency)
+        return payload
+
+    def get_reservation_coverage(self, TimePeriod):
+        return self._call('ri_coverage', {'Total': {'CoverageHours': {'CoverageHoursPercentage': '40.0'},
+                                                    'CoverageCost': {'OnDemandCost': '900'}}})
+
+    def get_reservation_utilization(self, TimePeriod):
+        return self._call('ri_utilization', {'Total': {'UtilizationPercentage': '85.5', 'UnusedHours': '12',
+                                                       'NetRISavings': '300'}})
+
+    def get_savings_plans_coverage(self, TimePeriod):
+        return self._call('sp_coverage', {'SavingsPlansCoverages': [
+            {'Coverage': {'SpendCoveredBySavingsPlans': '30', 'OnDemandCost': '70', 'TotalCost': '100'}},
+            {'Coverage': {'SpendCoveredBySavingsPlans': '90', 'OnDemandCost': '10', 'TotalCost': '100'}}]})
+
+    def get_savings_plans_utilization(self, TimePeriod):
+        raise RuntimeError("no Savings Plans")
+
+def make_service(account=None, support=None, ce=None):
+    service = AWSDataService.__new__(AWSDataService)
+    service.aws_available = True
+    service.using_customer_account = account is not None
+    service.customer_account_id = account
+    service.support_client = support
+    service.ce_client = ce
+    return service
+
+def test_trusted_advisor_fans_out_and_caches():
+    AccountDataCache.clear()
+    circuit_breaker.clear()
+    support = FakeSupport(checks=40, latency=0.05, fail={'c7'})
+    service = make_service(support=support)
+    started = time.perf_counter()
+    advisor = service.get_trusted_advisor()
+    elapsed = time.perf_counter() - started
+
+    assert support.calls == 40
+    assert 1 < support.peak <= 8
+    assert elapsed < 40 * 0.05 / 2
+    assert advisor['checks_evaluated'] == 39 and advisor['checks_failed'] == 1
+    assert advisor['status_counts'] == {'ok': 20, 'warning': 18, 'error': 1}
+    assert advisor['estimated_monthly_savings'] == 190.0
+    assert advisor['flagged_checks'][0]['name'] == 'Check 3'
+    assert len(advisor['flagged_checks']) == 10
+
+    # Within the TTL the same account is served from the cache
+    hits = metrics.counter_value('mbr_cache_requests_total', cache='account_trusted_advisor', result='hit')
+    assert service.get_trusted_advisor() is advisor
+    assert support.calls == 40
+    assert metrics.counter_value('mbr_cache_requests_total', cache='account_trusted_advisor', result='hit') == hits + 1
+
+    # A different customer account is fetched separately
+    make_service(account='123456789012', support=support).get_trusted_advisor()
+    assert support.calls == 80
+
+def test_commitment_coverage_runs_calls_concurrently():
+    AccountDataCache.clear()
+    ce = FakeCostExplorer(latency=0.1)
+    started = time.perf_counter()
+    coverage = make_service(ce=ce).get_commitment_coverage()
+    assert time.perf_counter() - started < 0.25
+    assert sorted(ce.calls) == ['ri_coverage', 'ri_utilization', 'sp_coverage']
+    assert coverage['reserved_instances']['coverage_pct'] == 40.0
+    assert coverage['reserved_instances']['utilization_pct'] == 85.5
+    assert coverage['savings_plans']['coverage_pct'] == 60.0
+    assert coverage['savings_plans']['utilization_pct'] is None
+    assert coverage['calls_failed'] == 1
+
+def test_failures_fall_back_to_mock_and_are_not_cached():
+    AccountDataCache.clear()
+    support = FakeSupport(checks=3, latency=0, fail={'c0', 'c1', 'c2'})
+    service = make_service(support=support)
+    for _ in range(3):
+        assert service.get_trusted_advisor()['source'] == 'mock'
+    assert support.calls == 9
+    # Three runs where every check failed opened the breaker, so the next run does not call out at all
+    assert service.get_trusted_advisor()['source'] == 'mock'
+    assert support.calls == 9
+    circuit_breaker.clear()
+
+def test_failing_checks_do_not_open_breaker():
+    AccountDataCache.clear()
+    circuit_breaker.clear()
+    support = FakeSupport(checks=20, latency=0.01, fail={f'c{i}' for i in range(0, 20, 2)})
+    advisor = make_service(support=support).get_trusted_advisor()
+    assert support.calls == 20
+    assert advisor['checks_evaluated'] == 10 and advisor['checks_failed'] == 10
+    assert circuit_breaker.get_breaker('trusted_advisor').snapshot()['state'] == 'closed'
+
+def test_concurrent_misses_fetch_once():
+    AccountDataCache.clear()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        time.sleep(0.1)
+        return {'value': 1}
+
+    results, failed = fan_out(lambda _: AccountDataCache.get_or_fetch('acct', 'slow', fetch), range(5), 5)
+    assert failed == 0 and len(fetches) == 1
+    assert all(r is results[0] for r in results)
+
+if __name__ == "__main__":
+    test_trusted_advisor_fans_out_and_caches()
+    test_commitment_coverage_runs_calls_concurrently()
+    test_failures_fall_back_to_mock_and_are_not_cached()
+    test_failing_checks_do_not_open_breaker()
+    test_concurrent_misses_fetch_once()
+    print("✅ AWS collector tests passed")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script to verify batch MBR processing, checkpoints and the LLM rate limiter.
+"""
+
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+from pptx import Presentation
+from services.batch_runner import BatchRunner, load_manifest
+from services.rate_limiter import RateLimiter
+
+def build_deck(path, titles):
+    prs = Presentation()
+    for title in titles:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title
+    prs.save(path)
+
+def write_manifest(tmp, customers):
+    entries = []
+    for name in customers:
+        deck = f"{name.lower()}.pptx"
+        build_deck(os.path.join(tmp, deck), ["AWS Cost Overview", "Support Case Summary"])
+        entries.append({'customer_name': name, 'presentation': deck})
+    path = os.path.join(tmp, 'manifest.json')
+    with open(path, 'w') as f:
+        json.dump(entries, f)
+    return path
+
+def test_batch_runs_all_and_resumes():
+    """Every entry completes once; a second run skips completed entries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = write_manifest(tmp, ['Acme', 'Globex', 'Initech'])
+        entries = load_manifest(manifest)
+        assert [e['id'] for e in entries] == ['001_Acme', '002_Globex', '003_Initech']
+        assert os.path.isabs(entries[0]['presentation'])
+
+        output_dir = os.path.join(tmp, 'out')
+        summary = BatchRunner(entries, output_dir, workers=3).run()
+        assert summary['completed'] == 3 and summary['failed'] == 0
+        assert os.path.exists(summary['jobs']['002_Globex']['presentation'])
+
+        again = BatchRunner(entries, output_dir, workers=3).run()
+        assert again['completed'] == 0 and again['skipped'] == 3
+
+def test_failed_entry_is_retried_on_resume():
+    """A failed entry is recorded in the checkpoint and retried next time."""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = write_manifest(tmp, ['Acme'])
+        entries = load_manifest(manifest)
+        entries.append(dict(entries[0], id='missing', presentation=os.path.join(tmp, 'missing.pptx')))
+
+        output_dir = os.path.join(tmp, 'out')
+        summary = BatchRunner(entries, output_dir, workers=2).run()
+        assert summary['failed'] == 1
+        assert summary['jobs']['missing']['status'] == 'failed'
+
+        runner = BatchRunner(entries, output_dir)
+        assert [e['id'] for e in runner.pending_entries()] == ['missing']
+
+def test_rate_limiter_spaces_calls():
+    """Calls beyond the burst wait for the bucket to refill."""
+    limiter = RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.05
+
+    unlimited = RateLimiter(rate=0)
+    assert unlimited.acquire() == 0
+
+def test_batch_rate_is_owned_by_the_batch():
+    """A batch's llm_rate never changes the process-wide limiter used by interactive jobs."""
+    from services.rate_limiter import llm_rate_limiter
+
+    before = (llm_rate_limiter.rate, llm_rate_limiter.burst)
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = BatchRunner(load_manifest(write_manifest(tmp, ['Acme'])), os.path.join(tmp, 'out'), llm_rate=3)
+    assert runner.rate_limiter.rate == 3
+    assert (llm_rate_limiter.rate, llm_rate_limiter.burst) == before
+
+def test_batch_api_validates_workers_and_rate():
+    """Out-of-range or non-numeric workers/llm_rate are rejected before anything runs."""
+    import app
+
+    client = app.app.test_client()
+    for payload in ({'workers': 10000}, {'workers': 0}, {'workers': '4'}, {'workers': True},
+                    {'llm_rate': 0}, {'llm_rate': 1e6}, {'llm_rate': 'fast'}):
+        response = client.post('/api/batch', json=dict(payload, entries=[{'customer_name': 'Acme',
+                                                                          'presentation': 'acme.pptx'}]))
+        assert response.status_code == 400, payload
+        assert 'must be' in response.get_json()['error']
+
+def test_batch_api_rejects_running_batch_and_keeps_it_out_of_the_sweep():
+    """A batch can't be started twice at once, and its files live where the sweeper never looks."""
+    import threading
+
+    import app
+    from config import Config
+
+    release = threading.Event()
+
+    class BlockingRunner:
+        def __init__(self, entries, output_dir, **kwargs):
+            pass
+
+        def run(self):
+            release.wait(5)
+
+    saved = Config.BATCH_INPUT_FOLDER, Config.BATCH_OUTPUT_FOLDER, app.BatchRunner
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.BATCH_INPUT_FOLDER, Config.BATCH_OUTPUT_FOLDER = tmp, os.path.join(tmp, 'out')
+        app.BatchRunner = BlockingRunner
+        try:
+            write_manifest(tmp, ['Acme'])
+            client = app.app.test_client()
+            started = client.post('/api/batch', json={'entries': [{'customer_name': 'Acme', 'presentation': 'acme.pptx'}]})
+            assert started.status_code == 202
+            batch_id = started.get_json()['batch_id']
+            assert os.path.isfile(os.path.join(tmp, 'out', batch_id, 'manifest.json'))
+            assert client.post('/api/batch', json={'batch_id': batch_id}).status_code == 409
+
+            release.set()
+            for _ in range(100):
+                if batch_id not in app._running_batches:
+                    break
+                time.sleep(0.01)
+            release.clear()
+            assert client.post('/api/batch', json={'batch_id': batch_id}).status_code == 202
+            release.set()
+        finally:
+            Config.BATCH_INPUT_FOLDER, Config.BATCH_OUTPUT_FOLDER, app.BatchRunner = saved
+
+    # The default batch folders are neither inside nor around the folders the sweeper expires
+    batch_roots = [os.path.realpath(Config.BATCH_INPUT_FOLDER), os.path.realpath(Config.BATCH_OUTPUT_FOLDER)]
+    for swept in map(os.path.realpath, app.cleanup_sweeper.directories):
+        for root in batch_roots:
+            assert os.path.commonpath([swept, root]) not in (swept, root), (swept, root)
+
+if __name__ == "__main__":
+    test_batch_runs_all_and_resumes()
+    test_failed_entry_is_retried_on_resume()
+    test_rate_limiter_spaces_calls()
+    test_batch_rate_is_owned_by_the_batch()
+    test_batch_api_validates_workers_and_rate()
+    test_batch_api_rejects_running_batch_and_keeps_it_out_of_the_sweep()
+    print("✅ Batch runner tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local Bedrock stand-in speaks the bedrock-runtime protocol.
+"""
+
+import json
+import boto3
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
+from services.bedrock_stub import BedrockStubServer
+
+MODEL_ID = 'anthropic.claude-3-5-sonnet-20241022-v2:0'
+
+def make_client(server):
+    return boto3.client(
+        'bedrock-runtime', region_name='us-east-1', endpoint_url=server.endpoint_url,
+        aws_access_key_id='stub', aws_secret_access_key='stub',
+        config=BotoConfig(retries={'max_attempts': 1})
+    )
+
+def request_body(prompt):
+    return json.dumps({
+        'anthropic_version': 'bedrock-2023-05-31',
+        'max_tokens': 200,
+        'messages': [{'role': 'user', 'content': prompt}]
+    })
+
+def test_invoke_model_round_trip():
+    """InvokeModel returns an Anthropic messages body and the stub counts tokens."""
+    server = BedrockStubServer(latency='fixed:0')
+    server.start_background()
+    try:
+        client = make_client(server)
+        response = client.invoke_model(modelId=MODEL_ID, body=request_body("Rate slide relevance for RDS"))
+        body = json.loads(response['body'].read())
+        assert body['content'][0]['text'].startswith("9|")
+
+        stats = server.stats.snapshot()
+        assert stats['requests'] == 1
+        assert stats['by_model'][MODEL_ID]['output_tokens'] == body['usage']['output_tokens']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_streaming_event_stream():
+    """InvokeModelWithResponseStream decodes into Anthropic streaming events."""
+    server = BedrockStubServer(latency='fixed:0')
+    server.start_background()
+    try:
+        client = make_client(server)
+        response = client.invoke_model_with_response_stream(
+            modelId=MODEL_ID, body=request_body("Generate talking points for the security slide"))
+
+        text = ''
+        event_types = []
+        for event in response['body']:
+            chunk = json.loads(event['chunk']['bytes'])
+            event_types.append(chunk['type'])
+            if chunk['type'] == 'content_block_delta':
+                text += chunk['delta']['text']
+
+        assert event_types[0] == 'message_start'
+        assert event_types[-1] == 'message_stop'
+        assert "Review security posture" in text
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_throttling_injection():
+    """A throttle rate of 1 turns every call into a ThrottlingException."""
+    server = BedrockStubServer(throttle_rate=1.0)
+    server.start_background()
+    try:
+        client = make_client(server)
+        try:
+            client.invoke_model(modelId=MODEL_ID, body=request_body("hello"))
+            assert False, "expected ThrottlingException"
+        except ClientError as e:
+            assert e.response['Error']['Code'] == 'ThrottlingException'
+        assert server.stats.snapshot()['throttled'] >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    test_invoke_model_round_trip()
+    test_streaming_event_stream()
+    test_throttling_injection()
+    print("✅ Bedrock stub tests passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-backend circuit breakers short-circuit failing backends to their fallbacks.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+import services.circuit_breaker as circuit_breaker
+import services.outlook_service as outlook_module
+from services.aws_data_service import AWSDataService
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from services.client_pool import fast_fail_config, get_client
+from services.metrics import metrics
+from services.outlook_service import OutlookService
+
+def failing():
+    raise RuntimeError("AccessDeniedException")
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker('unit', failure_threshold=3, reset_timeout=0.1)
+    for _ in range(3):
+        try:
+            breaker.call(failing)
+        except RuntimeError:
+            pass
+    assert breaker.snapshot()['state'] == 'open'
+    assert breaker.snapshot()['last_error'] == 'AccessDeniedException'
+
+    rejected = metrics.counter_value('mbr_circuit_breaker_rejections_total', backend='unit')
+    try:
+        breaker.call(lambda: 'not called')
+        assert False, "open breaker let a call through"
+    except CircuitOpenError:
+        pass
+    assert metrics.counter_value('mbr_circuit_breaker_rejections_total', backend='unit') == rejected + 1
+
+    # After the reset timeout exactly one probe goes through; a failed probe re-opens
+    time.sleep(0.12)
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure("still denied")
+    assert breaker.snapshot()['state'] == 'open'
+
+    time.sleep(0.12)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.snapshot() == {'state': 'closed', 'failures': 0, 'last_error': 'still denied',
+                                  'retry_in_seconds': None}
+
+def test_single_probe_under_concurrency():
+    breaker = CircuitBreaker('probe', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure("down")
+    allowed = []
+    threads = [threading.Thread(target=lambda: allowed.append(breaker.allow())) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert allowed.count(True) == 1
+
+def test_failing_backend_short_circuits_to_mock():
+    circuit_breaker.clear()
+
+    class DeniedHealth:
+        calls = 0
+
+        def describe_events(self, **kwargs):
+            DeniedHealth.calls += 1
+            raise RuntimeError("SubscriptionRequiredException")
+
+    service = AWSDataService.__new__(AWSDataService)
+    service.aws_available, service.using_customer_account, service.customer_account_id = True, True, '123456789012'
+    service.health_client = DeniedHealth()
+    for _ in range(5):
+        assert service.get_health_events() == service._mock_health_events()
+    assert DeniedHealth.calls == 3
+    states = service.breaker_states()
+    assert states['health']['state'] == 'open' and states['health']['retry_in_seconds'] > 0
+    assert states['cost_explorer']['state'] == 'closed'
+    # Breakers are per account: the same backend under other credentials is unaffected
+    assert get_breaker('health').snapshot()['state'] == 'closed'
+
+def test_outlook_breaker_skips_graph():
+    circuit_breaker.clear()
+    requests = []
+    statuses = {'Bearer alice-token': 503, 'Bearer bob-token': 401}
+
+    class FailingSession:
+        def get(self, url, headers=None, **kwargs):
+            requests.append((headers['Authorization'], kwargs['timeout']))
+            return type('Response', (), {'status_code': statuses[headers['Authorization']]})()
+
+    def make_service(tmp, account_id, token):
+        service = OutlookService(account_id=account_id)
+        service.token = token
+        service.cursor_path = f"{tmp}/outlook_cursors.json"
+        return service
+
+    original = outlook_module._http_session
+    outlook_module._http_session = FailingSession()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            alice = make_service(tmp, 'alice.tenant', 'alice-token')
+            bob = make_service(tmp, 'bob.tenant', 'bob-token')
+            for _ in range(5):
+                assert alice.search_customer_emails('Acme') == alice._mock_email_data('Acme')
+                assert bob.search_customer_emails('Acme') == bob._mock_email_data('Acme')
+    finally:
+        outlook_module._http_session = original
+    # Graph 5xx for Alice opened Alice's breaker after three tries; Bob's expired token (401)
+    # is Bob's problem only: it neither trips a breaker nor affects Alice
+    assert [auth for auth, _ in requests].count('Bearer alice-token') == 3
+    assert [auth for auth, _ in requests].count('Bearer bob-token') == 5
+    assert requests[0][1] == (outlook_module.Config.OUTLOOK_CONNECT_TIMEOUT, outlook_module.Config.OUTLOOK_TIMEOUT)
+    assert get_breaker('outlook', 'alice.tenant').snapshot()['state'] == 'open'
+    assert get_breaker('outlook', 'bob.tenant').snapshot()['state'] == 'closed'
+    circuit_breaker.clear()
+
+def test_ignored_errors_do_not_count():
+    breaker = CircuitBreaker('ignored', failure_threshold=1)
+    try:
+        breaker.call(failing, is_failure=lambda e: 'AccessDenied' not in str(e))
+    except RuntimeError:
+        pass
+    assert breaker.snapshot()['state'] == 'closed'
+
+def test_fast_fail_client_config():
+    config = fast_fail_config()
+    assert config.connect_timeout == 3 and config.read_timeout == 15
+    assert config.retries == {'max_attempts': 2, 'mode': 'standard'}
+    fast = get_client('ce', 'us-east-1', fast_fail=True)
+    assert fast is get_client('ce', 'us-east-1', fast_fail=True)
+    assert fast is not get_client('ce', 'us-east-1')
+    assert fast.meta.config.read_timeout == 15
+
+if __name__ == "__main__":
+    test_breaker_opens_probes_and_closes()
+    test_single_probe_under_concurrency()
+    test_failing_backend_short_circuits_to_mock()
+    test_outlook_breaker_skips_graph()
+    test_ignored_errors_do_not_count()
+    test_fast_fail_client_config()
+    print("✅ Circuit breaker tests passed")
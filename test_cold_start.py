@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the web tier starts without the pipeline's heavy dependencies and warms them after the first request.
+"""
+
+import os
+import subprocess
+import sys
+
+from benchmark_import_time import HEAVY_MODULES, measure, parse_importtime, top_level_import
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def run_python(code, **env_overrides):
+    env = dict(os.environ, AWS_EC2_METADATA_DISABLED='true', **env_overrides)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    return output.splitlines()[-1] if output else ''
+
+def test_app_import_skips_heavy_modules():
+    result = measure('app')
+    assert result['heavy_modules'] == []
+    assert result['total_ms'] > 0
+    assert 'flask' in [name for name, _ in result['direct_imports']]
+
+FIRST_REQUEST = (
+    "import sys, app\n"
+    "assert 'services.presentation_agent' not in sys.modules\n"
+    "app.app.test_client().get('/')\n"
+    "app._preload_thread.join(60)\n"
+    "pool = app.worker_pool._pool is not None if app.worker_pool else None\n"
+    f"print(pool, ','.join(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))\n"
+)
+
+def test_first_request_preloads_pipeline():
+    # In-process: the agent and its libraries are imported in the background
+    pool, loaded = run_python(FIRST_REQUEST, WORKER_PROCESSES='0').split(' ')
+    assert pool == 'None'
+    assert {'boto3', 'pptx', 'pdfplumber', 'msal', 'numpy'} <= set(loaded.split(','))
+
+    # With worker processes, the workers load them and the web process stays lean
+    assert run_python(FIRST_REQUEST, WORKER_PROCESSES='1') == 'True'
+
+# Tail of a real `python -X importtime -c 'import json'` run (Python 3.11)
+JSON_IMPORTTIME = """\
+import time:      1428 |      37566 | site
+import time:       234 |        234 |       _json
+import time:       608 |        842 |     json.scanner
+import time:       533 |       1374 |   json.decoder
+import time:       576 |        576 |   json.encoder
+import time:       308 |       2258 | json
+"""
+
+def test_parse_importtime():
+    rows = parse_importtime(JSON_IMPORTTIME)
+    assert rows == [('site', 1428, 37566, 0), ('_json', 234, 234, 3), ('json.scanner', 608, 842, 2),
+                    ('json.decoder', 533, 1374, 1), ('json.encoder', 576, 576, 1), ('json', 308, 2258, 0)]
+    # The depth-0 json row is selected, with only its depth-1 rows as direct imports
+    assert top_level_import(rows, 'json') == (2258, [('json.decoder', 1374), ('json.encoder', 576)])
+
+def test_measure_reports_module_not_imported():
+    # sys is loaded before -c runs, so importtime has no row for it
+    try:
+        measure('sys')
+        assert False, "measure returned without a row for sys"
+    except RuntimeError as e:
+        assert "'sys'" in str(e)
+
+if __name__ == "__main__":
+    test_app_import_skips_heavy_modules()
+    test_first_request_preloads_pipeline()
+    test_parse_importtime()
+    test_measure_reports_module_not_imported()
+    print("✅ Cold start tests passed")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script to verify cost trend analytics: month-over-month movers, rolling averages and z-score anomalies.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+import numpy as np
+from services.aws_data_service import AWSDataService
+from services.cost_analytics import CostAnalytics
+
+START = date(2026, 7, 1)
+
+def daily_results(series):
+    """Cost Explorer ResultsByTime for {(service, account): [daily costs]}."""
+    days = len(next(iter(series.values())))
+    return [{'TimePeriod': {'Start': str(START + timedelta(days=day))},
+             'Groups': [{'Keys': list(key), 'Metrics': {'UnblendedCost': {'Amount': str(costs[day])}}}
+                        for key, costs in series.items()]}
+            for day in range(days)]
+
+def build():
+    days = np.arange(92)  # July, August, September
+    ec2 = np.where(days >= 62, 130.0, 100.0)  # +30% from September
+    s3 = np.full(92, 50.0)
+    s3[80] = 400.0  # one-day spike
+    rds = np.full(92, 80.0)
+    return CostAnalytics.from_results_by_time(daily_results({
+        ('Amazon EC2', '111111111111'): ec2,
+        ('Amazon S3', '111111111111'): s3,
+        ('Amazon RDS', '222222222222'): rds,
+    }), rolling_days=7, baseline_days=28, z_threshold=3.0, min_daily_cost=10)
+
+def test_month_over_month_and_rolling():
+    analytics = build()
+    facts = analytics.facts()
+    assert [m['month'] for m in facts['monthly_totals']] == ['2026-07', '2026-08', '2026-09']
+    assert facts['monthly_totals'][1]['cost'] == 31 * 230
+    movers = facts['top_movers']
+    assert movers[0]['service'] == 'Amazon EC2' and movers[0]['change_pct'] == 30.0
+    assert all(m['service'] != 'Amazon RDS' for m in movers)  # flat services are not movers
+    assert facts['daily_average_7d'] == 260.0
+    assert [m['account'] for m in facts['account_movers']] == ['111111111111']
+    totals = analytics.totals('service')
+    assert totals[0] == {'service': 'Amazon EC2', 'cost': 62 * 100.0 + 30 * 130.0}
+    # Only compact facts go into the context
+    assert len(json.dumps(facts)) < 3000
+
+def test_anomalies():
+    anomalies = build().anomalies()
+    assert anomalies[0]['service'] == 'Amazon S3' and anomalies[0]['date'] == str(START + timedelta(days=80))
+    assert anomalies[0]['expected'] == 50.0 and anomalies[0]['z_score'] > 10
+    assert all(a['service'] != 'Amazon RDS' for a in anomalies)
+
+    # Tiny series never produce anomalies, however spiky
+    noisy = CostAnalytics([str(START + timedelta(days=d)) for d in range(40)], [('Tiny', '')],
+                          [[0.5] * 39 + [5.0]], min_daily_cost=10)
+    assert noisy.anomalies() == []
+
+def test_day_split_across_pages():
+    series = {('Amazon EC2', '111111111111'): [100.0] * 61, ('Amazon S3', '111111111111'): [50.0] * 61}
+    results = daily_results(series)  # July and 30 days of August
+    split = 45
+    day = results[split]
+    # Page one ends after the first group of a day; page two repeats the day with the rest
+    pages = (results[:split] + [dict(day, Groups=day['Groups'][:1])],
+             [dict(day, Groups=day['Groups'][1:])] + results[split + 1:])
+    analytics = CostAnalytics.from_results_by_time(pages[1] + pages[0], rolling_days=7, baseline_days=28,
+                                                   z_threshold=3.0, min_daily_cost=10)
+    facts = analytics.facts()
+    assert facts['days'] == 61
+    assert [m['days'] for m in facts['monthly_totals']] == [31, 30]
+    assert facts['mom_change_pct'] == 0.0
+    assert analytics.anomalies() == []
+
+def test_cost_data_uses_daily_paginated_results():
+    results = daily_results({('Amazon EC2', '111111111111'): [10.0] * 60, ('Amazon S3', '111111111111'): [2.0] * 60})
+
+    class FakeCostExplorer:
+        def __init__(self):
+            self.requests = []
+
+        def get_cost_and_usage(self, **kwargs):
+            self.requests.append(kwargs)
+            if 'NextPageToken' not in kwargs:
+                return {'ResultsByTime': results[:30], 'NextPageToken': 'page2'}
+            return {'ResultsByTime': results[30:]}
+
+    service = AWSDataService.__new__(AWSDataService)
+    service.aws_available, service.using_customer_account, service.customer_account_id = True, False, None
+    service.ce_client = FakeCostExplorer()
+    costs = service.get_cost_data()
+    assert service.ce_client.requests[0]['Granularity'] == 'DAILY'
+    assert len(service.ce_client.requests) == 2
+    assert costs['total_cost'] == 720.0
+    assert costs['top_services'][0] == {'service': 'Amazon EC2', 'cost': 600.0}
+    assert costs['trends']['days'] == 60
+    assert 'highlights' in service._mock_cost_data()['trends']
+
+if __name__ == "__main__":
+    test_month_over_month_and_rolling()
+    test_anomalies()
+    test_day_split_across_pages()
+    test_cost_data_uses_daily_paginated_results()
+    print("✅ Cost analytics tests passed")
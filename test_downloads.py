@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify artifact downloads: strong ETags, If-None-Match, Range and gzip, plus the cached results page.
+"""
+
+import gzip
+import os
+import tempfile
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+import app as webapp
+from services.artifact_cache import ArtifactCache
+from services.file_cleanup import FileCleanup, new_job_id
+
+def make_job(tmp):
+    webapp.app.config.update(UPLOAD_FOLDER=os.path.join(tmp, 'uploads'), OUTPUT_FOLDER=os.path.join(tmp, 'outputs'))
+    job_id = new_job_id()
+    job_dir = FileCleanup.job_dir(webapp.app.config['OUTPUT_FOLDER'], job_id)
+    os.makedirs(job_dir)
+    files = {'presentation': 'Acme_MBR.pptx', 'summary': 'Acme_Changes.md', 'questions': 'Acme_Questions.md'}
+    contents = {'presentation': bytes(range(256)) * 40, 'summary': b'# Changes\n' * 200, 'questions': b'1. Why?\n' * 200}
+    for key, name in files.items():
+        with open(os.path.join(job_dir, name), 'wb') as f:
+            f.write(contents[key])
+    return job_id, job_dir, files, contents
+
+def test_downloads_are_conditional_and_ranged():
+    ArtifactCache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        job_id, _, files, contents = make_job(tmp)
+        client = webapp.app.test_client()
+        url = f"/download/{job_id}/{files['presentation']}"
+
+        first = client.get(url)
+        assert first.status_code == 200 and first.data == contents['presentation']
+        etag = first.headers['ETag']
+        assert not etag.startswith('W/')
+
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        partial = client.get(url, headers={'Range': 'bytes=0-99'})
+        assert partial.status_code == 206 and partial.data == contents['presentation'][:100]
+
+        md_url = f"/download/{job_id}/{files['summary']}"
+        zipped = client.get(md_url, headers={'Accept-Encoding': 'gzip'})
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(zipped.data) == contents['summary']
+        assert client.get(md_url, headers={'Accept-Encoding': 'gzip',
+                                           'If-None-Match': zipped.headers['ETag']}).status_code == 304
+        plain = client.get(md_url)
+        assert 'Content-Encoding' not in plain.headers and plain.data == contents['summary']
+        assert plain.headers['Content-Type'] == 'text/markdown; charset=utf-8'
+
+        assert client.get(f"/download/{job_id}/missing.pptx").status_code == 404
+        assert client.get(f"/download/{job_id}/..%2Fsecret").status_code == 404
+
+def test_text_artifacts_get_their_own_content_type():
+    ArtifactCache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        job_id, job_dir, _, _ = make_job(tmp)
+        client = webapp.app.test_client()
+        expected = {'Acme_Costs.csv': 'text/csv; charset=utf-8', 'Acme_Notes.txt': 'text/plain; charset=utf-8',
+                    'Acme_Data.json': 'application/json'}
+        for name, content_type in expected.items():
+            with open(os.path.join(job_dir, name), 'w') as f:
+                f.write('{}')
+            assert client.get(f"/download/{job_id}/{name}").headers['Content-Type'] == content_type
+
+def test_results_page_is_rendered_once():
+    ArtifactCache.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        job_id, job_dir, files, _ = make_job(tmp)
+        client = webapp.app.test_client()
+        with client.session_transaction() as session:
+            session['session_id'] = job_id
+            session['customer_name'] = 'Acme'
+            session['results'] = {key: os.path.join(job_dir, name) for key, name in files.items()}
+
+        rendered = []
+        original = webapp.render_template
+        webapp.render_template = lambda *args, **kwargs: rendered.append(1) or original(*args, **kwargs)
+        try:
+            first = client.get('/results')
+            second = client.get('/results', headers={'If-None-Match': first.headers['ETag']})
+            third = client.get('/results')
+        finally:
+            webapp.render_template = original
+        assert first.status_code == 200 and b'Acme' in first.data
+        assert second.status_code == 304
+        assert third.data == first.data
+        assert len(rendered) == 1
+
+if __name__ == "__main__":
+    test_downloads_are_conditional_and_ranged()
+    test_text_artifacts_get_their_own_content_type()
+    test_results_page_is_rendered_once()
+    print("✅ Download tests passed")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the background cleanup sweeper's age expiry and LRU quota eviction.
+"""
+
+import os
+import tempfile
+import time
+
+from services.file_cleanup import CleanupSweeper, FileCleanup, new_job_id, scan_files
+
+def write_file(path, size, age_seconds):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    stamp = time.time() - age_seconds
+    os.utime(path, (stamp, stamp))
+
+def test_sweep_expires_old_files_and_enforces_quota():
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads, outputs = os.path.join(tmp, 'uploads'), os.path.join(tmp, 'outputs')
+        write_file(os.path.join(uploads, 'ancient.pptx'), 100, 3 * 86400)
+        write_file(os.path.join(outputs, 'batch', 'b1', 'old.pptx'), 100, 3 * 86400)
+        write_file(os.path.join(outputs, 'lru.pptx'), 400, 3600)
+        write_file(os.path.join(outputs, 'recent.pptx'), 400, 1800)
+        write_file(os.path.join(uploads, 'inflight.pptx'), 400, 0)
+
+        sweeper = CleanupSweeper([uploads, outputs], max_age_hours=24, quota_bytes=900,
+                                 min_age_seconds=60)
+        stats = sweeper.sweep()
+
+        assert stats['deleted_age'] == 2
+        assert stats['deleted_quota'] == 1
+        remaining = sorted(os.path.basename(path) for d in (uploads, outputs) for path, _ in scan_files(d))
+        assert remaining == ['inflight.pptx', 'recent.pptx']
+        assert stats['remaining_bytes'] == 800
+        # Directories the sweep emptied are pruned too
+        assert not os.path.exists(os.path.join(outputs, 'batch'))
+
+def test_quota_evicts_whole_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads, outputs = os.path.join(tmp, 'uploads'), os.path.join(tmp, 'outputs')
+        old_job, new_job = new_job_id(), new_job_id()
+        # The older job's summary was read recently, but its other files were not
+        write_file(os.path.join(uploads, old_job, 'deck.pptx'), 300, 7200)
+        write_file(os.path.join(outputs, old_job, 'questions.md'), 100, 7200)
+        write_file(os.path.join(outputs, old_job, 'summary.md'), 100, 3000)
+        write_file(os.path.join(outputs, new_job, 'questions.md'), 100, 600)
+        write_file(os.path.join(outputs, new_job, 'summary.md'), 100, 600)
+
+        sweeper = CleanupSweeper([uploads, outputs], max_age_hours=24, quota_bytes=600, min_age_seconds=60)
+        stats = sweeper.sweep()
+
+        # Evicting only old files would have left the first job with a summary but no questions
+        assert stats['deleted_quota'] == 3 and stats['remaining_bytes'] == 200
+        assert not os.path.exists(os.path.join(outputs, old_job))
+        assert not os.path.exists(os.path.join(uploads, old_job))
+        assert sorted(os.listdir(os.path.join(outputs, new_job))) == ['questions.md', 'summary.md']
+
+def test_sweeper_thread_starts_without_blocking():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_file(os.path.join(tmp, 'old.txt'), 10, 3 * 86400)
+        sweeper = CleanupSweeper([tmp], max_age_hours=24, quota_bytes=0, interval_seconds=60).start()
+        deadline = time.time() + 5
+        while sweeper.last_sweep is None and time.time() < deadline:
+            time.sleep(0.01)
+        sweeper.stop(timeout=5)
+        assert sweeper.last_sweep['deleted_age'] == 1
+
+def test_job_directories_are_isolated_and_removed_whole():
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads, outputs = os.path.join(tmp, 'uploads'), os.path.join(tmp, 'outputs')
+        first, second = new_job_id(), new_job_id()
+        for job_id in (first, second):
+            write_file(os.path.join(FileCleanup.job_dir(uploads, job_id), 'deck.pptx'), 100, 0)
+            write_file(os.path.join(FileCleanup.job_dir(outputs, job_id), 'Acme_MBR.pptx'), 50, 0)
+
+        assert FileCleanup.job_disk_usage(first, uploads, outputs) == 150
+        assert FileCleanup.cleanup_session_files(first, uploads, outputs)
+        assert not os.path.exists(FileCleanup.job_dir(uploads, first))
+        assert not os.path.exists(FileCleanup.job_dir(outputs, first))
+        assert FileCleanup.job_disk_usage(second, uploads, outputs) == 150
+
+        try:
+            FileCleanup.job_dir(uploads, '../etc')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_sweep_expires_old_files_and_enforces_quota()
+    test_quota_evicts_whole_jobs()
+    test_sweeper_thread_starts_without_blocking()
+    test_job_directories_are_isolated_and_removed_whole()
+    print("✅ File cleanup tests passed")
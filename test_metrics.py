@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the instrumentation layer and Prometheus rendering.
+"""
+
+import time
+from services.metrics import MetricsRegistry
+
+def test_counters_and_histograms_render():
+    """Counters and histograms render in Prometheus text format."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe('mbr_llm_calls_total', 'Bedrock invocations')
+    registry.inc('mbr_llm_calls_total', model='haiku', outcome='ok')
+    registry.inc('mbr_llm_calls_total', 2, model='haiku', outcome='ok')
+    registry.observe('mbr_stage_seconds', 0.5, stage='score_slides')
+
+    text = registry.render_prometheus()
+    print(text)
+    assert '# HELP mbr_llm_calls_total Bedrock invocations' in text
+    assert 'mbr_llm_calls_total{model="haiku",outcome="ok"} 3' in text
+    assert 'mbr_stage_seconds_bucket{stage="score_slides",le="0.1"} 0' in text
+    assert 'mbr_stage_seconds_bucket{stage="score_slides",le="1"} 1' in text
+    assert 'mbr_stage_seconds_count{stage="score_slides"} 1' in text
+
+def test_spans_feed_job_trace():
+    """Spans and stages inside a job trace show up in its breakdown only."""
+    registry = MetricsRegistry()
+
+    with registry.job_trace() as trace:
+        with registry.span('aws.cost_explorer'):
+            time.sleep(0.01)
+        with registry.span('aws.cost_explorer'):
+            pass
+        registry.stage('gather_context', 0.25)
+
+    with registry.span('aws.cost_explorer'):
+        pass
+
+    breakdown = trace.breakdown()
+    assert breakdown['calls']['aws.cost_explorer']['count'] == 2
+    assert breakdown['calls']['aws.cost_explorer']['seconds'] >= 0.01
+    assert breakdown['stages'] == {'gather_context': 0.25}
+    assert 'mbr_span_seconds_count{span="aws.cost_explorer"} 3' in registry.render_prometheus()
+
+def test_label_values_are_escaped():
+    """Quotes and newlines in label values do not break the exposition format."""
+    registry = MetricsRegistry()
+    registry.inc('mbr_mock_fallback_total', backend='say "hi"\nthere')
+    assert 'backend="say \\"hi\\"\\nthere"' in registry.render_prometheus()
+
+if __name__ == "__main__":
+    test_counters_and_histograms_render()
+    test_spans_feed_job_trace()
+    test_label_values_are_escaped()
+    print("✅ Metrics tests passed")
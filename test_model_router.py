@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script to verify per-task model routing and per-model cost accounting.
+"""
+
+import io
+import json
+import os
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+from config import Config
+from services.bedrock_service import BedrockService
+from services.model_router import ModelRouter
+
+HAIKU = 'anthropic.claude-3-haiku-20240307-v1:0'
+
+class FakeBedrockClient:
+    """Records the modelId of every call and returns a fixed usage block."""
+
+    def __init__(self):
+        self.models = []
+
+    def invoke_model(self, modelId, body):
+        self.models.append(modelId)
+        payload = {'content': [{'text': '8|Relevant'}], 'usage': {'input_tokens': 1000, 'output_tokens': 1000}}
+        return {'body': io.BytesIO(json.dumps(payload).encode())}
+
+def test_routes_by_task_and_customer():
+    """Scoring goes to the fast model, narrative to the strong one; customers can override."""
+    router = ModelRouter(routes={}, customer_routes={'Acme Corp': {'default': 'strong'},
+                                                     'Globex': {'questions': 'custom-model'}},
+                         pricing={})
+    assert router.model_for('relevance') == Config.BEDROCK_FAST_MODEL_ID
+    assert router.model_for('talking_points') == Config.BEDROCK_MODEL_ID
+    assert router.model_for('unknown-task') == Config.BEDROCK_MODEL_ID
+    assert router.model_for('relevance', 'acme corp') == Config.BEDROCK_MODEL_ID
+    assert router.model_for('questions', 'Globex') == 'custom-model'
+    assert router.model_for('relevance', 'Globex') == Config.BEDROCK_FAST_MODEL_ID
+
+def test_cost_uses_pricing_table():
+    router = ModelRouter(routes={}, customer_routes={}, pricing={'custom-model': [0.01, 0.02]})
+    assert abs(router.cost(HAIKU, 1000, 1000) - 0.0015) < 1e-9
+    assert abs(router.cost('custom-model', 500, 1000) - 0.025) < 1e-9
+    assert router.cost('unpriced-model', 1000, 1000) == 0
+
+def test_bedrock_service_tracks_usage_per_model():
+    """BedrockService sends each task to its routed model and totals usage per model."""
+    router = ModelRouter(routes={'relevance': HAIKU, 'questions': 'strong-model'},
+                         customer_routes={}, pricing={'strong-model': [0.003, 0.015]})
+    service = BedrockService(router=router)
+    service.client = FakeBedrockClient()
+    service.bedrock_available = True
+
+    assert service.assess_slide_relevance("EC2 Costs", "Spend by service", "cost")[0] == 8
+    service.generate_questions("analysis")
+    service.generate_questions("analysis")
+
+    assert service.client.models == [HAIKU, 'strong-model', 'strong-model']
+    usage = service.usage_summary()
+    assert usage[HAIKU]['calls'] == 1
+    assert usage['strong-model']['calls'] == 2
+    assert abs(usage['strong-model']['cost_usd'] - 0.036) < 1e-9
+    assert service.call_count == 3
+
+if __name__ == "__main__":
+    test_routes_by_task_and_customer()
+    test_cost_uses_pricing_table()
+    test_bedrock_service_tracks_usage_per_model()
+    print("✅ Model router tests passed")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test script to verify relevance-ranked notes retrieval.
+"""
+
+from services.notes_index import NotesIndex
+
+SA_NOTES = """Kickoff call with platform team.
+
+The RDS cluster shows slow queries during peak hours, they are considering Aurora.
+
+Container strategy: evaluating ECS versus EKS for the monolith split.
+
+Finance asked for Savings Plans coverage numbers before renewal."""
+
+def test_search_ranks_relevant_chunk_first():
+    """The chunk sharing the query's rare terms ranks first."""
+    index = NotesIndex({'sa_notes': SA_NOTES}, chunk_chars=90)
+    assert len(index) >= 3
+
+    hits = index.search("RDS Performance and Aurora", top_k=2)
+    print(f"   Top hit: {hits[0]['text']}")
+    assert "RDS cluster" in hits[0]['text']
+    assert hits[0]['source'] == 'sa_notes'
+
+def test_excerpt_respects_budget_and_skips_unrelated():
+    """Excerpts stay within budget and are empty when nothing matches."""
+    index = NotesIndex({'sa_notes': SA_NOTES, 'previous_mbr': "[PDF extraction failed or empty]"},
+                       chunk_chars=90)
+
+    excerpt = index.excerpt("ECS EKS containers", max_chars=60)
+    assert len(excerpt) <= 60
+    assert excerpt.startswith("[sa_notes]")
+
+    assert index.excerpt("Thank you") == ""
+
+def test_bracketed_notes_are_indexed():
+    """Only extractor placeholders are skipped, not notes that happen to start with '['."""
+    index = NotesIndex({'sa_notes': "[Action] migrate the RDS cluster to Aurora",
+                        'meeting_notes': "[2026-03-01] call notes: EKS upgrade blocked",
+                        'previous_mbr': "[PDF extraction failed or empty]",
+                        'account_data': "[Error: File is not a zip file]"})
+    assert sorted(chunk['source'] for chunk in index.chunks) == ['meeting_notes', 'sa_notes']
+    assert index.search("Aurora")[0]['source'] == 'sa_notes'
+
+def test_empty_index():
+    """No notes means no chunks and no matches."""
+    index = NotesIndex({})
+    assert len(index) == 0
+    assert index.search("anything") == []
+
+if __name__ == "__main__":
+    test_search_ranks_relevant_chunk_first()
+    test_excerpt_respects_budget_and_skips_unrelated()
+    test_bracketed_notes_are_indexed()
+    test_empty_index()
+    print("✅ Notes index tests passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script to verify DOCX and PPTX text extraction for uploaded notes.
+"""
+
+import os
+import tempfile
+import zipfile
+from pptx import Presentation
+from services.office_extractor import OfficeExtractor
+from services.context_gatherer import ContextGatherer
+
+DOCX_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>Customer wants </w:t></w:r><w:r><w:t>EKS guidance</w:t></w:r></w:p>
+    <w:p></w:p>
+    <w:p><w:r><w:t>RDS slow at peak</w:t></w:r></w:p>
+  </w:body>
+</w:document>"""
+
+def build_docx(path):
+    """Write a minimal Word document containing only the main document part."""
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('word/document.xml', DOCX_XML)
+
+def build_pptx(path):
+    """Write a three-slide deck with notes on the second slide."""
+    prs = Presentation()
+    for title in ["Q1 Review", "Cost Overview", "Next Steps"]:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title
+        slide.placeholders[1].text_frame.text = f"{title} details"
+    prs.slides[1].notes_slide.notes_text_frame.text = "Spend up 30%"
+    prs.save(path)
+
+def test_docx_paragraphs():
+    """Paragraph runs are joined and empty paragraphs skipped."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.docx')
+        build_docx(path)
+
+        paragraphs = list(OfficeExtractor.iter_docx_paragraphs(path))
+        assert paragraphs == ["Customer wants EKS guidance", "RDS slow at peak"]
+
+def test_pptx_slides_in_order_with_notes():
+    """Slides come out in presentation order with speaker notes attached."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'previous.pptx')
+        build_pptx(path)
+
+        slides = list(OfficeExtractor.iter_pptx_slides(path))
+        assert len(slides) == 3
+        assert slides[0].startswith("Q1 Review")
+        assert "Notes: Spend up 30%" in slides[1]
+
+        text = OfficeExtractor.extract_text(path, max_chars=25)
+        assert len(text) <= 25 + 2
+
+def test_context_gatherer_uses_office_extractor():
+    """Uploaded DOCX/PPTX files are extracted instead of reported as unsupported."""
+    with tempfile.TemporaryDirectory() as tmp:
+        docx_path = os.path.join(tmp, 'notes.docx')
+        pptx_path = os.path.join(tmp, 'previous.pptx')
+        build_docx(docx_path)
+        build_pptx(pptx_path)
+
+        gatherer = ContextGatherer.__new__(ContextGatherer)
+        notes = gatherer._process_uploaded_files({'sa_notes': docx_path, 'previous_mbr': pptx_path})
+        assert "EKS guidance" in notes['sa_notes']
+        assert "Cost Overview" in notes['previous_mbr']
+
+if __name__ == "__main__":
+    test_docx_paragraphs()
+    test_pptx_slides_in_order_with_notes()
+    test_context_gatherer_uses_office_extractor()
+    print("✅ Office extraction tests passed")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script to verify paged, cursor-based Outlook email fetching.
+"""
+
+import json
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+import services.outlook_service as outlook_module
+from services.outlook_service import OutlookService
+
+class FakeSession:
+    def __init__(self, get):
+        self.get = get
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+def iso(days_ago):
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def make_service(tmp, account_id='alice.tenant'):
+    service = OutlookService(account_id=account_id)
+    service.token = 'test-token'
+    service.cursor_path = f"{tmp}/outlook_cursors.json"
+    return service
+
+def test_follows_next_link_and_selects_fields():
+    """All pages are read and only the used fields are requested."""
+    pages = {
+        outlook_module.GRAPH_MESSAGES_URL: {
+            'value': [{'subject': 'Cost review', 'receivedDateTime': iso(1), 'bodyPreview': 'x'}],
+            '@odata.nextLink': 'https://graph.microsoft.com/v1.0/me/messages?page=2'
+        },
+        'https://graph.microsoft.com/v1.0/me/messages?page=2': {
+            'value': [{'subject': 'EKS question', 'receivedDateTime': iso(2), 'bodyPreview': 'y'}]
+        }
+    }
+    calls = []
+
+    def fake_get(url, headers=None, params=None, **kwargs):
+        calls.append((url, params))
+        return FakeResponse(pages[url])
+
+    original = outlook_module._http_session
+    outlook_module._http_session = FakeSession(fake_get)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            emails = make_service(tmp).search_customer_emails('Acme', days=30)
+    finally:
+        outlook_module._http_session = original
+
+    assert [e['subject'] for e in emails] == ['Cost review', 'EKS question']
+    assert calls[0][1]['$select'] == outlook_module.MESSAGE_FIELDS
+    assert 'received>=' in calls[0][1]['$search']
+    assert calls[1][1] is None
+
+def test_cursor_limits_later_runs_to_new_mail():
+    """A second run only asks for mail newer than the cursor and keeps earlier results."""
+    responses = [
+        {'value': [{'subject': 'Old thread', 'receivedDateTime': iso(5), 'bodyPreview': ''}]},
+        {'value': [{'subject': 'New thread', 'receivedDateTime': iso(0), 'bodyPreview': ''}]}
+    ]
+    searches = []
+
+    def fake_get(url, headers=None, params=None, **kwargs):
+        searches.append(params['$search'])
+        return FakeResponse(responses[len(searches) - 1])
+
+    original = outlook_module._http_session
+    outlook_module._http_session = FakeSession(fake_get)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_service(tmp).search_customer_emails('Acme', days=90)
+            emails = make_service(tmp).search_customer_emails('Acme', days=90)
+    finally:
+        outlook_module._http_session = original
+
+    cursor_day = (datetime.now(timezone.utc) - timedelta(days=5)).strftime('%Y-%m-%d')
+    assert f"received>={cursor_day}" in searches[1]
+    assert [e['subject'] for e in emails] == ['New thread', 'Old thread']
+
+def test_cursor_is_per_mailbox():
+    """Mail cached from one user's mailbox never shows up in another user's results."""
+    def fake_get(url, headers=None, params=None, **kwargs):
+        return FakeResponse({'value': [{'subject': f"Mail for {headers['Authorization']}",
+                                        'receivedDateTime': iso(1), 'bodyPreview': ''}]})
+
+    original = outlook_module._http_session
+    outlook_module._http_session = FakeSession(fake_get)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_service(tmp, 'alice.tenant').search_customer_emails('Acme')
+            bob = make_service(tmp, 'bob.tenant')
+            bob.token = 'bob-token'
+            emails = bob.search_customer_emails('Acme')
+            with open(f"{tmp}/outlook_cursors.json") as f:
+                keys = sorted(json.load(f))
+    finally:
+        outlook_module._http_session = original
+
+    assert [e['subject'] for e in emails] == ['Mail for Bearer bob-token']
+    assert keys == ['alice.tenant|acme', 'bob.tenant|acme']
+
+def test_http_session_is_shared():
+    """Every OutlookService reuses one pooled keep-alive session."""
+    original = outlook_module._http_session
+    outlook_module._http_session = None
+    try:
+        first = outlook_module.get_http_session()
+        assert outlook_module.get_http_session() is first
+        assert first.get_adapter('https://graph.microsoft.com')._pool_maxsize == outlook_module.Config.OUTLOOK_POOL_SIZE
+    finally:
+        outlook_module._http_session = original
+
+def test_msal_app_builds_without_deadlock():
+    """get_msal_app shares the Graph session without re-entering the module lock."""
+    built = []
+
+    class FakeConfidentialClient:
+        def __init__(self, client_id, **kwargs):
+            built.append((client_id, kwargs))
+
+    originals = (outlook_module._msal_app, outlook_module.Config.OUTLOOK_CLIENT_ID,
+                 outlook_module.Config.CACHE_FOLDER, outlook_module.msal.ConfidentialClientApplication)
+    outlook_module._msal_app = None
+    outlook_module.Config.OUTLOOK_CLIENT_ID = 'client-id'
+    outlook_module.msal.ConfidentialClientApplication = FakeConfidentialClient
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            outlook_module.Config.CACHE_FOLDER = tmp
+            result = []
+            worker = threading.Thread(target=lambda: result.append(outlook_module.get_msal_app()), daemon=True)
+            worker.start()
+            worker.join(5)
+            assert not worker.is_alive(), "get_msal_app deadlocked"
+    finally:
+        (outlook_module._msal_app, outlook_module.Config.OUTLOOK_CLIENT_ID,
+         outlook_module.Config.CACHE_FOLDER, outlook_module.msal.ConfidentialClientApplication) = originals
+    assert built[0][0] == 'client-id'
+    assert built[0][1]['http_client'] is outlook_module.get_http_session()
+
+def test_silent_token_only_for_own_account():
+    """A user who has not signed in never gets another user's cached token."""
+    refreshed = []
+
+    class FakeApp:
+        def get_accounts(self):
+            return [{'home_account_id': 'alice.tenant'}, {'home_account_id': 'bob.tenant'}]
+
+        def acquire_token_silent(self, scope, account):
+            refreshed.append(account['home_account_id'])
+            return {'access_token': f"token-{account['home_account_id']}"}
+
+    originals = (outlook_module._msal_app, outlook_module.Config.OUTLOOK_CLIENT_ID)
+    outlook_module._msal_app = FakeApp()
+    outlook_module.Config.OUTLOOK_CLIENT_ID = 'client-id'
+    try:
+        anonymous = OutlookService()
+        anonymous.client_id = 'client-id'
+        assert anonymous.acquire_token() is None
+        bob = OutlookService(account_id='bob.tenant')
+        bob.client_id = 'client-id'
+        assert bob.acquire_token() == 'token-bob.tenant'
+    finally:
+        outlook_module._msal_app, outlook_module.Config.OUTLOOK_CLIENT_ID = originals
+    assert refreshed == ['bob.tenant']
+    assert outlook_module.home_account_id({'id_token_claims': {'oid': 'abc', 'tid': 'xyz'}}) == 'abc.xyz'
+
+if __name__ == "__main__":
+    test_follows_next_link_and_selects_fields()
+    test_cursor_limits_later_runs_to_new_mail()
+    test_cursor_is_per_mailbox()
+    test_http_session_is_shared()
+    test_msal_app_builds_without_deadlock()
+    test_silent_token_only_for_own_account()
+    print("✅ Outlook service tests passed")
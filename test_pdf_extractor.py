@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streaming PDF extraction and budget cutoff.
+"""
+
+import os
+import tempfile
+from services.pdf_extractor import PDFExtractor
+
+def build_pdf(path, pages):
+    """
+    Write a minimal PDF. Each entry in pages is a string of text, None for a
+    page without any font resources (like a scanned image page), or
+    ('form', text) for text drawn by a Form XObject that holds the font.
+    """
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(None)
+    pages_id = add(None)
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for text in pages:
+        if text is None:
+            stream = b"0 0 m 100 100 l S"
+            resources = b"<< >>"
+        elif isinstance(text, tuple):
+            form = f"BT /F1 12 Tf 72 720 Td ({text[1]}) Tj ET".encode()
+            form_id = add(b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 %d 0 R >> >>"
+                          b" /Length %d >>\nstream\n" % (font_id, len(form)) + form + b"\nendstream")
+            stream = b"/Fm1 Do"
+            resources = b"<< /XObject << /Fm1 %d 0 R >> >>" % form_id
+        else:
+            stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+            resources = f"<< /Font << /F1 {font_id} 0 R >> >>".encode()
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Resources " % pages_id
+            + resources + b" /Contents %d 0 R >>" % content_id
+        ))
+
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref_pos = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_pos)
+
+    with open(path, 'wb') as f:
+        f.write(bytes(out))
+
+def test_iter_pages_skips_image_only_pages():
+    """Pages without a text layer are skipped."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.pdf')
+        build_pdf(path, ["First page", None, "Third page"])
+
+        pages = list(PDFExtractor.iter_pages(path, max_chars=0))
+        print(f"   Extracted pages: {pages}")
+        assert pages == ["First page", "Third page"]
+
+def test_form_xobject_text_is_not_skipped():
+    """Text drawn from a Form XObject counts as a text layer."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'exported.pdf')
+        build_pdf(path, [('form', "Form text"), None])
+
+        assert list(PDFExtractor.iter_pages(path, max_chars=0)) == ["Form text"]
+
+def test_budget_stops_extraction_early():
+    """Extraction stops once the character budget is used up."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.pdf')
+        build_pdf(path, [f"Page number {i}" for i in range(20)])
+
+        pages = list(PDFExtractor.iter_pages(path, max_chars=20))
+        assert pages == ["Page number 0", "Page nu"]
+
+        text = PDFExtractor.extract_text(path, max_tokens=5)
+        assert text == "Page number 0\n\nPage nu"
+
+def test_extract_text_is_cached():
+    """A second extraction of an unchanged file comes from the cache."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.pdf')
+        build_pdf(path, ["Cached page"])
+
+        assert PDFExtractor.extract_text(path, max_chars=0) == "Cached page"
+
+        original = PDFExtractor.iter_pages
+        PDFExtractor.iter_pages = staticmethod(lambda *args, **kwargs: iter(["re-parsed"]))
+        try:
+            assert PDFExtractor.extract_text(path, max_chars=0) == "Cached page"
+        finally:
+            PDFExtractor.iter_pages = original
+
+def test_metadata_extraction_opens_once_and_returns_full_text():
+    """extract_text_with_metadata reads everything from one open, ignoring the extraction budget."""
+    import pdfplumber
+    import services.pdf_extractor as pdf_extractor
+    from config import Config
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'notes.pdf')
+        build_pdf(path, [f"Page number {i}" for i in range(5)] + [None])
+
+        opened = []
+        original_open, budget = pdf_extractor.pdfplumber.open, Config.EXTRACT_MAX_CHARS
+        pdf_extractor.pdfplumber.open = lambda *args, **kwargs: opened.append(1) or pdfplumber.PDF.open(*args, **kwargs)
+        Config.EXTRACT_MAX_CHARS = 20
+        try:
+            result = PDFExtractor.extract_text_with_metadata(path)
+        finally:
+            pdf_extractor.pdfplumber.open, Config.EXTRACT_MAX_CHARS = original_open, budget
+        assert len(opened) == 1
+        assert result['pages'] == 6
+        assert result['text'] == "\n\n".join(f"Page number {i}" for i in range(5))
+
+if __name__ == "__main__":
+    test_iter_pages_skips_image_only_pages()
+    test_form_xobject_text_is_not_skipped()
+    test_budget_stops_extraction_early()
+    test_extract_text_is_cached()
+    test_metadata_extraction_opens_once_and_returns_full_text()
+    print("✅ PDF extraction tests passed")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the pipeline DAG executor: concurrency, ordering and critical-path timing.
+"""
+
+import os
+import tempfile
+import time
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+from pptx import Presentation
+from config import Config
+from services.metrics import metrics
+from services.pipeline_dag import DagExecutor, Stage
+from services.presentation_agent import PresentationAgent
+
+def sleeper(seconds, value=None):
+    def run(results):
+        time.sleep(seconds)
+        return value
+    return run
+
+def test_independent_stages_overlap_and_critical_path():
+    """Independent branches run together; the slow branch is the critical path."""
+    executor = DagExecutor(max_workers=4)
+    with metrics.job_trace() as trace:
+        results = executor.run([
+            Stage('context', sleeper(0.2, 'ctx')),
+            Stage('deck', sleeper(0.1, 'deck')),
+            Stage('score', lambda r: (r['context'], r['deck']), ['context', 'deck']),
+            Stage('questions', sleeper(0.05, 'q'), ['context']),
+        ])
+    assert results['score'] == ('ctx', 'deck')
+    report = executor.timing_report()
+    assert report['wall_seconds'] < 0.3
+    assert report['critical_path'][0] == 'context'
+    assert set(report['critical_path']) <= {'context', 'score', 'questions'}
+    # Stage timings reach the job trace even though stages ran on pool threads
+    assert set(trace.breakdown()['stages']) == {'context', 'deck', 'score', 'questions'}
+
+def test_invalid_graphs_and_errors():
+    for stages in ([Stage('a', sleeper(0), ['missing'])],
+                   [Stage('a', sleeper(0), ['b']), Stage('b', sleeper(0), ['a'])]):
+        try:
+            DagExecutor().run(stages)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    def boom(results):
+        raise RuntimeError("stage failed")
+    ran = []
+    try:
+        DagExecutor(max_workers=1).run([Stage('a', boom), Stage('b', lambda r: ran.append('b'), ['a'])])
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert ran == []
+
+def build_deck(tmp, titles):
+    deck = os.path.join(tmp, 'deck.pptx')
+    prs = Presentation()
+    for title in titles:
+        prs.slides.add_slide(prs.slide_layouts[1]).shapes.title.text = title
+    prs.save(deck)
+    return deck
+
+def slow_agent(score_seconds, points_seconds, events):
+    """An agent whose scoring and talking-point calls sleep and log when they start."""
+    agent = PresentationAgent()
+    agent.bedrock.bedrock_available = False
+
+    def assess(title, content, analysis):
+        events.append(('score', title, time.perf_counter()))
+        time.sleep(score_seconds)
+        return 8, "relevant"
+
+    def points(slide, gathered):
+        events.append(('points', slide.title, time.perf_counter()))
+        time.sleep(points_seconds)
+        return "points", 0.001
+
+    agent.bedrock.assess_slide_relevance = assess
+    agent._slide_talking_points = points
+    return agent
+
+def run_with(agent, deck, tmp, workers):
+    saved = Config.SLIDE_PREFILTER, Config.SLIDE_WORKERS
+    Config.SLIDE_PREFILTER, Config.SLIDE_WORKERS = False, workers
+    try:
+        return agent.process_presentation(deck, 'Acme', 'technical', {}, tmp)
+    finally:
+        Config.SLIDE_PREFILTER, Config.SLIDE_WORKERS = saved
+
+def test_speculative_talking_points_are_used():
+    """Kept slides reuse their speculative talking points, with no duplicate calls."""
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = build_deck(tmp, ["AWS Cost Overview", "Support Case Summary", "Security & Compliance"])
+        agent = PresentationAgent()
+        agent.bedrock.bedrock_available = False
+        results = run_with(agent, deck, tmp, Config.SLIDE_WORKERS)
+        kept = len(results['changes']['reordered'])
+        assert results['data_sources']['speculation'] == {'used': kept, 'wasted': 0, 'cancelled': 0}
+        assert len(results['changes']['talking_points_added']) == kept
+        # One scoring call per slide, one talking-points call per kept slide, no duplicates
+        assert results['llm_calls'] == 3 + kept + 2
+
+def test_talking_points_do_not_queue_behind_scoring():
+    """With more slides than SLIDE_WORKERS, the first kept slide's talking points start mid-scoring."""
+    events = []
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = build_deck(tmp, [f"Slide {i}" for i in range(4)])
+        run_with(slow_agent(0.05, 0.01, events), deck, tmp, 1)
+    first_points = min(t for kind, _, t in events if kind == 'points')
+    last_score = max(t for kind, _, t in events if kind == 'score')
+    assert first_points < last_score
+
+def test_failed_run_cancels_speculation_without_waiting():
+    """A failed run cancels queued talking points and counts running ones as waste."""
+    events = []
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = build_deck(tmp, [f"Slide {i}" for i in range(3)])
+        agent = slow_agent(0, 0.5, events)
+
+        def fail(r):
+            time.sleep(0.05)  # let the first talking-points call start
+            raise RuntimeError("reorder failed")
+        agent._reorder_slides = fail
+        wasted = metrics.counter_value('mbr_speculation_wasted_usd_total')
+        started = time.perf_counter()
+        try:
+            run_with(agent, deck, tmp, 1)
+            assert False, "expected RuntimeError"
+        except RuntimeError:
+            pass
+        assert time.perf_counter() - started < 0.5
+    assert agent.speculation == {'used': 0, 'wasted': 1, 'cancelled': 2}
+    # The call in flight adds its cost once it finishes
+    time.sleep(0.6)
+    assert round(metrics.counter_value('mbr_speculation_wasted_usd_total') - wasted, 6) == 0.001
+
+if __name__ == "__main__":
+    test_independent_stages_overlap_and_critical_path()
+    test_invalid_graphs_and_errors()
+    test_speculative_talking_points_are_used()
+    test_talking_points_do_not_queue_behind_scoring()
+    test_failed_run_cancels_speculation_without_waiting()
+    print("✅ Pipeline DAG tests passed")
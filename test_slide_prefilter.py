@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local slide relevance pre-filter.
+"""
+
+from services.slide_records import SlideRecord
+from services.slide_prefilter import BOILERPLATE_SCORE, MATCHED_SCORE, SlidePrefilter, signal_terms
+
+AWS_DATA = {
+    'costs': {'top_services': [
+        {'service': 'Amazon Elastic Compute Cloud - Compute', 'cost': 15420.50},
+        {'service': 'Amazon Relational Database Service', 'cost': 8930.25},
+        {'service': 'Amazon Simple Storage Service', 'cost': 3210.75},
+    ]},
+    'support_cases': [{'subject': 'RDS performance degradation', 'service': 'amazon-rds'}],
+    'health_events': [{'service': 'EC2', 'event_type': 'AWS_EC2_INSTANCE_RETIREMENT_SCHEDULED'}],
+}
+
+def slide(index, title, *content):
+    return SlideRecord(index, title, list(content))
+
+def test_signal_terms_normalise_service_names():
+    assert signal_terms('Amazon Elastic Compute Cloud - Compute') == ['ec2']
+    assert signal_terms('amazon-rds') == ['rds']
+
+def test_structural_slides_are_settled_locally():
+    prefilter = SlidePrefilter(AWS_DATA)
+    assert prefilter.prescore(slide(0, 'Monthly Business Review', 'Q1 2026 - Acme'))[0] == BOILERPLATE_SCORE
+    assert prefilter.prescore(slide(1, 'Agenda', 'Cost review', 'Roadmap'))[0] == BOILERPLATE_SCORE
+    assert prefilter.prescore(slide(9, 'Thank You!', 'Questions?'))[0] == BOILERPLATE_SCORE
+    assert prefilter.prescore(slide(5, 'Section Divider'))[0] == BOILERPLATE_SCORE
+    # A title mentioning a structural word is not boilerplate
+    assert prefilter.prescore(slide(6, 'Questions on the container roadmap', 'ECS vs EKS')) is None
+
+def test_signal_matches_settle_and_ambiguous_slides_go_to_llm():
+    prefilter = SlidePrefilter(AWS_DATA)
+    score, reason = prefilter.prescore(slide(3, 'RDS Performance Review', 'Slow queries at peak'))
+    assert score == MATCHED_SCORE and 'RDS (top spend)' in reason
+    assert prefilter.prescore(slide(2, 'EC2 Rightsizing', 'Instance families'))[0] == MATCHED_SCORE
+    # One weaker signal is not enough to skip the LLM
+    assert prefilter.prescore(slide(4, 'S3 Storage Classes', 'Lifecycle policies')) is None
+    assert prefilter.prescore(slide(7, 'Innovation Opportunities', 'Generative AI')) is None
+    # Without customer data nothing content-bearing is settled
+    assert SlidePrefilter({}).prescore(slide(3, 'RDS Performance Review', 'Slow queries')) is None
+
+if __name__ == "__main__":
+    test_signal_terms_normalise_service_names()
+    test_structural_slides_are_settled_locally()
+    test_signal_matches_settle_and_ambiguous_slides_go_to_llm()
+    print("✅ Slide pre-filter tests passed")
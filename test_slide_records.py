@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script to verify slotted slide records flow through extraction, reordering and the change summary.
+"""
+
+import io
+import os
+import zipfile
+
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+from services.pptx_service import PowerPointService
+from services.slide_records import ScoredSlide, SlideRecord
+
+def build_presentation():
+    prs = Presentation()
+    for title, body in [("Agenda", "Cost review"), ("EC2 Spend", "Rightsizing candidates"), ("RDS", "Slow queries")]:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title
+        slide.placeholders[1].text = body
+    return prs
+
+def test_records_through_pipeline_steps():
+    service = PowerPointService()
+    prs = build_presentation()
+    slides = service.extract_slide_content(prs)
+    assert all(isinstance(s, SlideRecord) for s in slides)
+    assert slides[1].title == "EC2 Spend" and slides[1].text == "Rightsizing candidates"
+    assert slides[1].text is slides[1].text  # joined once, then cached
+    assert not hasattr(slides[1], '__dict__')
+
+    scored = [ScoredSlide(slides[2], 9, "Open case"), ScoredSlide(slides[1], 8), ScoredSlide(slides[0], 3, "Agenda")]
+    prs = service.reorder_slides(prs, scored[:2])
+    assert [s.shapes.title.text for s in prs.slides] == ["RDS", "EC2 Spend"]
+
+    summary = service.create_change_summary({'removed_slides': scored[2:], 'reordered': scored[:2]})
+    assert "- Slide 0: Agenda - Agenda" in summary
+    assert "1. RDS (was position 3)" in summary
+
+def test_legacy_dicts_accepted_like_scored_slides():
+    service = PowerPointService()
+    removed = [{'slide': {'index': 0, 'title': 'Agenda'}, 'score': 3, 'reason': 'Agenda'}]
+    reordered = [{'slide': {'index': 2, 'title': 'RDS'}, 'score': 9}, ScoredSlide(SlideRecord(1, 'EC2 Spend'), 8)]
+    prs = service.reorder_slides(build_presentation(), reordered)
+    assert [s.shapes.title.text for s in prs.slides] == ["RDS", "EC2 Spend"]
+
+    summary = service.create_change_summary({'removed_slides': removed, 'reordered': reordered})
+    assert "- Slide 0: Agenda - Agenda" in summary
+    assert "1. RDS (was position 3)" in summary and "2. EC2 Spend (was position 2)" in summary
+
+def test_flat_change_dicts_still_summarised():
+    # The shape PresentationAgent stores in results['changes']
+    summary = PowerPointService().create_change_summary({
+        'removed_slides': [{'index': 1, 'title': 'T', 'reason': 'r'}],
+        'reordered': [{'title': 'A', 'original_index': 0, 'score': 9}]})
+    assert "- Slide 1: T - r" in summary
+    assert "1. A (was position 1)" in summary
+
+def test_removed_slides_and_their_media_are_pruned():
+    prs = Presentation()
+    for i in range(4):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = f"Slide {i}"
+        image = io.BytesIO()
+        Image.frombytes('RGB', (32, 32), os.urandom(32 * 32 * 3)).save(image, 'PNG')
+        image.seek(0)
+        slide.shapes.add_picture(image, Inches(1), Inches(1))
+        slide.notes_slide.notes_text_frame.text = f"Notes {i}"
+
+    kept = [ScoredSlide(SlideRecord(3), 9), ScoredSlide(SlideRecord(1), 7)]
+    prs = PowerPointService().reorder_slides(prs, kept)
+    output = io.BytesIO()
+    prs.save(output)
+
+    names = zipfile.ZipFile(output).namelist()
+    assert sum(n.startswith('ppt/media/') for n in names) == 2
+    assert sum(n.startswith('ppt/slides/slide') for n in names) == 2
+    reopened = Presentation(io.BytesIO(output.getvalue()))
+    assert [s.shapes.title.text for s in reopened.slides] == ["Slide 3", "Slide 1"]
+    assert reopened.slides[0].notes_slide.notes_text_frame.text == "Notes 3"
+
+if __name__ == "__main__":
+    test_records_through_pipeline_steps()
+    test_legacy_dicts_accepted_like_scored_slides()
+    test_flat_change_dicts_still_summarised()
+    test_removed_slides_and_their_media_are_pruned()
+    print("✅ Slide record tests passed")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test script to verify hashed-vector slide/context similarity used to break score ties.
+"""
+
+import numpy as np
+from services.slide_records import SlideRecord
+from services.slide_similarity import SlideSimilarity
+
+AWS_DATA = {
+    'costs': {'top_services': [
+        {'service': 'Amazon Elastic Compute Cloud - Compute', 'cost': 15000.0},
+        {'service': 'Amazon Simple Storage Service', 'cost': 1000.0},
+    ]},
+    'support_cases': [{'subject': 'RDS performance degradation', 'service': 'amazon-rds'}],
+    'health_events': [],
+}
+
+def slide(index, title, *content):
+    return SlideRecord(index, title, list(content))
+
+def test_similarity_ranks_slides_by_context_signals():
+    """Slides about open-case and high-spend services outrank unrelated slides."""
+    slides = [
+        slide(0, 'Innovation Opportunities', 'Generative AI and serverless'),
+        slide(1, 'S3 Storage Classes', 'Lifecycle policies'),
+        slide(2, 'RDS Performance Review', 'Slow queries and degradation at peak'),
+        slide(3, 'EC2 Rightsizing', 'EC2 instance families'),
+    ]
+    scores = SlideSimilarity(AWS_DATA).score_slides(slides)
+    assert scores.shape == (4,)
+    assert scores[0] == 0
+    assert scores[2] > scores[1] and scores[3] > scores[1]
+    assert np.all((scores >= 0) & (scores <= 1.0001))
+
+def test_empty_inputs():
+    assert SlideSimilarity(AWS_DATA).score_slides([]).shape == (0,)
+    assert SlideSimilarity({}).score_slides([slide(0, 'EC2')])[0] == 0
+
+if __name__ == "__main__":
+    test_similarity_ranks_slides_by_context_signals()
+    test_empty_inputs()
+    print("✅ Slide similarity tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script to verify content-addressed upload ingestion: hashing, deduplication, reference counts and garbage collection.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from services.extraction_cache import ExtractionCache
+from services.file_cleanup import CleanupSweeper
+from services.upload_store import UploadStore
+
+def test_identical_uploads_are_stored_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UploadStore(os.path.join(tmp, 'store'))
+        job_a, job_b = os.path.join(tmp, 'uploads', 'a'), os.path.join(tmp, 'uploads', 'b')
+        os.makedirs(job_a)
+        os.makedirs(job_b)
+        deck = os.urandom(3 * 1024 * 1024 + 17)
+
+        first = store.ingest(io.BytesIO(deck), job_a, 'template.pptx')
+        second = store.ingest(io.BytesIO(deck), job_b, 'renamed.pptx')
+        other = store.ingest(io.BytesIO(b'sa notes'), job_b, 'notes.txt')
+
+        assert first.sha256 == hashlib.sha256(deck).hexdigest() and first.size == len(deck)
+        assert not first.deduplicated and second.deduplicated and not other.deduplicated
+        assert second.path == os.path.join(job_b, 'renamed.pptx')
+        with open(second.path, 'rb') as f:
+            assert f.read() == deck
+        assert os.path.samefile(first.path, second.path)
+        assert store.refcount(first.sha256) == 2
+        assert not [n for n in os.listdir(store.root) if n.startswith('.ingest-')]
+
+        # Same content in two jobs is one extraction cache entry
+        ExtractionCache.clear()
+        calls = []
+        for path in (first.path, second.path):
+            ExtractionCache.get_or_extract(path, 100, lambda: calls.append(1) or 'text')
+        assert len(calls) == 1
+
+        shutil.rmtree(job_a)
+        assert store.refcount(first.sha256) == 1
+        assert store.collect_garbage() == 0
+        shutil.rmtree(job_b)
+        assert store.refcount(first.sha256) == 0
+        assert store.collect_garbage(min_age_seconds=3600) == 0
+        assert store.collect_garbage() == 2
+        assert not os.path.exists(store.blob_path(first.sha256))
+
+def test_sweeper_collects_unreferenced_blobs_but_keeps_reused_ones():
+    with tempfile.TemporaryDirectory() as tmp:
+        uploads = os.path.join(tmp, 'uploads')
+        store = UploadStore(os.path.join(tmp, 'store'))
+        job = os.path.join(uploads, 'job')
+        os.makedirs(job)
+        stored = store.ingest(io.BytesIO(b'deck' * 1000), job, 'deck.pptx')
+
+        # Two days later the same deck is uploaded again: its old mtime must not expire the new job
+        stamp = time.time() - 2 * 86400
+        os.utime(stored.path, (stamp, stamp))
+        reused = store.ingest(io.BytesIO(b'deck' * 1000), job, 'again.pptx')
+        assert reused.deduplicated
+
+        sweeper = CleanupSweeper([uploads], max_age_hours=24, quota_bytes=0, min_age_seconds=0,
+                                 upload_store=store)
+        stats = sweeper.sweep()
+        assert stats['deleted_age'] == 0 and stats['deleted_blobs'] == 0
+        assert store.refcount(reused.sha256) == 2
+
+        shutil.rmtree(job)
+        assert sweeper.sweep()['deleted_blobs'] == 1
+
+if __name__ == "__main__":
+    test_identical_uploads_are_stored_once()
+    test_sweeper_collects_unreferenced_blobs_but_keeps_reused_ones()
+    print("✅ Upload store tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script to verify warm worker processes run pipeline jobs and report their metrics back.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault('AWS_EC2_METADATA_DISABLED', 'true')
+
+from pptx import Presentation
+from services.metrics import MetricsRegistry, metrics
+from services.worker_pool import WarmWorkerPool
+
+def test_metrics_export_and_merge():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    worker.inc('mbr_llm_calls_total', 2, model='fast')
+    worker.observe('mbr_span_seconds', 0.02, span='bedrock.invoke')
+    parent.inc('mbr_llm_calls_total', 1, model='fast')
+    parent.observe('mbr_span_seconds', 3.0, span='bedrock.invoke')
+
+    parent.merge(worker.export())
+    parent.merge(worker.export())
+    assert parent.counter_value('mbr_llm_calls_total', model='fast') == 5
+    rendered = parent.render_prometheus()
+    assert 'mbr_span_seconds_count{span="bedrock.invoke"} 3' in rendered
+    assert 'mbr_span_seconds_bucket{span="bedrock.invoke",le="0.025"} 2' in rendered
+
+def test_jobs_run_in_warm_workers():
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = os.path.join(tmp, 'deck.pptx')
+        prs = Presentation()
+        for title in ["AWS Cost Overview", "Support Case Summary", "Thank You"]:
+            prs.slides.add_slide(prs.slide_layouts[1]).shapes.title.text = title
+        prs.save(deck)
+
+        pool = WarmWorkerPool(processes=2, job_timeout=120).start()
+        try:
+            jobs_before = metrics.counter_value('mbr_jobs_total', outcome='ok')
+            workers = []
+            for i in range(3):
+                output_dir = os.path.join(tmp, f'out{i}')
+                os.makedirs(output_dir)
+                results = pool.run_job(deck, 'Acme', 'technical', {}, output_dir)
+                assert os.path.exists(results['presentation'])
+                workers.append(results['data_sources']['worker'])
+        finally:
+            pool.close()
+
+        assert all(w['pid'] != os.getpid() for w in workers)
+        # Libraries and clients were loaded before the job, so building the agent is cheap
+        assert all(w['startup_seconds'] < 0.5 for w in workers)
+        # The worker's job counter was merged into this process's registry
+        assert metrics.counter_value('mbr_jobs_total', outcome='ok') == jobs_before + 3
+        assert metrics.counter_value('mbr_worker_jobs_total', outcome='ok') >= 3
+
+def test_job_rate_does_not_outlive_job():
+    """A batch's --llm-rate applies to its own job only, never to the worker's shared limiter."""
+    with tempfile.TemporaryDirectory() as tmp:
+        deck = os.path.join(tmp, 'deck.pptx')
+        prs = Presentation()
+        prs.slides.add_slide(prs.slide_layouts[1]).shapes.title.text = "AWS Cost Overview"
+        prs.save(deck)
+
+        pool = WarmWorkerPool(processes=1, job_timeout=120).start()
+        try:
+            throttled = pool.run_job(deck, 'Acme', 'technical', {}, tmp, llm_rate=1000)['data_sources']['worker']
+            later = pool.run_job(deck, 'Acme', 'technical', {}, tmp)['data_sources']['worker']
+        finally:
+            pool.close()
+
+    assert later['pid'] == throttled['pid'] != os.getpid()
+    assert throttled['job_llm_rate'] == 1000
+    # The next job in the same worker runs without it, and the worker's own limiter never changed
+    assert later['job_llm_rate'] is None
+    assert later['worker_llm_rate'] == throttled['worker_llm_rate'] != 1000
+
+if __name__ == "__main__":
+    test_metrics_export_and_merge()
+    test_jobs_run_in_warm_workers()
+    test_job_rate_does_not_outlive_job()
+    print("✅ Worker pool tests passed")